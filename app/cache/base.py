@@ -0,0 +1,171 @@
+"""Cache interface shared by every backend.
+
+Values are any picklable object. Each entry may carry a TTL and a set of
+tags; `invalidate_tag` drops every entry stored with that tag, which is how a
+single invalidation message clears a whole group (e.g. every license
+snapshot that lists package names).
+"""
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Sequence
+
+from app.core.metrics import REGISTRY
+from app.core.singleflight import SingleFlight
+
+
+CACHE_OPERATIONS = REGISTRY.counter(
+    "cache_operations_total", "Cache lookups and removals by outcome.", ("backend", "result")
+)
+
+# Keys share invalidation counters by hash; a collision only skips storing one load
+_KEY_GENERATION_STRIPES = 1024
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    # Entries removed to stay within the size limit
+    evictions: int
+    # Entries found past their TTL
+    expirations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Cache(ABC):
+    name = "base"
+
+    def __init__(self, default_ttl: Optional[float] = None) -> None:
+        # None or 0 keeps entries until they are evicted or invalidated
+        self.default_ttl = default_ttl
+        self._stats_lock = threading.Lock()
+        self._counts = {"hit": 0, "miss": 0, "eviction": 0, "expiration": 0}
+        self._flight = SingleFlight(f"cache_{self.name}")
+        # Bumped by every delete/invalidate_tag/clear, so a load that raced one is not stored
+        self._generation_lock = threading.Lock()
+        self._key_generations = [0] * _KEY_GENERATION_STRIPES
+        self._tag_generations: Dict[str, int] = {}
+        self._clear_generation = 0
+
+    @abstractmethod
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Return the live entries among `keys`; absent keys are misses."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_tag(self, tag: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the entry for `key`, loading and storing it on a miss.
+
+        Loads for which `cacheable` returns False are returned but not stored.
+        """
+        found = self.get_many([key])
+        if key in found:
+            return found[key]
+
+        tags = tuple(tags)
+
+        def load() -> Any:
+            generation = self._generation(key, tags)
+            value = loader()
+            if cacheable is not None and not cacheable(value):
+                return value
+            if self._current_generation(key, tags) != generation:
+                return value
+            # Stored outside the lock, so backend I/O never blocks invalidations; one that lands
+            # while the write is in flight may miss the entry, so it is checked again and dropped
+            self.set(key, value, ttl=ttl, tags=tags)
+            if self._current_generation(key, tags) != generation:
+                self.delete(key)
+            return value
+
+        # Concurrent misses for one key share a single load
+        return self._flight.do(key, load)
+
+    def stats(self) -> CacheStats:
+        with self._stats_lock:
+            counts = dict(self._counts)
+        return CacheStats(counts["hit"], counts["miss"], counts["eviction"], counts["expiration"])
+
+    def _generation(self, key: str, tags: Sequence[str]) -> tuple:
+        return (
+            self._clear_generation,
+            self._key_generations[hash(key) % _KEY_GENERATION_STRIPES],
+            tuple(self._tag_generations.get(tag, 0) for tag in tags),
+        )
+
+    def _current_generation(self, key: str, tags: Sequence[str]) -> tuple:
+        with self._generation_lock:
+            return self._generation(key, tags)
+
+    def _invalidating(self, key: Optional[str] = None, tag: Optional[str] = None) -> None:
+        """Backends call this before removing `key`, `tag`, or (with neither) everything."""
+        with self._generation_lock:
+            if key is not None:
+                self._key_generations[hash(key) % _KEY_GENERATION_STRIPES] += 1
+            elif tag is not None:
+                self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+            else:
+                self._clear_generation += 1
+
+    def _ttl(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return ttl if ttl and ttl > 0 else None
+
+    def _record(self, hits: int = 0, misses: int = 0, evictions: int = 0, expirations: int = 0) -> None:
+        with self._stats_lock:
+            for result, amount in (("hit", hits), ("miss", misses), ("eviction", evictions), ("expiration", expirations)):
+                if amount:
+                    self._counts[result] += amount
+                    CACHE_OPERATIONS.inc(self.name, result, amount=amount)
+
+
+class NullCache(Cache):
+    """Stores nothing; every lookup is a miss. Used to switch caching off."""
+
+    name = "none"
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        self._record(misses=len(keys))
+        return {}
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def invalidate_tag(self, tag: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+
+from app.cache.base import Cache, NullCache
+from app.cache.memory import MemoryCache
+from app.cache.redis import RedisCache
+from app.cache.sqlite import SqliteCache
+from app.core.settings import settings
+
+
+def default_sqlite_cache_path(database_url: str) -> str:
+    """`<sqlite file>.cache` next to the database, so separate databases never share entries."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        return f"{url.database}.cache"
+    raise ValueError("CACHE_SQLITE_PATH is required for the sqlite cache unless DATABASE_URL is a SQLite file")
+
+
+def make_cache(
+    kind: str,
+    max_entries: int = 10000,
+    default_ttl: float = 0,
+    sqlite_path: Optional[str] = None,
+    redis_url: str = "redis://localhost:6379/0",
+    database_url: Optional[str] = None,
+) -> Cache:
+    if kind == "memory":
+        return MemoryCache(max_entries, default_ttl)
+    if kind == "sqlite":
+        path = sqlite_path or default_sqlite_cache_path(database_url or settings.database_url)
+        return SqliteCache(path, max_entries, default_ttl)
+    if kind == "redis":
+        return RedisCache(redis_url, default_ttl=default_ttl)
+    if kind == "none":
+        return NullCache(default_ttl)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+cache = make_cache(
+    settings.cache_backend,
+    settings.cache_max_entries,
+    settings.cache_default_ttl_seconds,
+    settings.cache_sqlite_path,
+    settings.cache_redis_url,
+    settings.database_url,
+)
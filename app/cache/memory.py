@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence, Set
+
+from app.cache.base import Cache
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires_at: Optional[float]  # time.monotonic() deadline
+    tags: tuple
+
+
+class MemoryCache(Cache):
+    """Thread-safe LRU for one process; values are stored by reference, not copied."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, default_ttl: Optional[float] = None) -> None:
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        expired = 0
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry.expires_at is not None and entry.expires_at <= now:
+                    self._remove(key)
+                    expired += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry.value
+        self._record(hits=len(found), misses=len(keys) - len(found), expirations=expired)
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ttl = self._ttl(ttl)
+        entry = _Entry(value, time.monotonic() + ttl if ttl else None, tuple(tags))
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        if evicted:
+            self._record(evictions=evicted)
+
+    def delete(self, key: str) -> None:
+        self._invalidating(key=key)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_tag(self, tag: str) -> None:
+        self._invalidating(tag=tag)
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+            self._tags.pop(tag, None)
+
+    def clear(self) -> None:
+        self._invalidating()
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key: str) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
@@ -0,0 +1,182 @@
+"""Cache on a Redis-protocol (RESP2) server, with a small built-in client.
+
+Works with Redis, Valkey, KeyDB or any server speaking RESP. Tags are Redis
+sets of member keys. Connection errors degrade to cache misses so an outage
+slows requests down instead of failing them.
+"""
+import logging
+import pickle
+import socket
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import unquote, urlparse
+
+from app.cache.base import Cache, CacheStats
+
+
+logger = logging.getLogger(__name__)
+
+
+class RespError(Exception):
+    """An error reply from the server."""
+
+
+def _encode(args: Sequence) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+class RespConnection:
+    def __init__(self, host: str, port: int, timeout: float = 1.0) -> None:
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+
+    def execute(self, *args) -> Any:
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: Sequence[Sequence]) -> List[Any]:
+        """Send every command in one write, then read the replies in order."""
+        self._sock.sendall(b"".join(_encode(args) for args in commands))
+        replies = [self._read() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def _read(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            return RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            size = int(payload)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(payload)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise ConnectionError(f"unexpected reply type {kind!r}")
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+
+class RedisCache(Cache):
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "licsrv:", default_ttl: Optional[float] = None) -> None:
+        super().__init__(default_ttl)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _connection(self) -> RespConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = RespConnection(self.host, self.port)
+            setup = []
+            if self.password:
+                setup.append(("AUTH", self.password))
+            if self.db:
+                setup.append(("SELECT", self.db))
+            if setup:
+                conn.pipeline(setup)
+            self._local.conn = conn
+        return conn
+
+    def _pipeline(self, commands: Sequence[Sequence]) -> Optional[List[Any]]:
+        try:
+            return self._connection().pipeline(commands)
+        except (OSError, ConnectionError, RespError) as exc:
+            logger.warning("Cache server unavailable: %s", exc)
+            self.close()
+            return None
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        replies = self._pipeline([("MGET", *[self._key(k) for k in keys])])
+        values = replies[0] if replies else [None] * len(keys)
+        found = {key: pickle.loads(value) for key, value in zip(keys, values) if value is not None}
+        self._record(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ttl = self._ttl(ttl)
+        command = ["SET", self._key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)]
+        if ttl:
+            command += ["PX", max(1, int(ttl * 1000))]
+        self._pipeline([command] + [("SADD", self._tag_key(tag), key) for tag in tags])
+
+    def delete(self, key: str) -> None:
+        self._invalidating(key=key)
+        self._pipeline([("DEL", self._key(key))])
+
+    def invalidate_tag(self, tag: str) -> None:
+        self._invalidating(tag=tag)
+        replies = self._pipeline([("SMEMBERS", self._tag_key(tag))])
+        if replies is None:
+            return
+        members = [self._key(member.decode()) for member in replies[0]]
+        self._pipeline([("DEL", self._tag_key(tag), *members)])
+
+    def clear(self) -> None:
+        self._invalidating()
+        cursor = "0"
+        while True:
+            replies = self._pipeline([("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 1000)])
+            if replies is None:
+                return
+            cursor, keys = replies[0][0].decode(), replies[0][1]
+            if keys:
+                self._pipeline([("DEL", *keys)])
+            if cursor == "0":
+                return
+
+    def stats(self) -> CacheStats:
+        # Redis evicts and expires keys itself; report the server's counters
+        stats = super().stats()
+        replies = self._pipeline([("INFO", "stats")])
+        if replies is None:
+            return stats
+        info = dict(
+            line.split(":", 1) for line in replies[0].decode().splitlines() if ":" in line and not line.startswith("#")
+        )
+        return stats._replace(
+            evictions=int(info.get("evicted_keys", 0)), expirations=int(info.get("expired_keys", 0))
+        )
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+            self._local.conn = None
@@ -0,0 +1,164 @@
+import contextlib
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+from app.cache.base import Cache
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS cache_entries ("
+    " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, stored_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at ON cache_entries (stored_at)",
+    "CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key)",
+)
+
+
+class SqliteCache(Cache):
+    """Cache in a local SQLite file shared by every worker process on the host.
+
+    Reads never write: entries are evicted oldest-written first rather than
+    least-recently-read, and expired rows are skipped on read and purged by the
+    periodic size check that runs every `check_every` writes.
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        default_ttl: Optional[float] = None,
+        check_every: int = 64,
+    ) -> None:
+        super().__init__(default_ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self.check_every = check_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        with self._connection() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _degrading(self, operation: str) -> Iterator[None]:
+        try:
+            yield
+        except sqlite3.Error as exc:
+            logger.warning("Cache %s failed: %s", operation, exc)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        rows = []
+        with self._degrading("read"):
+            rows = self._connection().execute(
+                f"SELECT key, value, expires_at FROM cache_entries WHERE key IN ({placeholders})", list(keys)
+            ).fetchall()
+        found: Dict[str, Any] = {}
+        expired = 0
+        for key, value, expires_at in rows:
+            if expires_at is not None and expires_at <= now:
+                expired += 1
+                continue
+            found[key] = pickle.loads(value)
+        self._record(hits=len(found), misses=len(keys) - len(found), expirations=expired)
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        ttl = self._ttl(ttl)
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._degrading("write"):
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, blob, now + ttl if ttl else None, now),
+                )
+                conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags]
+                )
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.check_every == 0
+        if due:
+            with self._degrading("size check"):
+                self.enforce_limits()
+
+    def enforce_limits(self) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+            excess = conn.execute("SELECT count(*) FROM cache_entries").fetchone()[0] - self.max_entries
+            evicted = 0
+            if excess > 0:
+                evicted = conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN "
+                    "(SELECT key FROM cache_entries ORDER BY stored_at LIMIT ?)",
+                    (excess,),
+                ).rowcount
+            if expired or evicted:
+                conn.execute("DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)")
+        self._record(evictions=evicted, expirations=expired)
+
+    def delete(self, key: str) -> None:
+        self._invalidating(key=key)
+        with self._degrading("delete"):
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+
+    def invalidate_tag(self, tag: str) -> None:
+        self._invalidating(tag=tag)
+        with self._degrading("tag invalidation"):
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_tags WHERE tag = ?)", (tag,)
+                )
+                conn.execute(
+                    "DELETE FROM cache_tags WHERE key IN (SELECT key FROM cache_tags WHERE tag = ?)", (tag,)
+                )
+
+    def clear(self) -> None:
+        self._invalidating()
+        with self._degrading("clear"):
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM cache_entries")
+                conn.execute("DELETE FROM cache_tags")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,233 @@
+"""Cross-worker cache invalidation.
+
+A worker that changes licenses, packages or users publishes (topic, key) after
+committing. The message is applied to the local subscribers immediately, and a
+transport carries it to the other workers. Their bus thread applies it within
+about one poll interval.
+
+- "sqlite": messages are rows in the `invalidations` table; every worker polls
+  for ids above the last one it saw. Durable, and works across hosts sharing the database.
+- "unix": datagrams fanned out to one socket per worker in a shared directory.
+  Immediate but best-effort; a local stand-in for UDP multicast.
+"""
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import REGISTRY
+from app.models.invalidation import Invalidation
+
+
+logger = logging.getLogger(__name__)
+
+TOPIC_LICENSE = "license"  # key: license key
+TOPIC_PACKAGE = "package"  # key: package id
+TOPIC_USER = "user"  # key: user id
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INVALIDATION_LAG = REGISTRY.histogram(
+    "cache_invalidation_lag_seconds",
+    "Delay between another worker publishing an invalidation and this worker applying it.",
+    ("transport",),
+    LAG_BUCKETS,
+)
+INVALIDATIONS_APPLIED = REGISTRY.counter(
+    "cache_invalidations_applied_total", "Invalidations applied to local caches.", ("topic", "source")
+)
+
+
+class Message(NamedTuple):
+    topic: str
+    key: Optional[str]  # None invalidates the whole topic
+    origin: str
+    published_at: float
+
+
+class SqliteTableTransport:
+    name = "sqlite"
+    blocking = False
+
+    def __init__(self, bind: Engine, retention_seconds: float = 3600.0, batch_size: int = 500) -> None:
+        self.bind = bind
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self._last_id: Optional[int] = None
+        self._next_prune = 0.0
+
+    def send(self, message: Message) -> None:
+        with self.bind.begin() as conn:
+            conn.execute(insert(Invalidation.__table__).values(**message._asdict()))
+
+    def receive(self, timeout: float) -> List[Message]:
+        table = Invalidation.__table__
+        with self.bind.begin() as conn:
+            if self._last_id is None:
+                # Caches start empty, so history from before this worker started is irrelevant
+                self._last_id = conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one()
+                return []
+            rows = conn.execute(
+                select(table.c.id, table.c.topic, table.c.key, table.c.origin, table.c.published_at)
+                .where(table.c.id > self._last_id)
+                .order_by(table.c.id)
+                .limit(self.batch_size)
+            ).all()
+            now = time.time()
+            if now >= self._next_prune:
+                self._next_prune = now + min(self.retention_seconds, 60.0)
+                conn.execute(delete(table).where(table.c.published_at < now - self.retention_seconds))
+        if rows:
+            self._last_id = rows[-1].id
+        return [Message(r.topic, r.key, r.origin, r.published_at) for r in rows]
+
+    def close(self) -> None:
+        pass
+
+
+class UnixDatagramTransport:
+    name = "unix"
+    blocking = True
+
+    def __init__(self, directory: str, origin: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"{origin}.sock")
+        self._inbox = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._inbox.bind(self.path)
+        self._outbox = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        # A worker with a full inbox drops the message rather than stalling the request
+        self._outbox.setblocking(False)
+
+    def send(self, message: Message) -> None:
+        payload = json.dumps(message._asdict()).encode()
+        for name in os.listdir(self.directory):
+            peer = os.path.join(self.directory, name)
+            if not name.endswith(".sock") or peer == self.path:
+                continue
+            try:
+                self._outbox.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Socket left behind by a worker that exited
+                _unlink_quietly(peer)
+            except BlockingIOError:
+                logger.warning("Invalidation dropped: %s is not keeping up", peer)
+
+    def receive(self, timeout: float) -> List[Message]:
+        self._inbox.settimeout(timeout)
+        try:
+            payloads = [self._inbox.recv(65536)]
+        except socket.timeout:
+            return []
+        self._inbox.setblocking(False)
+        try:
+            while True:
+                payloads.append(self._inbox.recv(65536))
+        except BlockingIOError:
+            pass
+        return [Message(**json.loads(p)) for p in payloads]
+
+    def close(self) -> None:
+        self._inbox.close()
+        self._outbox.close()
+        _unlink_quietly(self.path)
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class InvalidationBus:
+    def __init__(self) -> None:
+        self.origin = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, List[Callable[[Optional[str]], None]]] = {}
+        self._transport = None
+        self._interval = 0.5
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, topic: str, handler: Callable[[Optional[str]], None]) -> None:
+        """Call `handler(key)` for every invalidation of `topic`; key None means everything."""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def unsubscribe(self, topic: str, handler: Callable[[Optional[str]], None]) -> None:
+        self._handlers.get(topic, []).remove(handler)
+
+    def publish(self, topic: str, key=None) -> None:
+        """Invalidate `key` here now and on the other workers; call after the change is committed."""
+        message = Message(topic, None if key is None else str(key), self.origin, time.time())
+        self._apply(message, "local")
+        transport = self._transport
+        if transport is None:
+            return
+        try:
+            transport.send(message)
+        except Exception:
+            # Peers fall back on their caches' TTLs; the request that made the change still succeeds
+            logger.exception("Failed to publish invalidation %s/%s", topic, key)
+
+    def start(self, transport, interval_seconds: float = 0.5) -> None:
+        if self._thread is not None:
+            return
+        self._transport = transport
+        self._interval = interval_seconds
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._interval + 5)
+            self._thread = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def _run(self) -> None:
+        transport = self._transport
+        while not self._stop.is_set():
+            try:
+                messages = transport.receive(self._interval)
+            except Exception:
+                logger.exception("Receiving invalidations failed")
+                self._stop.wait(self._interval)
+                continue
+            for message in messages:
+                if message.origin == self.origin:
+                    continue
+                INVALIDATION_LAG.observe(max(0.0, time.time() - message.published_at), transport.name)
+                self._apply(message, "remote")
+            if not messages and not transport.blocking:
+                self._stop.wait(self._interval)
+
+    def _apply(self, message: Message, source: str) -> None:
+        for handler in self._handlers.get(message.topic, ()):
+            try:
+                handler(message.key)
+            except Exception:
+                logger.exception("Invalidation handler failed for %s/%s", message.topic, message.key)
+        INVALIDATIONS_APPLIED.inc(message.topic, source)
+
+
+def make_transport(kind: str, bind: Engine, origin: str, retention_seconds: float, socket_dir: Optional[str]):
+    if kind == "sqlite":
+        return SqliteTableTransport(bind, retention_seconds=retention_seconds)
+    if kind == "unix":
+        return UnixDatagramTransport(socket_dir or os.path.join(tempfile.gettempdir(), "datacebo-invalidation"), origin)
+    if kind == "off":
+        return None
+    raise ValueError(f"Unknown invalidation transport: {kind!r}")
+
+
+bus = InvalidationBus()
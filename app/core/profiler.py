@@ -0,0 +1,161 @@
+"""Stack-sampling profiler that keeps profiles of slow requests only.
+
+A background thread periodically reads `sys._current_frames()` for the threads
+serving in-flight requests: the event loop thread plus any worker thread that
+executed SQL for the request. When a request finishes above the latency
+threshold its samples are kept in a bounded ring buffer, in the collapsed-stack
+("folded") format that flamegraph.pl, speedscope and inferno read.
+"""
+import collections
+import contextvars
+import itertools
+import os
+import sys
+import threading
+import time
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.settings import settings
+
+
+# Idle event-loop samples (parked in the selector) say nothing about the request
+_IDLE_LEAF_FILES = ("selectors.py",)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__") or os.path.basename(code.co_filename)
+    return f"{module}:{code.co_qualname}"
+
+
+def collapse_stack(frame) -> str:
+    """Render a frame chain root-first, semicolon-separated."""
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class _InFlight:
+    __slots__ = ("method", "path", "started_at", "thread_ids", "samples")
+
+    def __init__(self, method: str, path: str, thread_id: int) -> None:
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.thread_ids = {thread_id}
+        self.samples: Dict[str, int] = {}
+
+
+class Profile:
+    __slots__ = ("id", "method", "path", "started_at", "duration_ms", "samples")
+
+    def __init__(self, profile_id: int, request: _InFlight, duration_ms: float) -> None:
+        self.id = profile_id
+        self.method = request.method
+        self.path = request.path
+        self.started_at = request.started_at
+        self.duration_ms = duration_ms
+        self.samples = request.samples
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        lines = [f"{stack} {count}" for stack, count in sorted(self.samples.items())]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+current_profiled_request: contextvars.ContextVar[Optional[_InFlight]] = contextvars.ContextVar(
+    "current_profiled_request", default=None
+)
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: float, threshold_ms: float, ring_size: int) -> None:
+        self.interval = interval_ms / 1000
+        self.threshold_ms = threshold_ms
+        self.profiles: Deque[Profile] = collections.deque(maxlen=ring_size)
+        self._active: Dict[int, _InFlight] = {}
+        self._ids = itertools.count(1)
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def begin(self, method: str, path: str) -> _InFlight:
+        request = _InFlight(method, path, threading.get_ident())
+        self._active[id(request)] = request
+        self._ensure_sampler()
+        self._wake.set()
+        return request
+
+    def end(self, request: _InFlight, duration_ms: float) -> Optional[Profile]:
+        self._active.pop(id(request), None)
+        if duration_ms < self.threshold_ms:
+            return None
+        profile = Profile(next(self._ids), request, round(duration_ms, 3))
+        self.profiles.append(profile)
+        return profile
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        for profile in list(self.profiles):
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def _ensure_sampler(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def sample_once(self) -> None:
+        frames = sys._current_frames()
+        for request in list(self._active.values()):
+            for thread_id in tuple(request.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is None or frame.f_code.co_filename.endswith(_IDLE_LEAF_FILES):
+                    continue
+                stack = collapse_stack(frame)
+                request.samples[stack] = request.samples.get(stack, 0) + 1
+
+    def _run(self) -> None:
+        while True:
+            if not self._active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            time.sleep(self.interval)
+            self.sample_once()
+
+
+def note_request_thread() -> None:
+    """Mark the calling thread as working for the current profiled request."""
+    request = current_profiled_request.get()
+    if request is not None:
+        request.thread_ids.add(threading.get_ident())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    note_request_thread()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Threadpool workers that run SQL for a request get sampled with it."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+profiler = SamplingProfiler(
+    interval_ms=settings.profiler_interval_ms,
+    threshold_ms=settings.profiler_threshold_ms,
+    ring_size=settings.profiler_ring_size,
+)
@@ -0,0 +1,54 @@
+"""SQL statement accounting used by the query debug mode and test query budgets."""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Expanding IN lists render one placeholder per value; collapse them so the shape is stable
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)*\s*\?\s*\)|\((?:\s*%\([^)]*\)s\s*,)*\s*%\([^)]*\)s\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize SQL text so executions differing only in bound values compare equal."""
+    return _IN_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def repeated_statements(statements: Dict[str, int], threshold: int) -> List[Tuple[str, int]]:
+    """Statement shapes executed at least `threshold` times, most frequent first (probable N+1s)."""
+    repeated = [(shape, count) for shape, count in statements.items() if count >= threshold]
+    return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+
+class QueryCapture:
+    """Count every statement executed on `engine` while the block is active.
+
+    Unlike the per-request stats this listens globally, so it also sees work done
+    on other threads (e.g. the TestClient's server thread).
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.statements: Dict[str, int] = {}
+        self.count = 0
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+        shape = statement_shape(statement)
+        self.statements[shape] = self.statements.get(shape, 0) + 1
+
+    def __enter__(self) -> "QueryCapture":
+        event.listen(self.engine, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "after_cursor_execute", self._record)
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        return repeated_statements(self.statements, threshold)
+
+    def summary(self, limit: Optional[int] = 10) -> str:
+        top = sorted(self.statements.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return "\n".join(f"{count:4d}x {shape}" for shape, count in top)
@@ -0,0 +1,57 @@
+import json
+from functools import lru_cache
+from typing import Any, Iterable, List, Mapping, Optional, Type
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: pip install datacebo-be[fast]
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed, compact stdlib json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def json_list_response(
+    model: Type[BaseModel],
+    items: Iterable[Any],
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = 200,
+) -> Response:
+    """Serialize a list straight to JSON bytes in pydantic-core, skipping FastAPI's dict round trip.
+
+    `items` may be model instances or ORM rows (validated with from_attributes). Returning a
+    Response bypasses response_model handling, so any headers must be passed here.
+    """
+    adapter = list_adapter(model)
+    items = list(items)
+    if not all(isinstance(item, model) for item in items):
+        items = adapter.validate_python(items, from_attributes=True)
+    return Response(content=adapter.dump_json(items), status_code=status_code, headers=headers, media_type="application/json")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (a tag list or `*`) against `etag`."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
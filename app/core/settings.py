@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,9 +9,60 @@ class Settings(BaseSettings):
     # App
     app_name: str = "Datacebo API"
     debug: bool = False
+    # Exercise hot queries and indexes at startup before /ready reports ready
+    warmup_enabled: bool = True
+    # Routers this worker serves: "*" or a comma-separated list, e.g. "licenses,events"
+    enabled_routers: str = "*"
+    # Import and mount each enabled router on the first request to its prefix
+    lazy_routers: bool = False
+    # Per-route request/DB metrics exposed on /metrics
+    metrics_enabled: bool = True
+    # Debug/profiling: X-Query-Count header and a JSON log line per request
+    query_debug: bool = False
+    # Same statement shape this many times in one request is flagged as a probable N+1
+    query_repeat_threshold: int = 3
+    # Opt-in stack sampling; only requests slower than the threshold keep their profile
+    profiler_enabled: bool = False
+    profiler_threshold_ms: float = 500.0
+    profiler_interval_ms: float = 5.0
+    profiler_ring_size: int = 50
+    # Render JSON responses with orjson (when installed) instead of the stdlib encoder
+    fast_json: bool = False
+    # gzip/brotli for bodies of at least the minimum size; big ones compress in a worker thread
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_offload_size: int = 262144
+
+    # Cross-worker cache invalidation: "sqlite" (change table polled every interval),
+    # "unix" (datagrams between workers on one host) or "off" (this process only)
+    invalidation_transport: str = "sqlite"
+    invalidation_poll_interval_seconds: float = 0.5
+    invalidation_retention_seconds: float = 3600.0
+    # Defaults to "<tmpdir>/datacebo-invalidation"
+    invalidation_socket_dir: Optional[str] = None
+
+    # Response cache for license lookups and the package catalog: "memory" (per-process LRU),
+    # "sqlite" (file shared by the workers on a host), "redis" (any RESP server) or "none"
+    cache_backend: Literal["memory", "sqlite", "redis", "none"] = "memory"
+    cache_max_entries: int = 10000
+    # Safety net on top of invalidation; 0 keeps entries until evicted or invalidated
+    cache_default_ttl_seconds: float = 300.0
+    # Defaults to "<sqlite file>.cache" next to the database; required for a non-file database
+    cache_sqlite_path: Optional[str] = None
+    cache_redis_url: str = "redis://localhost:6379/0"
 
     # Database
     database_url: str = "sqlite:///./app.db"
+    # Defaults to "<sqlite file>.migrate.lock" next to the database
+    migration_lock_path: Optional[str] = None
+    # Shard map for download events: comma-separated SQLite URLs, shard i is the i-th URL.
+    # Empty keeps events in the main database. Changing it re-routes keys and global ids.
+    event_shard_urls: str = ""
+    # "hash" spreads writes by license key (else client IP); "time" fills one shard per period
+    event_shard_strategy: Literal["hash", "time"] = "hash"
+    event_shard_period_seconds: int = 86400
 
     # Security
     access_token_secret: str = "dev-access-secret-change-me"
@@ -26,6 +79,11 @@ class Settings(BaseSettings):
 
     # Licensing
     license_default_days: int = 30
+    license_sweeper_enabled: bool = True
+    license_sweep_interval_seconds: float = 60.0
+    license_sweep_batch_size: int = 500
+    # How often long-poll and SSE change feed requests check for new entries
+    change_feed_poll_interval_seconds: float = 0.5
 
 
 settings = Settings()
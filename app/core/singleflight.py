@@ -0,0 +1,91 @@
+"""Coalesce concurrent identical calls into one.
+
+The first caller for a key (the leader) runs the function; callers that
+arrive while it is running wait and receive the same result or exception.
+Nothing is remembered afterwards: the next call after completion runs again.
+"""
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from app.core.metrics import REGISTRY
+
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    "singleflight_calls_total",
+    "Calls by coalescing group; role is leader (ran the work) or coalesced (shared a leader's result).",
+    ("group", "role"),
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """For sync code, including handlers running in the threadpool."""
+
+    def __init__(self, group: str) -> None:
+        self.group = group
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(self.group, "coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLEFLIGHT_CALLS.inc(self.group, "leader")
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """For coroutines. The work runs in its own task, so a cancelled caller
+    (e.g. a client that disconnected) does not cancel it for the others."""
+
+    def __init__(self, group: str) -> None:
+        self.group = group
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Task"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        # Tasks belong to one event loop; keep separate tables per loop
+        slot = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(slot)
+        if task is None:
+            SINGLEFLIGHT_CALLS.inc(self.group, "leader")
+            task = self._tasks[slot] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finished(slot, done))
+        else:
+            SINGLEFLIGHT_CALLS.inc(self.group, "coalesced")
+        return await asyncio.shield(task)
+
+    def _finished(self, slot: Tuple[int, Hashable], task: "asyncio.Task") -> None:
+        if self._tasks.get(slot) is task:
+            del self._tasks[slot]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
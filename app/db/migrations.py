@@ -0,0 +1,239 @@
+import contextlib
+import logging
+import os
+import tempfile
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import Column, Integer, MetaData, Table, bindparam, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.settings import settings
+from app.db.session import Base, engine
+from app.models.epoch import to_epoch
+
+# Register every table on Base.metadata, whichever routers this worker mounts
+from app.models import change, counter, event, invalidation, package, user  # noqa: F401
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms migrate without the cross-process lock
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+# Kept out of Base.metadata so dropping/recreating the model tables leaves it alone
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _column_names(conn: Connection, table: str) -> set:
+    inspector = inspect(conn)
+    if table not in inspector.get_table_names():
+        return set()
+    return {col["name"] for col in inspector.get_columns(table)}
+
+
+def _add_column_if_missing(conn: Connection, table: str, column: str, ddl: str) -> bool:
+    if column in _column_names(conn, table):
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return True
+
+
+def _baseline(conn: Connection) -> None:
+    Base.metadata.create_all(bind=conn)
+
+
+def _package_deprecation(conn: Connection) -> None:
+    # SQLite/Postgres compatible boolean default
+    _add_column_if_missing(conn, "packages", "is_deprecated", "BOOLEAN NOT NULL DEFAULT 0")
+
+
+def _license_revocation(conn: Connection) -> None:
+    _add_column_if_missing(conn, "licenses", "revoked_at", "TIMESTAMP NULL")
+    _add_column_if_missing(conn, "licenses", "revoked_reason", "VARCHAR(255) NULL")
+
+
+def _users_email_lower_index(conn: Connection) -> None:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_email_lower ON users (lower(email))"))
+
+
+def _license_status(conn: Connection) -> None:
+    if _add_column_if_missing(conn, "licenses", "status", "VARCHAR(16) NOT NULL DEFAULT 'active'"):
+        # Expired rows are picked up by the sweeper's first (full) pass
+        conn.execute(text("UPDATE licenses SET status = 'revoked' WHERE revoked_at IS NOT NULL"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_licenses_expires_at ON licenses (expires_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_licenses_status_expires_at ON licenses (status, expires_at)"))
+
+
+def _invalidations_table(conn: Connection) -> None:
+    invalidation.Invalidation.__table__.create(bind=conn, checkfirst=True)
+
+
+def _change_log_table(conn: Connection) -> None:
+    change.ChangeLogEntry.__table__.create(bind=conn, checkfirst=True)
+
+
+def _backfill_epochs(conn: Connection, table_name: str, shadows: dict, batch_size: int = 1000) -> None:
+    """Fill epoch shadow columns from their datetime columns, converting in Python like the ORM does."""
+    table = Base.metadata.tables[table_name]
+    sources = list(shadows)
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("row_id"))
+        .values({shadow: bindparam(shadow) for shadow in shadows.values()})
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, *[table.c[name] for name in sources])
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        conn.execute(
+            statement,
+            [
+                {"row_id": row[0], **{shadows[name]: to_epoch(value) for name, value in zip(sources, row[1:])}}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+
+def _epoch_shadow_columns(conn: Connection) -> None:
+    licenses_added = _add_column_if_missing(conn, "licenses", "expires_at_epoch", "INTEGER NOT NULL DEFAULT 0")
+    _add_column_if_missing(conn, "licenses", "revoked_at_epoch", "INTEGER NULL")
+    if licenses_added:
+        _backfill_epochs(conn, "licenses", {"expires_at": "expires_at_epoch", "revoked_at": "revoked_at_epoch"})
+    if _add_column_if_missing(conn, "download_events", "created_at_epoch", "INTEGER NOT NULL DEFAULT 0"):
+        _backfill_epochs(conn, "download_events", {"created_at": "created_at_epoch"})
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_licenses_expires_at_epoch ON licenses (expires_at_epoch)"))
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_licenses_status_expires_at_epoch ON licenses (status, expires_at_epoch)")
+    )
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_download_events_created_at_epoch ON download_events (created_at_epoch)")
+    )
+    # Every expiry comparison now runs on the shadow; the text-datetime indexes only cost writes
+    conn.execute(text("DROP INDEX IF EXISTS ix_licenses_expires_at"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_licenses_status_expires_at"))
+
+
+def _lookup_indexes(conn: Connection) -> None:
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_licenses_key_state ON licenses (key, expires_at_epoch, revoked_at_epoch)"
+        )
+    )
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_licenses_user_id_expires_at_epoch ON licenses (user_id, expires_at_epoch)")
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_licenses_unrevoked_expires_at_epoch ON licenses (expires_at_epoch) "
+            "WHERE revoked_at_epoch IS NULL"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_license_packages_package_license "
+            "ON license_packages (package_id, license_id)"
+        )
+    )
+    # A prefix of ix_licenses_user_id_expires_at_epoch
+    conn.execute(text("DROP INDEX IF EXISTS ix_licenses_user_id"))
+
+
+# Every step must be safe on a database created by the baseline step from the current
+# models, which already contains the columns and indexes later steps add.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline tables", _baseline),
+    Migration(2, "packages.is_deprecated", _package_deprecation),
+    Migration(3, "licenses.revoked_at and revoked_reason", _license_revocation),
+    Migration(4, "lower(email) index on users", _users_email_lower_index),
+    Migration(5, "licenses.status with status/expiry indexes", _license_status),
+    Migration(6, "invalidations table for the cross-worker bus", _invalidations_table),
+    Migration(7, "change_log table for the change feed", _change_log_table),
+    Migration(8, "epoch-second shadow columns for license and event timestamps", _epoch_shadow_columns),
+    Migration(9, "covering, partial and reverse indexes for license lookups", _lookup_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _default_lock_path(bind: Engine) -> str:
+    database = bind.url.database if bind.url.get_backend_name() == "sqlite" else None
+    if database and database != ":memory:":
+        return f"{database}.migrate.lock"
+    return os.path.join(tempfile.gettempdir(), "datacebo-migrate.lock")
+
+
+@contextlib.contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive advisory lock so only one worker process migrates at a time."""
+    with open(path, "a+") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def current_version(conn: Connection) -> Optional[int]:
+    try:
+        return conn.execute(select(schema_version.c.version).where(schema_version.c.id == 1)).scalar_one_or_none()
+    except DBAPIError:
+        # schema_version does not exist yet
+        conn.rollback()
+        return None
+
+
+def run_migrations(bind: Optional[Engine] = None, lock_path: Optional[str] = None) -> int:
+    """Bring the database up to LATEST_VERSION and return the resulting version.
+
+    When the schema is current this costs a single one-row read; otherwise the
+    pending steps run under the file lock, each in its own transaction together
+    with the version bump.
+    """
+    bind = bind or engine
+    with bind.connect() as conn:
+        if current_version(conn) == LATEST_VERSION:
+            return LATEST_VERSION
+
+    with _file_lock(lock_path or settings.migration_lock_path or _default_lock_path(bind)):
+        _version_metadata.create_all(bind=bind)
+        with bind.connect() as conn:
+            # Another process may have finished while we waited for the lock
+            version = current_version(conn) or 0
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            with bind.begin() as conn:
+                migration.apply(conn)
+                if version == 0:
+                    conn.execute(schema_version.insert().values(id=1, version=migration.version))
+                else:
+                    conn.execute(
+                        schema_version.update().where(schema_version.c.id == 1).values(version=migration.version)
+                    )
+            logger.info("Applied migration %d: %s", migration.version, migration.description)
+            version = migration.version
+    return version
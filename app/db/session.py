@@ -22,3 +22,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def is_database_locked(exc: BaseException) -> bool:
+    """True when SQLite gave up waiting for another connection's write lock."""
+    return "database is locked" in str(getattr(exc, "orig", exc))
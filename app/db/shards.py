@@ -0,0 +1,103 @@
+"""Optional horizontal split of write-heavy tables across SQLite files.
+
+Each SQLite file has its own write lock, so N files accept N concurrent writers.
+A ShardMap owns one engine per file. It routes a row to a shard by key hash or
+time bucket, and fans reads out to every shard ("scatter") for the caller to
+merge ("gather").
+
+Row ids are only unique within a shard. Rows are exposed with a global id,
+`local_id * shard_count + shard_index`, which stays stable as long as the shard
+map does not change.
+"""
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.settings import settings
+from app.db.session import SessionLocal, engine as main_engine
+
+
+T = TypeVar("T")
+
+
+class ShardMap:
+    def __init__(self, engines: Sequence[Engine], sessionmakers: Optional[Sequence[sessionmaker]] = None) -> None:
+        if not engines:
+            raise ValueError("A shard map needs at least one shard")
+        self.engines = list(engines)
+        self._sessionmakers = list(sessionmakers or [sessionmaker(bind=e, autoflush=False, autocommit=False) for e in engines])
+        self._pool = ThreadPoolExecutor(max_workers=len(self.engines), thread_name_prefix="shard") if len(self.engines) > 1 else None
+
+    @classmethod
+    def from_urls(cls, urls: Sequence[str]) -> "ShardMap":
+        return cls([create_engine(url, connect_args={"check_same_thread": False}) for url in urls])
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def index_for_key(self, key: str) -> int:
+        # crc32, not hash(): routing must agree across processes and restarts
+        return zlib.crc32(key.encode("utf-8")) % len(self.engines)
+
+    def index_for_time(self, epoch_seconds: float, period_seconds: int) -> int:
+        return int(epoch_seconds // period_seconds) % len(self.engines)
+
+    def session(self, index: int) -> Session:
+        return self._sessionmakers[index]()
+
+    def global_id(self, local_id: int, index: int) -> int:
+        return local_id * len(self.engines) + index
+
+    def split_id(self, global_id: int) -> Tuple[int, int]:
+        """(local_id, shard index) for a global id."""
+        return divmod(global_id, len(self.engines))
+
+    def scatter(self, fn: Callable[[Session, int], T], indexes: Optional[Iterable[int]] = None) -> List[T]:
+        """Run `fn(session, index)` on each shard (in parallel when there are several) and return the results in shard order."""
+        indexes = list(range(len(self.engines)) if indexes is None else indexes)
+
+        def run(index: int) -> T:
+            db = self.session(index)
+            try:
+                return fn(db, index)
+            finally:
+                db.close()
+
+        if self._pool is None or len(indexes) == 1:
+            return [run(i) for i in indexes]
+        return list(self._pool.map(run, indexes))
+
+    def migrate(self) -> None:
+        from app.db.migrations import run_migrations
+
+        # Shards carry the full schema so one migration history covers every file
+        for shard_engine in self.engines:
+            if shard_engine is not main_engine:
+                run_migrations(bind=shard_engine)
+
+
+def merge_sorted(
+    results: Iterable[Sequence[T]], key: Callable[[T], object], reverse: bool = False, offset: int = 0, limit: Optional[int] = None
+) -> List[T]:
+    """Gather per-shard results that are each sorted by `key` into one page.
+
+    Every shard must return at least `offset + limit` rows for the page to be exact.
+    """
+    merged = heapq.merge(*results, key=key, reverse=reverse)
+    return list(islice(merged, offset, None if limit is None else offset + limit))
+
+
+def _event_shards_from_settings() -> ShardMap:
+    urls = [url.strip() for url in settings.event_shard_urls.split(",") if url.strip()]
+    if not urls:
+        return ShardMap([main_engine], [SessionLocal])
+    return ShardMap.from_urls(urls)
+
+
+event_shards = _event_shards_from_settings()
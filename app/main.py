@@ -1,30 +1,72 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.exc import OperationalError
 
+from app.core import profiler
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, instrument_engine
+from app.core.responses import FastJSONResponse
 from app.core.settings import settings
-from app.routers.auth import router as auth_router
-from app.routers.balance import router as balance_router
-from app.routers.packages import router as packages_router
-from app.routers.store import router as store_router
-from app.routers.licenses import router as licenses_router
-from app.routers.me import router as me_router
-from app.routers.users import router as users_router
-from app.routers.events import router as events_router
-from app.startup import register_startup
-
-app = FastAPI(title=settings.app_name)
-
-register_startup(app)
-
-app.include_router(auth_router, prefix="/auth", tags=["auth"]) 
-app.include_router(balance_router, prefix="/balance", tags=["balance"]) 
-app.include_router(packages_router, prefix="/packages", tags=["packages"]) 
-app.include_router(store_router, prefix="/store", tags=["store"]) 
-app.include_router(licenses_router, prefix="/licenses", tags=["licenses"]) 
-app.include_router(me_router, tags=["me"]) 
-app.include_router(users_router, tags=["users"]) 
-app.include_router(events_router, tags=["events"]) 
+from app.db.session import engine, is_database_locked
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware, route_template
+from app.middleware.profiler import ProfilerMiddleware
+from app.middleware.query_debug import QueryDebugMiddleware
+from app.routers.registry import mount_routers
+from app.startup import lifespan
+
+DATABASE_BUSY_DETAIL = "Database is busy, retry shortly"
+DB_LOCKED_ERRORS = REGISTRY.counter(
+    "db_locked_errors_total", "Requests that failed waiting for the SQLite write lock.", ("route",)
+)
+
+app = FastAPI(
+    title=settings.app_name,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.fast_json else JSONResponse,
+)
+
+mount_routers(app)
+
+if settings.metrics_enabled or settings.query_debug:
+    instrument_engine(engine)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        level=settings.compression_level,
+        brotli_quality=settings.compression_brotli_quality,
+        offload_size=settings.compression_offload_size,
+    )
+if settings.query_debug:
+    app.add_middleware(QueryDebugMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+if settings.profiler_enabled:
+    profiler.instrument_engine(engine)
+    app.add_middleware(ProfilerMiddleware)
+
+
+@app.exception_handler(OperationalError)
+def database_busy(request: Request, exc: OperationalError):
+    # Lock timeouts are transient contention, not bugs: tell the client to back off
+    if not is_database_locked(exc):
+        raise exc
+    DB_LOCKED_ERRORS.inc(route_template(request.scope))
+    return JSONResponse(status_code=503, content={"detail": DATABASE_BUSY_DETAIL}, headers={"Retry-After": "1"})
 
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness_check(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
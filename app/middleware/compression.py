@@ -0,0 +1,75 @@
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.compression import compress, negotiate_encoding
+
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class CompressionMiddleware:
+    """gzip/brotli for complete response bodies of at least `minimum_size` bytes.
+
+    Bodies of `offload_size` bytes or more are compressed in a worker thread so
+    the event loop keeps serving other requests. Streaming responses and bodies
+    that already carry a Content-Encoding (e.g. precompressed snapshots) pass
+    through untouched. A strong ETag on a compressed body is weakened.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, level: int = 6, brotli_quality: int = 4, offload_size: int = 262144) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.offload_size = offload_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # First body message decides: compress it whole or stream everything as-is
+            passthrough = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(start_message["headers"]))
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= self.offload_size:
+                body = await anyio.to_thread.run_sync(compress, body, encoding, self.level, self.brotli_quality)
+            else:
+                body = compress(body, encoding, self.level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            # A strong tag names exact bytes; the compressed body is a different representation
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            headers.add_vary_header("Accept-Encoding")
+            await send({**start_message, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
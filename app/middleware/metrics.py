@@ -0,0 +1,78 @@
+import time
+
+from app.core.metrics import (
+    QUERY_COUNT_BUCKETS,
+    REGISTRY,
+    RequestStats,
+    current_request_stats,
+)
+
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "End-to-end request latency.", ("method", "route")
+)
+REQUEST_DB_SECONDS = REGISTRY.histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.", ("method", "route")
+)
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+
+# Unmatched paths share one label so scanners cannot blow up label cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope) -> str:
+    """The matched route's path template including any router prefix, e.g. /licenses/{license_key}/packages."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    # Depending on the FastAPI version the route path may omit the include prefix;
+    # recover it by rendering the template and stripping it from the request path
+    path = scope["path"]
+    try:
+        rendered = route.path_format.format(**scope.get("path_params", {}))
+    except (AttributeError, KeyError, IndexError, ValueError):
+        return template
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Record per-route request counts, latency and database time."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            method = scope["method"]
+            route = route_template(scope)
+            REQUESTS_TOTAL.inc(method, route, str(status_code))
+            REQUEST_DURATION.observe(elapsed, method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+            REQUEST_DB_QUERIES.observe(stats.query_count, method, route)
@@ -0,0 +1,24 @@
+import time
+
+from app.core.profiler import current_profiled_request, profiler
+
+
+class ProfilerMiddleware:
+    """Sample every in-flight request; keep the profile only if it exceeded the threshold."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = profiler.begin(scope["method"], scope["path"])
+        token = current_profiled_request.set(request)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_profiled_request.reset(token)
+            profiler.end(request, (time.perf_counter() - started) * 1000)
@@ -0,0 +1,63 @@
+import json
+import logging
+
+from app.core.metrics import RequestStats, current_request_stats
+from app.core.queries import repeated_statements
+from app.core.settings import settings
+from app.middleware.metrics import route_template
+
+
+logger = logging.getLogger("app.queries")
+
+
+class QueryDebugMiddleware:
+    """Count SQL statements per request and flag repeated statement shapes.
+
+    Adds an `X-Query-Count` response header and logs one JSON line per request;
+    requests that repeat a statement shape `query_repeat_threshold` or more times
+    are logged at WARNING as probable N+1s.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Share the metrics middleware's stats when it is installed outside us
+        stats = current_request_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestStats()
+            token = current_request_stats.set(stats)
+        stats.statements = {}
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.query_count).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                current_request_stats.reset(token)
+            repeated = repeated_statements(stats.statements, settings.query_repeat_threshold)
+            record = {
+                "event": "request_queries",
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope),
+                "status": status_code,
+                "query_count": stats.query_count,
+                "db_ms": round(stats.db_seconds * 1000, 3),
+                "repeated": [{"statement": shape, "count": count} for shape, count in repeated],
+            }
+            logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(record))
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+
+CHANGE_ENTITY_LICENSE = "license"
+CHANGE_ENTITY_PACKAGE = "package"
+
+
+class ChangeLogEntry(Base):
+    """Append-only log of license/package mutations, written in the mutating transaction."""
+
+    __tablename__ = "change_log"
+
+    # Consumers resume from the last seq they processed; AUTOINCREMENT keeps seqs from ever being reused
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String(16), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(16), nullable=False)
+    # License key for license changes, so edge caches can act without a lookup
+    key = Column(String(64), nullable=True)
+    # JSON snapshot of the entity after the change
+    data = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = {"sqlite_autoincrement": True}
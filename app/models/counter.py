@@ -0,0 +1,51 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import Column, Integer, String, select, update, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.db.session import Base
+
+
+class Counter(Base):
+    """Named integer counters maintained alongside the rows they describe."""
+
+    __tablename__ = "counters"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+def bump_counter(conn: Connection, name: str, delta: int = 1, seed: Optional[Select] = None) -> None:
+    """Add `delta` to a counter inside the caller's transaction.
+
+    A missing counter row is created on first use; `seed` optionally computes
+    its initial value (e.g. a COUNT over the table) so existing databases
+    converge without a separate backfill.
+    """
+    table = Counter.__table__
+    result = conn.execute(update(table).where(table.c.name == name).values(value=table.c.value + delta))
+    if result.rowcount == 0:
+        initial = conn.execute(seed).scalar_one() if seed is not None else delta
+        conn.execute(insert(table).values(name=name, value=initial))
+
+
+def set_counter(conn: Connection, name: str, value: int) -> None:
+    table = Counter.__table__
+    result = conn.execute(update(table).where(table.c.name == name).values(value=value))
+    if result.rowcount == 0:
+        conn.execute(insert(table).values(name=name, value=value))
+
+
+def read_counter(db: Session, name: str) -> Optional[int]:
+    return db.execute(select(Counter.value).where(Counter.name == name)).scalar_one_or_none()
+
+
+def read_counters(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Read several counters in one query; missing counters read as 0."""
+    names = list(names)
+    rows = db.execute(select(Counter.name, Counter.value).where(Counter.name.in_(names))).all()
+    values = {name: 0 for name in names}
+    values.update({name: value for name, value in rows})
+    return values
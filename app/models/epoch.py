@@ -0,0 +1,35 @@
+"""Integer epoch-second shadows of datetime columns.
+
+SQLite returns naive datetimes and compares them as text, so hot comparisons
+and range scans run on an indexed INTEGER copy instead. The copy is written
+by the ORM on flush; Core UPDATE/INSERT statements must set it themselves.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+
+def to_aware_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """SQLite hands back naive datetimes; they are stored as UTC."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def to_epoch(dt: Optional[datetime]) -> Optional[int]:
+    """Whole epoch seconds, the unit license state is evaluated in."""
+    return int(to_aware_utc(dt).timestamp()) if dt is not None else None
+
+
+def sync_epoch_columns(model, shadows: Dict[str, str]) -> None:
+    """Keep `shadows` ({datetime attribute: epoch attribute}) in step on every flush of `model`."""
+
+    def sync(mapper, connection, target) -> None:
+        for source, shadow in shadows.items():
+            setattr(target, shadow, to_epoch(getattr(target, source)))
+
+    event.listen(model, "before_insert", sync)
+    event.listen(model, "before_update", sync)
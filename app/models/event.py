@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, event
 from sqlalchemy.sql import func
 
 from app.db.session import Base
+from app.models.epoch import sync_epoch_columns
 
 
 class DownloadEvent(Base):
@@ -15,5 +18,16 @@ class DownloadEvent(Base):
     ip_address = Column(String(45), nullable=True)
     valid_at_log_time = Column(Integer, nullable=False)  # 1 valid, 0 invalid
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at_epoch = Column(Integer, nullable=False, index=True)
+
+
+@event.listens_for(DownloadEvent, "before_insert")
+def _stamp_created_at(mapper, connection, target) -> None:
+    # Set here rather than by the server default so the epoch shadow can be derived from it
+    if target.created_at is None:
+        target.created_at = datetime.now(tz=timezone.utc)
+
+
+sync_epoch_columns(DownloadEvent, {"created_at": "created_at_epoch"})
 
 
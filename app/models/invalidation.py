@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Float, Integer, String
+
+from app.db.session import Base
+
+
+class Invalidation(Base):
+    """Cache invalidations published by one worker for every other worker to apply."""
+
+    __tablename__ = "invalidations"
+
+    # AUTOINCREMENT: ids never repeat, even after pruning empties the table, so "id > last seen" is safe
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(32), nullable=False)
+    key = Column(String(255), nullable=True)  # NULL invalidates the whole topic
+    origin = Column(String(64), nullable=False)
+    published_at = Column(Float, nullable=False)  # epoch seconds, for the lag metric
+
+    __table_args__ = {"sqlite_autoincrement": True}
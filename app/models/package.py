@@ -1,7 +1,21 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, event, func, text
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
+from app.models.counter import bump_counter
+from app.models.epoch import sync_epoch_columns
+
+
+PACKAGES_CATALOG_COUNTER = "packages.catalog"
+
+LICENSE_STATUS_ACTIVE = "active"
+LICENSE_STATUS_EXPIRED = "expired"
+LICENSE_STATUS_REVOKED = "revoked"
+
+
+def license_version_counter(user_id: int) -> str:
+    """Counter bumped whenever any license owned by `user_id` changes."""
+    return f"licenses.user.{user_id}"
 
 
 class Package(Base):
@@ -18,16 +32,38 @@ class License(Base):
     __tablename__ = "licenses"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     key = Column(String(64), unique=True, nullable=False, index=True)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     revoked_at = Column(DateTime(timezone=True), nullable=True)
+    # Integer shadows of expires_at/revoked_at for comparisons and range scans
+    expires_at_epoch = Column(Integer, nullable=False, index=True)
+    revoked_at_epoch = Column(Integer, nullable=True)
     revoked_reason = Column(String(255), nullable=True)
+    # Materialized by writes and the expiry sweeper; "active" rows may lag expiry by one sweep interval
+    status = Column(String(16), nullable=False, default=LICENSE_STATUS_ACTIVE, server_default=LICENSE_STATUS_ACTIVE)
 
     # many-to-many to packages via association table
     packages = relationship("Package", secondary="license_packages")
 
+    __table_args__ = (
+        Index("ix_licenses_status_expires_at_epoch", "status", "expires_at_epoch"),
+        # Covers key -> state lookups (event ingest, batch validation) without touching the table
+        Index("ix_licenses_key_state", "key", "expires_at_epoch", "revoked_at_epoch"),
+        # Also serves plain user_id lookups, so it replaces the single-column index
+        Index("ix_licenses_user_id_expires_at_epoch", "user_id", "expires_at_epoch"),
+        # Only live rows: renewal and revocation selectors filter on revoked_at_epoch IS NULL
+        Index(
+            "ix_licenses_unrevoked_expires_at_epoch",
+            "expires_at_epoch",
+            sqlite_where=text("revoked_at_epoch IS NULL"),
+        ),
+    )
+
+
+sync_epoch_columns(License, {"expires_at": "expires_at_epoch", "revoked_at": "revoked_at_epoch"})
+
 
 class LicensePackage(Base):
     __tablename__ = "license_packages"
@@ -35,4 +71,19 @@ class LicensePackage(Base):
     license_id = Column(Integer, ForeignKey("licenses.id", ondelete="CASCADE"), primary_key=True)
     package_id = Column(Integer, ForeignKey("packages.id", ondelete="CASCADE"), primary_key=True)
 
+    # The primary key only serves license -> packages; this serves package -> licenses and the FK cascade
+    __table_args__ = (Index("ix_license_packages_package_license", "package_id", "license_id"),)
+
+
+@event.listens_for(Package, "after_insert")
+@event.listens_for(Package, "after_update")
+@event.listens_for(Package, "after_delete")
+def _package_changed(mapper, connection, target) -> None:
+    bump_counter(connection, PACKAGES_CATALOG_COUNTER)
+
 
+@event.listens_for(License, "after_insert")
+@event.listens_for(License, "after_update")
+@event.listens_for(License, "after_delete")
+def _license_changed(mapper, connection, target) -> None:
+    bump_counter(connection, license_version_counter(target.user_id))
@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, Index, event, func, select
 
 from app.db.session import Base
+from app.models.counter import bump_counter
+
+
+USERS_TOTAL_COUNTER = "users.total"
 
 
 class User(Base):
@@ -12,3 +16,22 @@ class User(Base):
     role = Column(String(20), nullable=False, server_default="user")
     balance = Column(Integer, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Case-insensitive email prefix search ranges over lower(email)
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
+
+def _count_users():
+    return select(func.count()).select_from(User.__table__)
+
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target) -> None:
+    bump_counter(connection, USERS_TOTAL_COUNTER, 1, seed=_count_users())
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target) -> None:
+    bump_counter(connection, USERS_TOTAL_COUNTER, -1, seed=_count_users())
@@ -0,0 +1,130 @@
+"""Immutable read-only records for the licensing hot path.
+
+Loaded with Core `select()` of just the needed columns, so no ORM instances,
+identity-map entries or relationship collections are built. They are plain
+tuples: cheap to allocate, hashable, and safe to cache and share.
+"""
+from array import array
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import column, select, text
+from sqlalchemy.orm import Session
+
+from app.models.epoch import to_aware_utc
+from app.models.package import License, LicensePackage, Package
+
+
+class PackageView(NamedTuple):
+    id: int
+    name: str
+    is_base: bool
+    is_deprecated: bool
+
+
+class LicenseView(NamedTuple):
+    id: int
+    key: str
+    user_id: int
+    expires_at: datetime  # aware UTC
+    revoked_at: Optional[datetime]  # aware UTC
+    revoked_reason: Optional[str]
+    # Epoch-second shadows; state is evaluated on these
+    expires_at_epoch: int
+    revoked_at_epoch: Optional[int]
+    # Ordered by package id; empty when none are attached
+    packages: Tuple[PackageView, ...] = ()
+
+
+_LICENSE_COLUMNS = (
+    License.id,
+    License.key,
+    License.user_id,
+    License.expires_at,
+    License.revoked_at,
+    License.revoked_reason,
+    License.expires_at_epoch,
+    License.revoked_at_epoch,
+)
+_PACKAGE_COLUMNS = (Package.id, Package.name, Package.is_base, Package.is_deprecated)
+
+
+def _license_view(row, packages: Tuple[PackageView, ...] = ()) -> LicenseView:
+    license_id, key, user_id, expires_at, revoked_at, revoked_reason, expires_at_epoch, revoked_at_epoch = row
+    return LicenseView(
+        license_id,
+        key,
+        user_id,
+        to_aware_utc(expires_at),
+        to_aware_utc(revoked_at),
+        revoked_reason,
+        expires_at_epoch,
+        revoked_at_epoch,
+        packages,
+    )
+
+
+def _load_views(db: Session, *criteria) -> List[LicenseView]:
+    # One outer join: a license row repeats once per attached package
+    rows = db.execute(
+        select(*_LICENSE_COLUMNS, *_PACKAGE_COLUMNS)
+        .outerjoin(LicensePackage, LicensePackage.license_id == License.id)
+        .outerjoin(Package, Package.id == LicensePackage.package_id)
+        .where(*criteria)
+        .order_by(License.id, Package.id)
+    ).all()
+    heads: Dict[int, tuple] = {}
+    packages: Dict[int, List[PackageView]] = {}
+    for row in rows:
+        license_id = row[0]
+        if license_id not in heads:
+            heads[license_id] = row[:8]
+            packages[license_id] = []
+        if row[8] is not None:
+            packages[license_id].append(PackageView(*row[8:]))
+    return [_license_view(head, tuple(packages[license_id])) for license_id, head in heads.items()]
+
+
+def load_license_view(db: Session, key: str) -> Optional[LicenseView]:
+    views = _load_views(db, License.key == key)
+    return views[0] if views else None
+
+
+def load_user_license_views(db: Session, user_id: int) -> List[LicenseView]:
+    return _load_views(db, License.user_id == user_id)
+
+
+class LicenseColumns(NamedTuple):
+    """Parallel columns for batch evaluation; times are epoch seconds, 0 for a NULL revoked_at."""
+
+    ids: array
+    keys: List[str]
+    expires_at: array
+    revoked_at: array
+
+
+def _key_states_query(db: Session, keys: List[str]):
+    if db.get_bind().dialect.name != "sqlite":
+        return select(License.id, License.key, License.expires_at_epoch, License.revoked_at_epoch).where(
+            License.key.in_(keys)
+        )
+    # SQLite prefers the unique key index for equality, which costs a table lookup per key;
+    # pin the covering index so the state is read from the index alone. The SQLite compiler
+    # drops with_hint(), so the hint goes into the FROM clause itself.
+    key = column("key")
+    return (
+        select(column("id"), key, column("expires_at_epoch"), column("revoked_at_epoch"))
+        .select_from(text("licenses INDEXED BY ix_licenses_key_state"))
+        .where(key.in_(keys))
+    )
+
+
+def load_license_columns(db: Session, keys: Sequence[str]) -> LicenseColumns:
+    columns = LicenseColumns(array("q"), [], array("q"), array("q"))
+    rows = db.execute(_key_states_query(db, list(keys)))
+    for license_id, key, expires_at, revoked_at in rows:
+        columns.ids.append(license_id)
+        columns.keys.append(key)
+        columns.expires_at.append(expires_at)
+        columns.revoked_at.append(revoked_at or 0)
+    return columns
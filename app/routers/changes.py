@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.settings import settings
+from app.core.singleflight import AsyncSingleFlight
+from app.db.session import SessionLocal
+from app.models.change import ChangeLogEntry
+from app.schemas.change import ChangeFeed, ChangeOut
+from app.security.deps import require_admin_id
+
+
+router = APIRouter()
+
+_HEARTBEAT_SECONDS = 15.0
+
+# Consumers that are caught up poll with the same cursor at the same moment; they share one read
+_polls = AsyncSingleFlight("change_feed")
+
+EntityFilter = Optional[Literal["license", "package"]]
+
+
+def _to_out(entry: ChangeLogEntry) -> ChangeOut:
+    return ChangeOut(
+        seq=entry.seq,
+        entity=entry.entity,
+        entity_id=entry.entity_id,
+        op=entry.op,
+        key=entry.key,
+        data=json.loads(entry.data),
+        created_at=entry.created_at,
+    )
+
+
+def _read_changes(after: int, limit: int, entity: EntityFilter) -> List[ChangeOut]:
+    # A short session per poll: waiting requests must not pin pooled connections
+    db = SessionLocal()
+    try:
+        query = db.query(ChangeLogEntry).filter(ChangeLogEntry.seq > after)
+        if entity is not None:
+            query = query.filter(ChangeLogEntry.entity == entity)
+        return [_to_out(entry) for entry in query.order_by(ChangeLogEntry.seq).limit(limit).all()]
+    finally:
+        db.close()
+
+
+@router.get("/", response_model=ChangeFeed)
+async def poll_changes(
+    after: int = Query(default=0, ge=0, description="Return changes with seq greater than this"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    wait: float = Query(default=0.0, ge=0.0, le=30.0, description="Seconds to wait for a change when none is pending"),
+    entity: EntityFilter = None,
+    _: int = Depends(require_admin_id),
+) -> ChangeFeed:
+    deadline = time.monotonic() + wait
+    while True:
+        changes = await _polls.do((after, limit, entity), lambda: run_in_threadpool(_read_changes, after, limit, entity))
+        if changes or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(min(settings.change_feed_poll_interval_seconds, max(0.0, deadline - time.monotonic())))
+    return ChangeFeed(changes=changes, next_seq=changes[-1].seq if changes else after)
+
+
+async def _sse_events(request: Request, after: int, entity: EntityFilter, max_seconds: float) -> AsyncIterator[bytes]:
+    deadline = time.monotonic() + max_seconds
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline and not await request.is_disconnected():
+        changes = await _polls.do((after, 500, entity), lambda: run_in_threadpool(_read_changes, after, 500, entity))
+        for change in changes:
+            yield f"id: {change.seq}\nevent: {change.entity}.{change.op}\ndata: {change.model_dump_json()}\n\n".encode()
+        if changes:
+            after = changes[-1].seq
+            last_sent = time.monotonic()
+            continue
+        if time.monotonic() - last_sent >= _HEARTBEAT_SECONDS:
+            # Comment line keeps proxies from closing an idle stream
+            yield b": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(min(settings.change_feed_poll_interval_seconds, max(0.0, deadline - time.monotonic())))
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    after: int = Query(default=0, ge=0),
+    entity: EntityFilter = None,
+    max_seconds: float = Query(default=300.0, gt=0, le=3600, description="Close after this long; clients reconnect"),
+    last_event_id: Optional[int] = Header(default=None, ge=0),
+    _: int = Depends(require_admin_id),
+):
+    """Server-sent events, one per change with the seq as event id; reconnecting with Last-Event-ID resumes."""
+    if last_event_id is not None:
+        after = max(after, last_event_id)
+    return StreamingResponse(
+        _sse_events(request, after, entity, max_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,21 +1,33 @@
-from datetime import datetime, timezone
-from typing import List, Optional
+import time
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
 from sqlalchemy.orm import Session
 
+from app.core.responses import json_list_response
+from app.core.settings import settings
 from app.db.session import get_db
+from app.db.shards import event_shards, merge_sorted
 from app.models.event import DownloadEvent
-from app.models.package import License
+from app.models.views import load_license_columns
 from app.schemas.event import DownloadEventCreate, DownloadEventOut
 from app.security.deps import get_current_user, require_admin
+from app.services.entitlements import STATUS_CODE_ACTIVE, evaluate_batch
 
 
 router = APIRouter()
 
 
-def _utcnow() -> datetime:
-    return datetime.now(tz=timezone.utc)
+def _shard_for_event(routing_key: str) -> int:
+    if settings.event_shard_strategy == "time":
+        return event_shards.index_for_time(time.time(), settings.event_shard_period_seconds)
+    return event_shards.index_for_key(routing_key)
+
+
+def _event_out(evt: DownloadEvent, index: int) -> DownloadEventOut:
+    out = DownloadEventOut.model_validate(evt)
+    out.id = event_shards.global_id(evt.id, index)
+    return out
 
 
 @router.post("/events", response_model=DownloadEventOut, status_code=status.HTTP_201_CREATED)
@@ -28,9 +40,8 @@ def log_download_event(
     # Determine validity of license key at log time (if provided)
     valid = False
     if payload.license_key:
-        lic: Optional[License] = db.query(License).filter(License.key == payload.license_key).first()
-        if lic and lic.revoked_at is None and lic.expires_at > _utcnow():
-            valid = True
+        columns = load_license_columns(db, [payload.license_key])
+        valid = bool(columns.ids) and evaluate_batch(columns.expires_at, columns.revoked_at)[0] == STATUS_CODE_ACTIVE
 
     client_ip = payload.ip_address or request.client.host if request.client else None
 
@@ -42,10 +53,16 @@ def log_download_event(
         ip_address=client_ip,
         valid_at_log_time=1 if valid else 0,
     )
-    db.add(evt)
-    db.commit()
-    db.refresh(evt)
-    return evt
+    index = _shard_for_event(payload.license_key or client_ip or payload.package_name)
+    shard_db = db if len(event_shards) == 1 else event_shards.session(index)
+    try:
+        shard_db.add(evt)
+        shard_db.commit()
+        shard_db.refresh(evt)
+        return _event_out(evt, index)
+    finally:
+        if shard_db is not db:
+            shard_db.close()
 
 
 @router.get("/events", response_model=List[DownloadEventOut])
@@ -57,14 +74,27 @@ def list_download_events(
     license_key: Optional[str] = None,
     package_name: Optional[str] = None,
     valid: Optional[bool] = None,
-) -> List[DownloadEventOut]:
-    query = db.query(DownloadEvent)
-    if license_key:
-        query = query.filter(DownloadEvent.license_key == license_key)
-    if package_name:
-        query = query.filter(DownloadEvent.package_name == package_name)
-    if valid is not None:
-        query = query.filter(DownloadEvent.valid_at_log_time == (1 if valid else 0))
-    return query.order_by(DownloadEvent.id.desc()).offset(offset).limit(limit).all()
-
+) -> Response:
+    def page(shard_db: Session, index: int, skip: int = 0, take: int = offset + limit) -> List[Tuple[int, DownloadEventOut]]:
+        query = shard_db.query(DownloadEvent)
+        if license_key:
+            query = query.filter(DownloadEvent.license_key == license_key)
+        if package_name:
+            query = query.filter(DownloadEvent.package_name == package_name)
+        if valid is not None:
+            query = query.filter(DownloadEvent.valid_at_log_time == (1 if valid else 0))
+        # Newest first by the integer shadow, a backwards scan of its index (ties broken by rowid)
+        rows = query.order_by(DownloadEvent.created_at_epoch.desc(), DownloadEvent.id.desc()).offset(skip).limit(take)
+        return [(evt.created_at_epoch, _event_out(evt, index)) for evt in rows]
 
+    if len(event_shards) == 1:
+        ranked = page(db, 0, skip=offset, take=limit)
+    else:
+        # Each shard returns its first offset+limit rows and the merge cuts the page
+        # Events that carry a license key are hashed by it, so a key filter hits one shard
+        targeted = license_key and settings.event_shard_strategy == "hash"
+        shards = [event_shards.index_for_key(license_key)] if targeted else None
+        ranked = merge_sorted(
+            event_shards.scatter(page, shards), key=lambda r: (r[0], r[1].id), reverse=True, offset=offset, limit=limit
+        )
+    return json_list_response(DownloadEventOut, [out for _, out in ranked])
@@ -1,15 +1,38 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Dict, Iterator, List, Literal, Optional
 import secrets
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Query as OrmQuery, Session
 
+from app.cache.factory import cache
+from app.core.invalidation import TOPIC_LICENSE, TOPIC_PACKAGE, bus
+from app.core.responses import json_list_response
 from app.core.settings import settings
-from app.db.session import get_db
-from app.models.package import Package, License, LicensePackage
+from app.db.session import SessionLocal, get_db
+from app.models.counter import bump_counter
+from app.models.package import (
+    Package,
+    License,
+    LicensePackage,
+    LICENSE_STATUS_ACTIVE,
+    LICENSE_STATUS_EXPIRED,
+    LICENSE_STATUS_REVOKED,
+    license_version_counter,
+)
 from app.models.user import User
+from app.models.epoch import to_epoch
+from app.models.views import LicenseView, load_license_columns, load_license_view
 from app.schemas.license import (
+    LicenseBulkExtendRequest,
+    LicenseBulkResult,
+    LicenseBulkRevokeRequest,
+    LicenseBatchValidateItem,
+    LicenseBatchValidateRequest,
+    LicenseBatchValidateResponse,
+    LicenseBulkSelector,
     LicenseCreateRequest,
     LicenseExtendRequest,
     LicenseRevokeRequest,
@@ -18,19 +41,32 @@ from app.schemas.license import (
     LicensePackagesRequest,
     LicensePackagesResponse,
     LicenseRecord,
+    LicenseStatusCounts,
 )
 from app.security.deps import require_admin
+from app.services.entitlements import STATUS_NAMES, evaluate, evaluate_batch, license_status, now_epoch
+from app.services.changes import (
+    CHANGE_OP_CREATED,
+    CHANGE_OP_EXTENDED,
+    CHANGE_OP_REVOKED,
+    record_license_change,
+    record_license_changes,
+)
 
 
 router = APIRouter()
 
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+_BULK_CHUNK_SIZE = 500
+
 
 def _utcnow() -> datetime:
     return datetime.now(tz=timezone.utc)
 
 
-def _license_to_record(lic: License) -> LicenseRecord:
-    package_ids = [p.id for p in getattr(lic, "packages", [])]
+def _license_to_record(lic: License, package_ids: Optional[List[int]] = None) -> LicenseRecord:
+    if package_ids is None:
+        package_ids = [p.id for p in getattr(lic, "packages", [])]
     return LicenseRecord(
         id=lic.id,
         key=lic.key,
@@ -42,14 +78,6 @@ def _license_to_record(lic: License) -> LicenseRecord:
     )
 
 
-def _to_aware_utc(dt: Optional[datetime]) -> Optional[datetime]:
-    if dt is None:
-        return None
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
-
 @router.post("/", response_model=LicenseRecord, status_code=status.HTTP_201_CREATED)
 def create_license(
     payload: LicenseCreateRequest,
@@ -80,16 +108,216 @@ def create_license(
     # Use relationship to manage association rows efficiently
     lic.packages = packages
     db.add(lic)
+    record_license_change(db, CHANGE_OP_CREATED, lic, [p.id for p in packages])
     db.commit()
     db.refresh(lic)
+    bus.publish(TOPIC_LICENSE, lic.key)
 
     return _license_to_record(lic)
 
 
+def _status_criteria(status_name: str, now: int):
+    """Status predicate over the materialized column, covering rows the sweeper has not reached yet."""
+    if status_name == LICENSE_STATUS_REVOKED:
+        return License.status == LICENSE_STATUS_REVOKED
+    if status_name == LICENSE_STATUS_EXPIRED:
+        return or_(
+            License.status == LICENSE_STATUS_EXPIRED,
+            and_(License.status == LICENSE_STATUS_ACTIVE, License.expires_at_epoch <= now),
+        )
+    return and_(License.status == LICENSE_STATUS_ACTIVE, License.expires_at_epoch > now)
+
+
+def _status_after_extend(lic: License, now: datetime) -> str:
+    return license_status(to_epoch(lic.expires_at), to_epoch(lic.revoked_at), to_epoch(now))
+
+
+def _filter_licenses(
+    query: OrmQuery,
+    user_id: Optional[int] = None,
+    package_id: Optional[int] = None,
+    expiring_before: Optional[datetime] = None,
+) -> OrmQuery:
+    if user_id is not None:
+        query = query.filter(License.user_id == user_id)
+    if package_id is not None:
+        # Uncorrelated so SQLite drives from ix_license_packages_package_license instead of walking licenses
+        holders = select(LicensePackage.license_id).where(LicensePackage.package_id == package_id)
+        query = query.filter(License.id.in_(holders))
+    if expiring_before is not None:
+        query = query.filter(License.expires_at_epoch < to_epoch(expiring_before))
+    return query
+
+
+def _package_ids_by_license(db: Session, license_ids: List[int]) -> Dict[int, List[int]]:
+    """Fetch association rows for a page of licenses in one batched query."""
+    package_ids: Dict[int, List[int]] = {lid: [] for lid in license_ids}
+    if not license_ids:
+        return package_ids
+    rows = (
+        db.query(LicensePackage.license_id, LicensePackage.package_id)
+        .filter(LicensePackage.license_id.in_(license_ids))
+        .order_by(LicensePackage.license_id, LicensePackage.package_id)
+        .all()
+    )
+    for license_id, package_id in rows:
+        package_ids[license_id].append(package_id)
+    return package_ids
+
+
 @router.get("/", response_model=List[LicenseRecord])
-def list_licenses(_: User = Depends(require_admin), db: Session = Depends(get_db)) -> List[LicenseRecord]:
-    licenses = db.query(License).options(joinedload(License.packages)).all()
-    return [_license_to_record(lic) for lic in licenses]
+def list_licenses(
+    _: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+    limit: int = Query(default=100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    status_filter: Optional[Literal["active", "expired", "revoked"]] = Query(default=None, alias="status"),
+    package_id: Optional[int] = None,
+    expiring_before: Optional[datetime] = None,
+) -> Response:
+    # Keyset pagination on the primary key: pass the last id of a page as `after_id`
+    query = _filter_licenses(
+        db.query(License), user_id=user_id, package_id=package_id, expiring_before=expiring_before
+    )
+    if after_id is not None:
+        query = query.filter(License.id > after_id)
+    if status_filter is not None:
+        query = query.filter(_status_criteria(status_filter, now_epoch()))
+
+    licenses = query.order_by(License.id).limit(limit).all()
+    package_ids = _package_ids_by_license(db, [lic.id for lic in licenses])
+    headers = {"X-Next-Cursor": str(licenses[-1].id)} if len(licenses) == limit else None
+    return json_list_response(
+        LicenseRecord, [_license_to_record(lic, package_ids[lic.id]) for lic in licenses], headers=headers
+    )
+
+
+def _select_bulk_targets(db: Session, payload: LicenseBulkSelector, unrevoked_only: bool = False) -> List[int]:
+    if not (payload.license_ids or payload.user_id is not None or payload.package_id is not None or payload.expiring_before):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one license selector is required")
+    query = _filter_licenses(
+        db.query(License.id),
+        user_id=payload.user_id,
+        package_id=payload.package_id,
+        expiring_before=payload.expiring_before,
+    )
+    if unrevoked_only:
+        query = query.filter(License.revoked_at_epoch.is_(None))
+    if not payload.license_ids:
+        # Sorted here rather than by ORDER BY id, which would steer SQLite into a rowid scan over the filter indexes
+        return sorted(lid for (lid,) in query.all())
+    license_ids: List[int] = []
+    unique_ids = sorted(set(payload.license_ids))
+    for start in range(0, len(unique_ids), _BULK_CHUNK_SIZE):
+        chunk = unique_ids[start : start + _BULK_CHUNK_SIZE]
+        license_ids.extend(lid for (lid,) in query.filter(License.id.in_(chunk)).order_by(License.id).all())
+    return license_ids
+
+
+def _bulk_update(db: Session, license_ids: List[int], op: str, values: dict, *criteria) -> int:
+    """Apply one set-based UPDATE per id chunk, log the changes and bump the owners' license versions, then commit."""
+    affected = 0
+    user_ids = set()
+    for start in range(0, len(license_ids), _BULK_CHUNK_SIZE):
+        chunk = license_ids[start : start + _BULK_CHUNK_SIZE]
+        result = db.execute(
+            update(License).where(License.id.in_(chunk), *criteria).values(**values).execution_options(synchronize_session=False)
+        )
+        affected += result.rowcount
+        user_ids.update(uid for (uid,) in db.query(License.user_id).filter(License.id.in_(chunk)).distinct())
+    record_license_changes(db, op, license_ids)
+    conn = db.connection()
+    for user_id in user_ids:
+        bump_counter(conn, license_version_counter(user_id))
+    db.commit()
+    if affected:
+        # One topic-wide message instead of one per key
+        bus.publish(TOPIC_LICENSE)
+    return affected
+
+
+def _stream_license_records(license_ids: List[int]) -> Iterator[bytes]:
+    # Runs after the request's session is closed, so it reads through its own session
+    db = SessionLocal()
+    try:
+        for start in range(0, len(license_ids), _BULK_CHUNK_SIZE):
+            chunk = license_ids[start : start + _BULK_CHUNK_SIZE]
+            licenses = db.query(License).filter(License.id.in_(chunk)).order_by(License.id).all()
+            package_ids = _package_ids_by_license(db, chunk)
+            for lic in licenses:
+                yield _license_to_record(lic, package_ids[lic.id]).model_dump_json().encode() + b"\n"
+    finally:
+        db.close()
+
+
+def _bulk_response(payload: LicenseBulkSelector, license_ids: List[int], affected: int):
+    if payload.stream:
+        return StreamingResponse(
+            _stream_license_records(license_ids),
+            media_type="application/x-ndjson",
+            headers={"X-Affected-Count": str(affected)},
+        )
+    return LicenseBulkResult(affected=affected)
+
+
+def _extended_expiry(db: Session, extra_days: int):
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite stores datetimes as text; shift them with its date functions
+        return func.strftime("%Y-%m-%d %H:%M:%f", License.expires_at, f"+{extra_days} days")
+    return License.expires_at + timedelta(days=extra_days)
+
+
+@router.post("/bulk/extend", response_model=LicenseBulkResult)
+def bulk_extend_licenses(
+    payload: LicenseBulkExtendRequest,
+    _: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    license_ids = _select_bulk_targets(db, payload)
+    # Core UPDATEs bypass the ORM, so the epoch shadow is shifted alongside the datetime
+    new_expiry_epoch = License.expires_at_epoch + payload.extra_days * 86400
+    new_status = case(
+        (License.revoked_at_epoch.is_not(None), LICENSE_STATUS_REVOKED),
+        (new_expiry_epoch > now_epoch(), LICENSE_STATUS_ACTIVE),
+        else_=LICENSE_STATUS_EXPIRED,
+    )
+    values = {
+        "expires_at": _extended_expiry(db, payload.extra_days),
+        "expires_at_epoch": new_expiry_epoch,
+        "status": new_status,
+    }
+    affected = _bulk_update(db, license_ids, CHANGE_OP_EXTENDED, values)
+    return _bulk_response(payload, license_ids, affected)
+
+
+@router.post("/bulk/revoke", response_model=LicenseBulkResult)
+def bulk_revoke_licenses(
+    payload: LicenseBulkRevokeRequest,
+    _: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    license_ids = _select_bulk_targets(db, payload, unrevoked_only=True)
+    now = _utcnow()
+    values = {
+        "revoked_at": now,
+        "revoked_at_epoch": to_epoch(now),
+        "revoked_reason": payload.reason,
+        "status": LICENSE_STATUS_REVOKED,
+    }
+    affected = _bulk_update(db, license_ids, CHANGE_OP_REVOKED, values, License.revoked_at_epoch.is_(None))
+    return _bulk_response(payload, license_ids, affected)
+
+
+@router.get("/stats", response_model=LicenseStatusCounts)
+def license_status_counts(_: User = Depends(require_admin), db: Session = Depends(get_db)) -> LicenseStatusCounts:
+    # Each count is answered from the (status, expires_at_epoch) index without touching table rows
+    now = now_epoch()
+    counts = {
+        name: db.query(func.count()).select_from(License).filter(_status_criteria(name, now)).scalar()
+        for name in (LICENSE_STATUS_ACTIVE, LICENSE_STATUS_EXPIRED, LICENSE_STATUS_REVOKED)
+    }
+    return LicenseStatusCounts(**counts)
 
 
 @router.post("/{license_id}/revoke", response_model=LicenseRecord)
@@ -106,9 +334,12 @@ def revoke_license(
         return _license_to_record(lic)
     lic.revoked_at = _utcnow()
     lic.revoked_reason = payload.reason
+    lic.status = LICENSE_STATUS_REVOKED
     db.add(lic)
+    record_license_change(db, CHANGE_OP_REVOKED, lic)
     db.commit()
     db.refresh(lic)
+    bus.publish(TOPIC_LICENSE, lic.key)
     return _license_to_record(lic)
 
 
@@ -123,67 +354,93 @@ def extend_license(
     if not lic:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
     lic.expires_at = lic.expires_at + timedelta(days=payload.extra_days)
+    lic.status = _status_after_extend(lic, _utcnow())
     db.add(lic)
+    record_license_change(db, CHANGE_OP_EXTENDED, lic)
     db.commit()
     db.refresh(lic)
+    bus.publish(TOPIC_LICENSE, lic.key)
     return _license_to_record(lic)
 
 
+# Every snapshot carries both tags: bulk license updates drop them all, and so
+# does any package change since the names depend on deprecation
+_LICENSES_TAG = "licenses"
+_LICENSE_PACKAGES_TAG = "license-packages"
+
+
+def _snapshot_key(license_key: str) -> str:
+    return f"license:{license_key}"
+
+
+def _drop_license_snapshots(license_key: Optional[str]) -> None:
+    if license_key is None:
+        cache.invalidate_tag(_LICENSES_TAG)
+    else:
+        cache.delete(_snapshot_key(license_key))
+
+
+bus.subscribe(TOPIC_LICENSE, _drop_license_snapshots)
+bus.subscribe(TOPIC_PACKAGE, lambda package_id: cache.invalidate_tag(_LICENSE_PACKAGES_TAG))
+
+
+def _license_snapshot(db: Session, license_key: str) -> Optional[LicenseView]:
+    # Unknown keys are not cached, so guessed keys cannot push real snapshots out
+    return cache.get_or_set(
+        _snapshot_key(license_key),
+        lambda: load_license_view(db, license_key),
+        tags=(_LICENSES_TAG, _LICENSE_PACKAGES_TAG),
+        cacheable=lambda view: view is not None,
+    )
+
+
 @router.post("/validate", response_model=LicenseValidateResponse)
 def validate_license(payload: LicenseValidateRequest, db: Session = Depends(get_db)) -> LicenseValidateResponse:
-    lic: Optional[License] = db.query(License).filter(License.key == payload.key).first()
-    if not lic:
+    snapshot = _license_snapshot(db, payload.key)
+    if snapshot is None:
         return LicenseValidateResponse(valid=False)
-    now = _utcnow()
-    expires_at = _to_aware_utc(lic.expires_at)
-    revoked_at = _to_aware_utc(lic.revoked_at)
-    if revoked_at is not None:
-        return LicenseValidateResponse(valid=False, expires_at=expires_at, revoked_at=revoked_at, reason=lic.revoked_reason)
-    if expires_at <= now:
-        return LicenseValidateResponse(valid=False, expires_at=expires_at)
-    return LicenseValidateResponse(valid=True, expires_at=expires_at)
+    # Evaluated against the current time, so a cached snapshot never goes stale by expiring
+    entitlement = evaluate(snapshot)
+    if entitlement.status == LICENSE_STATUS_REVOKED:
+        return LicenseValidateResponse(
+            valid=False, expires_at=snapshot.expires_at, revoked_at=snapshot.revoked_at, reason=snapshot.revoked_reason
+        )
+    return LicenseValidateResponse(valid=entitlement.valid, expires_at=snapshot.expires_at)
 
 
-@router.post("/packages", response_model=LicensePackagesResponse)
-def license_packages(payload: LicensePackagesRequest, db: Session = Depends(get_db)) -> LicensePackagesResponse:
-    lic: Optional[License] = (
-        db.query(License).options(joinedload(License.packages)).filter(License.key == payload.key).first()
+@router.post("/validate/batch", response_model=LicenseBatchValidateResponse)
+def validate_licenses_batch(
+    payload: LicenseBatchValidateRequest, db: Session = Depends(get_db)
+) -> LicenseBatchValidateResponse:
+    """Status of up to 1000 keys from one query; unknown keys are reported as invalid with no status."""
+    keys = list(dict.fromkeys(payload.keys))
+    columns = load_license_columns(db, keys)
+    codes = evaluate_batch(columns.expires_at, columns.revoked_at)
+    found = {key: STATUS_NAMES[code] for key, code in zip(columns.keys, codes)}
+    return LicenseBatchValidateResponse(
+        results=[
+            LicenseBatchValidateItem(key=key, valid=found.get(key) == LICENSE_STATUS_ACTIVE, status=found.get(key))
+            for key in keys
+        ]
     )
-    if not lic:
+
+
+def _accessible_packages(db: Session, license_key: str) -> LicensePackagesResponse:
+    snapshot = _license_snapshot(db, license_key)
+    if snapshot is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
-    # Enforce that only valid (not revoked, not expired) licenses can access packages
-    now = _utcnow()
-    expires_at = _to_aware_utc(lic.expires_at)
-    revoked_at = _to_aware_utc(lic.revoked_at)
-    if revoked_at is not None or expires_at <= now:
+    # Only valid (not revoked, not expired) licenses can access packages
+    entitlement = evaluate(snapshot)
+    if not entitlement.valid:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="License not valid")
-    # Must have exactly one base in current license to access add-ons
-    packages = [p for p in lic.packages if p.is_deprecated == False]
-    base_count = sum(1 for p in packages if p.is_base)
-    if base_count != 1:
-        # Only return base if invalid add-on configuration
-        packages = [p for p in packages if p.is_base]
-    names = [p.name for p in packages]
-    return LicensePackagesResponse(key=lic.key, package_names=names)
+    return LicensePackagesResponse(key=snapshot.key, package_names=entitlement.package_names)
 
 
+@router.post("/packages", response_model=LicensePackagesResponse)
+def license_packages(payload: LicensePackagesRequest, db: Session = Depends(get_db)) -> LicensePackagesResponse:
+    return _accessible_packages(db, payload.key)
+
 
 @router.get("/{license_key}/packages", response_model=LicensePackagesResponse)
 def license_packages_get(license_key: str, db: Session = Depends(get_db)) -> LicensePackagesResponse:
-    lic: Optional[License] = (
-        db.query(License).options(joinedload(License.packages)).filter(License.key == license_key).first()
-    )
-    if not lic:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="License not found")
-    now = _utcnow()
-    expires_at = _to_aware_utc(lic.expires_at)
-    revoked_at = _to_aware_utc(lic.revoked_at)
-    if revoked_at is not None or expires_at <= now:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="License not valid")
-    packages = [p for p in lic.packages if p.is_deprecated == False]
-    base_count = sum(1 for p in packages if p.is_base)
-    if base_count != 1:
-        packages = [p for p in packages if p.is_base]
-    names = [p.name for p in packages]
-    return LicensePackagesResponse(key=lic.key, package_names=names)
-
+    return _accessible_packages(db, license_key)
@@ -1,38 +1,54 @@
 from typing import List
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.orm import Session
 
+from app.core.responses import etag_matches
 from app.db.session import get_db
-from app.models.package import License
+from app.models.counter import read_counters
+from app.models.package import PACKAGES_CATALOG_COUNTER, license_version_counter
+from app.models.views import load_user_license_views
 from app.security.deps import get_current_user
+from app.services.entitlements import accessible_packages
 from app.schemas.license import LicenseMyRecord
 
 
 router = APIRouter()
 
 
-@router.get("/me/licenses", response_model=List[LicenseMyRecord])
-def my_licenses(db: Session = Depends(get_db), user=Depends(get_current_user)) -> List[LicenseMyRecord]:
-    licenses = (
-        db.query(License)
-        .options(joinedload(License.packages))
-        .filter(License.user_id == user.id)
-        .all()
-    )
-    result: List[LicenseMyRecord] = []
-    for lic in licenses:
-        package_names = [p.name for p in lic.packages if p.is_deprecated == False]
-        result.append(
-            LicenseMyRecord(
-                id=lic.id,
-                key=lic.key,
-                expires_at=lic.expires_at,
-                revoked_at=lic.revoked_at,
-                revoked_reason=lic.revoked_reason,
-                package_names=package_names,
-            )
+def _my_licenses_etag(db: Session, user_id: int) -> str:
+    version_key = license_version_counter(user_id)
+    versions = read_counters(db, [version_key, PACKAGES_CATALOG_COUNTER])
+    return f'"{user_id}-{versions[version_key]}-{versions[PACKAGES_CATALOG_COUNTER]}"'
+
+
+def _load_my_licenses(db: Session, user_id: int) -> List[LicenseMyRecord]:
+    """Built from column-only views; no ORM instances are loaded."""
+    return [
+        LicenseMyRecord(
+            id=view.id,
+            key=view.key,
+            expires_at=view.expires_at,
+            revoked_at=view.revoked_at,
+            revoked_reason=view.revoked_reason,
+            # Same package rule as the license lookups, shown whatever the license's state
+            package_names=[p.name for p in accessible_packages(view.packages)],
         )
-    return result
+        for view in load_user_license_views(db, user_id)
+    ]
 
 
+@router.get("/me/licenses", response_model=List[LicenseMyRecord])
+def my_licenses(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    # The ETag only moves when one of the user's licenses or the package catalog changes
+    etag = _my_licenses_etag(db, user.id)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return _load_my_licenses(db, user.id)
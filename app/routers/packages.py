@@ -1,21 +1,97 @@
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import distinct, func, select
 from sqlalchemy.orm import Session
 
+from app.cache.factory import cache
+from app.core.compression import available_encodings, compress, negotiate_encoding
+from app.core.invalidation import TOPIC_PACKAGE, bus
+from app.core.responses import etag_matches, json_list_response, list_adapter
+from app.core.settings import settings
 from app.db.session import get_db
-from app.models.package import Package
-from app.schemas.package import PackageCreate, PackageOut
+from app.models.counter import read_counter
+from app.models.epoch import to_aware_utc
+from app.models.package import License, LicensePackage, Package, PACKAGES_CATALOG_COUNTER
+from app.models.user import User
+from app.schemas.package import PackageCreate, PackageEntitlementCounts, PackageEntitlementOut, PackageOut
 from app.security.deps import require_admin
+from app.services.changes import (
+    CHANGE_OP_CREATED,
+    CHANGE_OP_DEPRECATED,
+    CHANGE_OP_UNDEPRECATED,
+    record_package_change,
+)
+from app.services.entitlements import now_epoch
 
 router = APIRouter()
 
-@router.get("/", response_model=List[PackageOut])
-def list_packages(include_deprecated: bool = False, db: Session = Depends(get_db)) -> List[PackageOut]:
+
+class _CatalogSnapshot(NamedTuple):
+    version: int
+    etag: str
+    # Serialized body keyed by content-coding; "identity" is uncompressed
+    variants: Dict[str, bytes]
+
+
+# One cached snapshot per include_deprecated flag, rebuilt when the catalog counter moves
+_CATALOG_TAG = "catalog"
+
+
+def _drop_catalog_snapshots(package_id: Optional[str]) -> None:
+    # The counter already catches changes from other workers on the next read;
+    # this also covers a counter that restarted (e.g. a recreated database)
+    cache.invalidate_tag(_CATALOG_TAG)
+
+
+bus.subscribe(TOPIC_PACKAGE, _drop_catalog_snapshots)
+
+
+def _catalog_key(include_deprecated: bool) -> str:
+    return f"catalog:{int(include_deprecated)}"
+
+
+def _catalog_snapshot(db: Session, include_deprecated: bool) -> _CatalogSnapshot:
+    version = read_counter(db, PACKAGES_CATALOG_COUNTER) or 0
+    snapshot = cache.get(_catalog_key(include_deprecated))
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
     query = db.query(Package)
     if not include_deprecated:
         query = query.filter(Package.is_deprecated == False)
-    return query.all()
+    adapter = list_adapter(PackageOut)
+    body = adapter.dump_json(adapter.validate_python(query.order_by(Package.id).all(), from_attributes=True))
+    variants = {"identity": body}
+    if settings.compression_enabled and len(body) >= settings.compression_minimum_size:
+        for encoding in available_encodings():
+            variants[encoding] = compress(body, encoding, settings.compression_level, settings.compression_brotli_quality)
+    snapshot = _CatalogSnapshot(version, f"catalog-{version}-{int(include_deprecated)}", variants)
+    cache.set(_catalog_key(include_deprecated), snapshot, tags=(_CATALOG_TAG,))
+    return snapshot
+
+
+@router.get("/", response_model=List[PackageOut])
+def list_packages(request: Request, include_deprecated: bool = False, db: Session = Depends(get_db)) -> Response:
+    # Served from a serialized, precompressed snapshot so hot catalog reads never re-encode
+    snapshot = _catalog_snapshot(db, include_deprecated)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding not in snapshot.variants:
+        encoding = None
+    etag = f'"{snapshot.etag}-{encoding}"' if encoding else f'"{snapshot.etag}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=snapshot.variants[encoding or "identity"], media_type="application/json", headers=headers)
+
+
+def _get_package_or_404(db: Session, package_id: int) -> Package:
+    pkg: Optional[Package] = db.query(Package).filter(Package.id == package_id).first()
+    if not pkg:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Package not found")
+    return pkg
 
 
 @router.post("/", response_model=PackageOut, status_code=status.HTTP_201_CREATED)
@@ -30,36 +106,99 @@ def create_package(payload: PackageCreate, _: None = Depends(require_admin), db:
         is_deprecated=payload.is_deprecated,
     )
     db.add(pkg)
+    record_package_change(db, CHANGE_OP_CREATED, pkg)
     db.commit()
     db.refresh(pkg)
+    bus.publish(TOPIC_PACKAGE, pkg.id)
     return pkg
 
 
 @router.post("/{package_id}/deprecate", response_model=PackageOut)
 def deprecate_package(package_id: int, _: None = Depends(require_admin), db: Session = Depends(get_db)) -> PackageOut:
-    pkg: Optional[Package] = db.query(Package).filter(Package.id == package_id).first()
-    if not pkg:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Package not found")
+    pkg = _get_package_or_404(db, package_id)
     if pkg.is_deprecated:
         return pkg
     pkg.is_deprecated = True
     db.add(pkg)
+    record_package_change(db, CHANGE_OP_DEPRECATED, pkg)
     db.commit()
     db.refresh(pkg)
+    bus.publish(TOPIC_PACKAGE, pkg.id)
     return pkg
 
 
 @router.post("/{package_id}/undeprecate", response_model=PackageOut)
 def undeprecate_package(package_id: int, _: None = Depends(require_admin), db: Session = Depends(get_db)) -> PackageOut:
-    pkg: Optional[Package] = db.query(Package).filter(Package.id == package_id).first()
-    if not pkg:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Package not found")
+    pkg = _get_package_or_404(db, package_id)
     if not pkg.is_deprecated:
         return pkg
     pkg.is_deprecated = False
     db.add(pkg)
+    record_package_change(db, CHANGE_OP_UNDEPRECATED, pkg)
     db.commit()
     db.refresh(pkg)
+    bus.publish(TOPIC_PACKAGE, pkg.id)
     return pkg
 
 
+def _active_holders(package_id: int):
+    """Criteria for active licenses holding the package.
+
+    Tested on the epoch columns rather than the materialized status, which leaves the
+    package equality as the selective term so SQLite drives from
+    ix_license_packages_package_license in license id order.
+    """
+    return (
+        LicensePackage.package_id == package_id,
+        License.revoked_at_epoch.is_(None),
+        License.expires_at_epoch > now_epoch(),
+    )
+
+
+@router.get("/{package_id}/entitlements", response_model=List[PackageEntitlementOut])
+def list_package_entitlements(
+    package_id: int,
+    _: None = Depends(require_admin),
+    db: Session = Depends(get_db),
+    limit: int = Query(default=100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+) -> Response:
+    """Active licenses (and their owners) that hold the package, e.g. to review before deprecating it."""
+    _get_package_or_404(db, package_id)
+    # Keyset pagination on the license id: pass the last `license_id` of a page as `after_id`
+    query = (
+        select(LicensePackage.license_id, License.key, License.user_id, User.email, License.expires_at)
+        .join(License, License.id == LicensePackage.license_id)
+        .join(User, User.id == License.user_id)
+        .where(*_active_holders(package_id))
+    )
+    if after_id is not None:
+        query = query.where(LicensePackage.license_id > after_id)
+    rows = db.execute(query.order_by(LicensePackage.license_id).limit(limit)).all()
+    items = [
+        PackageEntitlementOut(
+            license_id=license_id,
+            license_key=key,
+            user_id=user_id,
+            user_email=email,
+            expires_at=to_aware_utc(expires_at),
+        )
+        for license_id, key, user_id, email, expires_at in rows
+    ]
+    headers = {"X-Next-Cursor": str(rows[-1][0])} if len(rows) == limit else None
+    return json_list_response(PackageEntitlementOut, items, headers=headers)
+
+
+@router.get("/{package_id}/entitlements/count", response_model=PackageEntitlementCounts)
+def count_package_entitlements(
+    package_id: int, _: None = Depends(require_admin), db: Session = Depends(get_db)
+) -> PackageEntitlementCounts:
+    """How many active licenses and distinct users a deprecation would affect, from one aggregate query."""
+    _get_package_or_404(db, package_id)
+    licenses, users = db.execute(
+        select(func.count(), func.count(distinct(License.user_id)))
+        .select_from(LicensePackage)
+        .join(License, License.id == LicensePackage.license_id)
+        .where(*_active_holders(package_id))
+    ).one()
+    return PackageEntitlementCounts(package_id=package_id, licenses=licenses, users=users)
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.profiler import profiler
+from app.models.user import User
+from app.schemas.profile import ProfileSummary
+from app.security.deps import require_admin
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[ProfileSummary])
+def list_profiles(_: User = Depends(require_admin)) -> List[ProfileSummary]:
+    return [
+        ProfileSummary(
+            id=p.id,
+            method=p.method,
+            path=p.path,
+            started_at=datetime.fromtimestamp(p.started_at, tz=timezone.utc),
+            duration_ms=p.duration_ms,
+            sample_count=p.sample_count,
+        )
+        for p in reversed(profiler.profiles)
+    ]
+
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+def download_profile(profile_id: int, _: User = Depends(require_admin)) -> PlainTextResponse:
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'},
+    )
@@ -0,0 +1,102 @@
+"""Router registry so workers import and mount only the routers they serve.
+
+Nothing here imports a router module at import time; `include_router` pulls in
+a router's module (and its schema/service stack) only when it is mounted.
+"""
+import importlib
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from fastapi import FastAPI
+
+from app.core.settings import settings
+
+
+class RouterSpec(NamedTuple):
+    module: str
+    # Passed to include_router; routers that declare full paths use ""
+    prefix: str
+    tags: List[str]
+    # Request paths served by the router, used for lazy mounting
+    path_prefixes: List[str]
+
+
+ROUTERS: Dict[str, RouterSpec] = {
+    "auth": RouterSpec("app.routers.auth", "/auth", ["auth"], ["/auth"]),
+    "balance": RouterSpec("app.routers.balance", "/balance", ["balance"], ["/balance"]),
+    "packages": RouterSpec("app.routers.packages", "/packages", ["packages"], ["/packages"]),
+    "store": RouterSpec("app.routers.store", "/store", ["store"], ["/store"]),
+    "licenses": RouterSpec("app.routers.licenses", "/licenses", ["licenses"], ["/licenses"]),
+    "me": RouterSpec("app.routers.me", "", ["me"], ["/me"]),
+    "users": RouterSpec("app.routers.users", "", ["users"], ["/users"]),
+    "events": RouterSpec("app.routers.events", "", ["events"], ["/events"]),
+    "changes": RouterSpec("app.routers.changes", "/changes", ["changes"], ["/changes"]),
+    "profiles": RouterSpec("app.routers.profiles", "/admin/profiles", ["admin"], ["/admin/profiles"]),
+}
+
+
+def enabled_router_names() -> List[str]:
+    """Routers selected by `settings.enabled_routers` ("*" or a comma-separated list)."""
+    raw = settings.enabled_routers.strip()
+    if raw == "*":
+        return list(ROUTERS)
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ROUTERS]
+    if unknown:
+        raise ValueError(f"Unknown router(s) in ENABLED_ROUTERS: {', '.join(unknown)}")
+    return names
+
+
+def router_enabled(name: str) -> bool:
+    return name in enabled_router_names()
+
+
+def include_router(app: FastAPI, name: str) -> None:
+    spec = ROUTERS[name]
+    module = importlib.import_module(spec.module)
+    app.include_router(module.router, prefix=spec.prefix, tags=spec.tags)
+    # Regenerate the OpenAPI document with the new routes on next request
+    app.openapi_schema = None
+
+
+class LazyRouterMiddleware:
+    """Mount a registered router on the first request under one of its path prefixes."""
+
+    def __init__(self, app, fastapi_app: FastAPI, names: List[str]) -> None:
+        self.app = app
+        self.fastapi_app = fastapi_app
+        self.pending: Set[str] = set(names)
+
+    def _match(self, path: str) -> Optional[str]:
+        for name in self.pending:
+            for prefix in ROUTERS[name].path_prefixes:
+                if path == prefix or path.startswith(prefix + "/"):
+                    return name
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if self.pending and scope["type"] == "http":
+            path = scope["path"]
+            if path in ("/openapi.json", "/docs", "/redoc"):
+                # API docs should describe every enabled router
+                for name in list(self.pending):
+                    self._mount(name)
+            else:
+                name = self._match(path)
+                if name is not None:
+                    self._mount(name)
+        await self.app(scope, receive, send)
+
+    def _mount(self, name: str) -> None:
+        # Runs on the event loop thread without awaiting, so no two requests race here
+        if name in self.pending:
+            include_router(self.fastapi_app, name)
+            self.pending.discard(name)
+
+
+def mount_routers(app: FastAPI) -> None:
+    names = enabled_router_names()
+    if settings.lazy_routers:
+        app.add_middleware(LazyRouterMiddleware, fastapi_app=app, names=names)
+        return
+    for name in names:
+        include_router(app, name)
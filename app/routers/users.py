@@ -1,10 +1,14 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.invalidation import TOPIC_USER, bus
+from app.core.responses import json_list_response
 from app.db.session import get_db
-from app.models.user import User
+from app.models.counter import read_counter
+from app.models.user import User, USERS_TOTAL_COUNTER
 from app.security.deps import require_admin
 from app.schemas.auth import UserOut, UpdateUserRoleRequest
 
@@ -12,9 +16,59 @@ from app.schemas.auth import UserOut, UpdateUserRoleRequest
 router = APIRouter()
 
 
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with `prefix`, or None if there is none."""
+    # Trailing U+10FFFF cannot be incremented; carry into the character before it
+    stripped = prefix.rstrip("\U0010ffff")
+    if not stripped:
+        return None
+    code = ord(stripped[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Surrogates are not valid in stored text
+        code = 0xE000
+    return stripped[:-1] + chr(code)
+
+
 @router.get("/users", response_model=List[UserOut])
-def list_users(_: User = Depends(require_admin), db: Session = Depends(get_db)) -> List[UserOut]:
-    return db.query(User).all()
+def list_users(
+    _: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+    limit: int = Query(default=100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    role: Optional[Literal["user", "admin"]] = None,
+    email_prefix: Optional[str] = Query(default=None, min_length=1, max_length=255),
+    case_insensitive: bool = False,
+) -> Response:
+    criteria = []
+    if role is not None:
+        criteria.append(User.role == role)
+    if email_prefix:
+        # Range predicates (not LIKE) so SQLite can seek the email index directly
+        if case_insensitive:
+            prefix = email_prefix.lower()
+            column = func.lower(User.email)
+        else:
+            prefix = email_prefix
+            column = User.email
+        criteria.append(column >= prefix)
+        upper = _prefix_upper_bound(prefix)
+        if upper is not None:
+            criteria.append(column < upper)
+
+    query = db.query(User).filter(*criteria)
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    users = query.order_by(User.id).limit(limit).all()
+
+    # Unfiltered totals come from the counter; filtered ones are counted with the page's filters
+    total = None if criteria else read_counter(db, USERS_TOTAL_COUNTER)
+    if total is None:
+        # Also the fallback until the counter row is created on the first registration
+        total = db.query(func.count(User.id)).filter(*criteria).scalar()
+    headers = {"X-Total-Count": str(total)}
+    if len(users) == limit:
+        headers["X-Next-Cursor"] = str(users[-1].id)
+    return json_list_response(UserOut, users, headers=headers)
 
 
 @router.patch("/users/{user_id}/role", response_model=UserOut)
@@ -31,6 +85,7 @@ def update_user_role(
     db.add(u)
     db.commit()
     db.refresh(u)
+    bus.publish(TOPIC_USER, u.id)
     return u
 
 
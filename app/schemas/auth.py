@@ -1,5 +1,9 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Literal
+from pydantic import BaseModel, EmailStr, Field, WithJsonSchema
+from typing import Annotated, Literal
+
+# Emails are validated on the way in; re-running email-validator for every row on the way
+# out dominated list_users, so response models keep only the documented format
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
 
 
 class RegisterRequest(BaseModel):
@@ -18,7 +22,7 @@ class TokenResponse(BaseModel):
 
 class UserOut(BaseModel):
     id: int
-    email: EmailStr
+    email: StoredEmail
     role: Literal["user", "admin"]
     balance: int
 
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class ChangeOut(BaseModel):
+    seq: int
+    entity: Literal["license", "package"]
+    entity_id: int
+    op: str
+    key: Optional[str]
+    data: Dict[str, Any]
+    created_at: datetime
+
+
+class ChangeFeed(BaseModel):
+    changes: List[ChangeOut]
+    # Pass as `after` on the next call
+    next_seq: int
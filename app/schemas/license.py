@@ -18,6 +18,32 @@ class LicenseRevokeRequest(BaseModel):
     reason: Optional[str] = Field(default=None, max_length=255)
 
 
+class LicenseBulkSelector(BaseModel):
+    license_ids: Optional[List[int]] = None
+    user_id: Optional[int] = None
+    package_id: Optional[int] = None
+    expiring_before: Optional[datetime] = None
+    stream: bool = False
+
+
+class LicenseBulkExtendRequest(LicenseBulkSelector):
+    extra_days: int = Field(gt=0)
+
+
+class LicenseBulkRevokeRequest(LicenseBulkSelector):
+    reason: Optional[str] = Field(default=None, max_length=255)
+
+
+class LicenseBulkResult(BaseModel):
+    affected: int
+
+
+class LicenseStatusCounts(BaseModel):
+    active: int
+    expired: int
+    revoked: int
+
+
 class LicenseValidateRequest(BaseModel):
     key: str
 
@@ -29,6 +55,21 @@ class LicenseValidateResponse(BaseModel):
     reason: Optional[str] = None
 
 
+class LicenseBatchValidateRequest(BaseModel):
+    keys: List[str] = Field(min_length=1, max_length=1000)
+
+
+class LicenseBatchValidateItem(BaseModel):
+    key: str
+    valid: bool
+    # active, expired or revoked; None for an unknown key
+    status: Optional[str] = None
+
+
+class LicenseBatchValidateResponse(BaseModel):
+    results: List[LicenseBatchValidateItem]
+
+
 class LicensePackagesRequest(BaseModel):
     key: str
 
@@ -22,6 +22,20 @@ class PackageOut(BaseModel):
         from_attributes = True
 
 
+class PackageEntitlementOut(BaseModel):
+    license_id: int
+    license_key: str
+    user_id: int
+    user_email: str
+    expires_at: datetime
+
+
+class PackageEntitlementCounts(BaseModel):
+    package_id: int
+    licenses: int
+    users: int
+
+
 class PurchaseItem(BaseModel):
     base_package_id: int
     addon_package_ids: List[int] = []
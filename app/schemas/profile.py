@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ProfileSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    started_at: datetime
+    duration_ms: float
+    sample_count: int
@@ -4,7 +4,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.models.user import User
 from app.security.jwt_tokens import decode_access_token
 
@@ -38,3 +38,10 @@ def require_admin(user: User = Depends(get_current_user)) -> User:
     return user
 
 
+def require_admin_id(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme)) -> int:
+    """require_admin for long-lived responses (long-poll, streams): holds no DB session while they run."""
+    db = SessionLocal()
+    try:
+        return require_admin(get_current_user(credentials, db)).id
+    finally:
+        db.close()
@@ -0,0 +1,88 @@
+import json
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.change import CHANGE_ENTITY_LICENSE, CHANGE_ENTITY_PACKAGE, ChangeLogEntry
+from app.models.epoch import to_aware_utc
+from app.models.package import License, Package
+
+CHANGE_OP_CREATED = "created"
+CHANGE_OP_REVOKED = "revoked"
+CHANGE_OP_EXTENDED = "extended"
+CHANGE_OP_DEPRECATED = "deprecated"
+CHANGE_OP_UNDEPRECATED = "undeprecated"
+
+_BATCH = 500
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    # In-memory ORM values are aware, values read back from SQLite are naive: emit one format for both
+    return to_aware_utc(value).isoformat(timespec="microseconds") if value is not None else None
+
+
+def _license_data(key, user_id, expires_at, revoked_at, status, package_ids=None) -> str:
+    data = {
+        "key": key,
+        "user_id": user_id,
+        "expires_at": _iso(expires_at),
+        "revoked_at": _iso(revoked_at),
+        "status": status,
+    }
+    if package_ids is not None:
+        data["package_ids"] = sorted(package_ids)
+    return json.dumps(data)
+
+
+def record_license_change(db: Session, op: str, lic: License, package_ids: Optional[List[int]] = None) -> None:
+    """Append a license change to the session; it commits (or rolls back) with the mutation itself."""
+    if lic.id is None:
+        db.flush()
+    db.add(
+        ChangeLogEntry(
+            entity=CHANGE_ENTITY_LICENSE,
+            entity_id=lic.id,
+            op=op,
+            key=lic.key,
+            data=_license_data(lic.key, lic.user_id, lic.expires_at, lic.revoked_at, lic.status, package_ids),
+        )
+    )
+
+
+def record_license_changes(db: Session, op: str, license_ids: Iterable[int]) -> None:
+    """Log a bulk update from the rows as they now are, in the caller's transaction."""
+    license_ids = list(license_ids)
+    for start in range(0, len(license_ids), _BATCH):
+        chunk = license_ids[start : start + _BATCH]
+        rows = db.execute(
+            select(License.id, License.key, License.user_id, License.expires_at, License.revoked_at, License.status)
+            .where(License.id.in_(chunk))
+            .order_by(License.id)
+        ).all()
+        if rows:
+            db.execute(
+                insert(ChangeLogEntry),
+                [
+                    {
+                        "entity": CHANGE_ENTITY_LICENSE,
+                        "entity_id": row.id,
+                        "op": op,
+                        "key": row.key,
+                        "data": _license_data(row.key, row.user_id, row.expires_at, row.revoked_at, row.status),
+                    }
+                    for row in rows
+                ],
+            )
+
+
+def record_package_change(db: Session, op: str, pkg: Package) -> None:
+    if pkg.id is None:
+        db.flush()
+    data = {"id": pkg.id, "name": pkg.name, "is_base": pkg.is_base, "price": pkg.price, "is_deprecated": pkg.is_deprecated}
+    db.add(ChangeLogEntry(entity=CHANGE_ENTITY_PACKAGE, entity_id=pkg.id, op=op, data=json.dumps(data)))
+
+
+def read_changes(db: Session, after: int, limit: int) -> List[ChangeLogEntry]:
+    return db.query(ChangeLogEntry).filter(ChangeLogEntry.seq > after).order_by(ChangeLogEntry.seq).limit(limit).all()
@@ -0,0 +1,80 @@
+"""License state and package entitlements, evaluated in one place.
+
+- revoked: `revoked_at` is set
+- expired: not revoked and `expires_at <= now`
+- active: otherwise
+- An active license grants its non-deprecated packages; add-ons count only
+  while exactly one non-deprecated base is attached, otherwise just the base(s).
+
+Times are compared as whole epoch seconds (UTC), read from the integer shadow
+columns, so the single-license and batch paths give identical answers. The
+batch path works on column arrays and handles thousands of licenses per call
+without building per-license objects.
+"""
+from array import array
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from app.models.package import LICENSE_STATUS_ACTIVE, LICENSE_STATUS_EXPIRED, LICENSE_STATUS_REVOKED
+from app.models.views import LicenseView, PackageView
+
+
+# Batch results are one signed byte per license
+STATUS_CODE_ACTIVE = 0
+STATUS_CODE_EXPIRED = 1
+STATUS_CODE_REVOKED = 2
+STATUS_NAMES = (LICENSE_STATUS_ACTIVE, LICENSE_STATUS_EXPIRED, LICENSE_STATUS_REVOKED)
+
+# Stands for NULL in revoked-at arrays
+NOT_REVOKED = 0
+
+
+def now_epoch() -> int:
+    return int(datetime.now(tz=timezone.utc).timestamp())
+
+
+def license_status(expires_at: int, revoked_at: Optional[int], now: int) -> str:
+    if revoked_at:
+        return LICENSE_STATUS_REVOKED
+    return LICENSE_STATUS_EXPIRED if expires_at <= now else LICENSE_STATUS_ACTIVE
+
+
+def accessible_packages(packages: Sequence[PackageView]) -> List[PackageView]:
+    packages = [p for p in packages if not p.is_deprecated]
+    if sum(1 for p in packages if p.is_base) != 1:
+        packages = [p for p in packages if p.is_base]
+    return packages
+
+
+class Entitlement(NamedTuple):
+    license: LicenseView
+    status: str
+    # Empty unless the license is active
+    packages: Tuple[PackageView, ...]
+
+    @property
+    def valid(self) -> bool:
+        return self.status == LICENSE_STATUS_ACTIVE
+
+    @property
+    def package_names(self) -> List[str]:
+        return [p.name for p in self.packages]
+
+
+def evaluate(view: LicenseView, now: Optional[int] = None) -> Entitlement:
+    now = now_epoch() if now is None else now
+    status = license_status(view.expires_at_epoch, view.revoked_at_epoch, now)
+    packages = tuple(accessible_packages(view.packages)) if status == LICENSE_STATUS_ACTIVE else ()
+    return Entitlement(view, status, packages)
+
+
+def evaluate_batch(expires_at: Sequence[int], revoked_at: Sequence[int], now: Optional[int] = None) -> array:
+    """Status codes for parallel columns of epoch seconds (NOT_REVOKED for NULL revoked_at)."""
+    now = now_epoch() if now is None else now
+    return array(
+        "b",
+        [
+            STATUS_CODE_REVOKED if revoked else STATUS_CODE_EXPIRED if expires <= now else STATUS_CODE_ACTIVE
+            for expires, revoked in zip(expires_at, revoked_at)
+        ],
+    )
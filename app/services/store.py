@@ -3,12 +3,14 @@ from datetime import timedelta, datetime, timezone
 from typing import List, Tuple, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.core.settings import settings
 from app.models.package import Package, License, LicensePackage
 from app.models.user import User
 from app.schemas.package import LicenseOut, PurchaseItem
+from app.services.changes import CHANGE_OP_CREATED, record_license_change
 
 
 def validate_and_price_items(
@@ -75,22 +77,19 @@ def charge_and_create_licenses(
     # and when not. Use a nested transaction if one is already in progress.
     txn_ctx = db.begin_nested() if db.in_transaction() else db.begin()
     with txn_ctx:
-        user_locked = (
-            db.query(User)
-            .filter(User.id == user_id)
-            .with_for_update()
-            .one()
-        )
-
-        if user_locked.balance < total_price:
+        # Charge first: SQLite waits (busy timeout) for the write lock when a write opens the
+        # transaction, but fails a read-then-write lock upgrade at once under contention
+        charged = db.execute(
+            update(User)
+            .where(User.id == user_id, User.balance >= total_price)
+            .values(balance=User.balance - total_price)
+        ).rowcount
+        if not charged:
             raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail="Insufficient balance")
 
-        user_locked.balance -= total_price
-        db.add(user_locked)
-
         for base_pkg, addon_pkgs in validated_items:
             license_obj = License(
-                user_id=user_locked.id,
+                user_id=user_id,
                 key=secrets.token_urlsafe(32),
                 expires_at=expires_at,
             )
@@ -102,6 +101,7 @@ def charge_and_create_licenses(
                 db.add_all(
                     [LicensePackage(license_id=license_obj.id, package_id=pid) for pid in package_ids]
                 )
+            record_license_change(db, CHANGE_OP_CREATED, license_obj, package_ids)
 
             created.append(
                 LicenseOut(key=license_obj.key, package_ids=package_ids, expires_at=license_obj.expires_at)
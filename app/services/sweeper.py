@@ -0,0 +1,108 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Query, Session
+
+from app.core.settings import settings
+from app.db.session import SessionLocal
+from app.models.counter import read_counter, set_counter
+from app.models.package import License, LICENSE_STATUS_ACTIVE, LICENSE_STATUS_EXPIRED
+
+
+logger = logging.getLogger(__name__)
+
+LAST_SWEEP_COUNTER = "licenses.last_sweep"
+
+
+def _expired_candidates(query: Query, batch_size: int) -> List[int]:
+    return [lid for (lid,) in query.order_by(License.expires_at_epoch).limit(batch_size).all()]
+
+
+def sweep_expired_licenses(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    full: bool = False,
+) -> int:
+    """Flip active licenses whose expiry has passed to "expired".
+
+    Only the window (last sweep, now] of `expires_at_epoch` is scanned unless `full`
+    is set, so each run touches just the newly expired rows. Returns the number
+    of licenses updated.
+    """
+    now = now or datetime.now(tz=timezone.utc)
+    batch_size = batch_size or settings.license_sweep_batch_size
+
+    now_epoch = int(now.timestamp())
+    query = db.query(License.id).filter(License.status == LICENSE_STATUS_ACTIVE, License.expires_at_epoch <= now_epoch)
+    last_sweep = None if full else read_counter(db, LAST_SWEEP_COUNTER)
+    if last_sweep is not None:
+        query = query.filter(License.expires_at_epoch > last_sweep)
+
+    swept = 0
+    while True:
+        ids = _expired_candidates(query, batch_size)
+        if not ids:
+            break
+        # Re-checks expiry too: an extend committed since the SELECT must leave its license active
+        result = db.execute(
+            update(License)
+            .where(
+                License.id.in_(ids),
+                License.status == LICENSE_STATUS_ACTIVE,
+                License.expires_at_epoch <= now_epoch,
+            )
+            .values(status=LICENSE_STATUS_EXPIRED)
+            .execution_options(synchronize_session=False)
+        )
+        swept += result.rowcount
+        db.commit()
+        if len(ids) < batch_size:
+            break
+
+    # Same whole-second unit as expires_at_epoch, so consecutive windows neither overlap nor gap
+    set_counter(db.connection(), LAST_SWEEP_COUNTER, now_epoch)
+    db.commit()
+    return swept
+
+
+class LicenseSweeper:
+    """Background thread running `sweep_expired_licenses` every interval."""
+
+    def __init__(self, interval_seconds: Optional[float] = None) -> None:
+        self.interval_seconds = interval_seconds or settings.license_sweep_interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="license-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 5)
+            self._thread = None
+
+    def _run(self) -> None:
+        # Reconcile everything once per process start, then scan only new expiries
+        full = True
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                swept = sweep_expired_licenses(db, full=full)
+                full = False
+                if swept:
+                    logger.info("Marked %d license(s) expired", swept)
+            except Exception:
+                logger.exception("License expiry sweep failed")
+                db.rollback()
+            finally:
+                db.close()
+            self._stop.wait(self.interval_seconds)
@@ -1,25 +1,131 @@
-from fastapi import FastAPI
-from sqlalchemy import text, inspect
-
-from app.db.session import Base, engine
-
-
-def register_startup(app: FastAPI) -> None:
-    @app.on_event("startup")
-    def _create_tables() -> None:
-        Base.metadata.create_all(bind=engine)
-
-        # Lightweight migration: add missing columns that we depend on
-        with engine.begin() as conn:
-            inspector = inspect(conn)
-            if "packages" in inspector.get_table_names():
-                package_columns = {col["name"] for col in inspector.get_columns("packages")}
-                if "is_deprecated" not in package_columns:
-                    # SQLite/Postgres compatible boolean default
-                    conn.execute(text("ALTER TABLE packages ADD COLUMN is_deprecated BOOLEAN NOT NULL DEFAULT 0"))
-            if "licenses" in inspector.get_table_names():
-                license_columns = {col["name"] for col in inspector.get_columns("licenses")}
-                if "revoked_at" not in license_columns:
-                    conn.execute(text("ALTER TABLE licenses ADD COLUMN revoked_at TIMESTAMP NULL"))
-                if "revoked_reason" not in license_columns:
-                    conn.execute(text("ALTER TABLE licenses ADD COLUMN revoked_reason VARCHAR(255) NULL"))
+import asyncio
+import contextlib
+import logging
+from typing import AsyncIterator, Callable, List
+
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.invalidation import bus, make_transport
+from app.core.settings import settings
+from app.db.migrations import run_migrations
+from app.db.session import SessionLocal, engine
+from app.db.shards import event_shards
+from app.routers.registry import router_enabled
+from app.services.sweeper import LicenseSweeper
+
+
+logger = logging.getLogger(__name__)
+
+# A key no license can have; lookups with it exercise the query path without side effects
+_WARMUP_LICENSE_KEY = "__warmup__"
+
+# Indexes read by the hot endpoints; a full index scan pulls their pages into SQLite's cache
+_HOT_SQLITE_INDEXES = [
+    ("licenses", "ix_licenses_key"),
+    ("licenses", "ix_licenses_key_state"),
+    ("licenses", "ix_licenses_user_id_expires_at_epoch"),
+    ("license_packages", "sqlite_autoindex_license_packages_1"),
+    ("packages", "ix_packages_name"),
+    ("users", "ix_users_id"),
+]
+
+
+def _warm_license_queries(db: Session) -> None:
+    if not router_enabled("licenses"):
+        return
+    from app.routers.licenses import license_packages_get, validate_license
+    from app.schemas.license import LicenseValidateRequest
+
+    validate_license(LicenseValidateRequest(key=_WARMUP_LICENSE_KEY), db)
+    try:
+        license_packages_get(_WARMUP_LICENSE_KEY, db)
+    except HTTPException:
+        pass
+
+
+def _warm_package_catalog(db: Session) -> None:
+    if not router_enabled("packages"):
+        return
+    from app.routers.packages import _catalog_snapshot
+
+    _catalog_snapshot(db, include_deprecated=False)
+
+
+def _warm_my_licenses(db: Session) -> None:
+    if not router_enabled("me"):
+        return
+    from app.routers.me import _load_my_licenses, _my_licenses_etag
+
+    _my_licenses_etag(db, 0)
+    _load_my_licenses(db, 0)
+
+
+def _touch_hot_indexes(db: Session) -> None:
+    if db.get_bind().dialect.name != "sqlite":
+        return
+    for table, index in _HOT_SQLITE_INDEXES:
+        db.execute(text(f"SELECT count(*) FROM {table} INDEXED BY {index}"))
+
+
+# Steps import their router lazily and skip routers this worker does not serve
+WARMUP_STEPS: List[Callable[[Session], None]] = [
+    _warm_license_queries,
+    _warm_package_catalog,
+    _warm_my_licenses,
+    _touch_hot_indexes,
+]
+
+
+def warm_up(app: FastAPI) -> None:
+    """Run every warm-up step, then build the OpenAPI schema. Failures are logged, not raised."""
+    db = SessionLocal()
+    try:
+        for step in WARMUP_STEPS:
+            try:
+                step(db)
+            except Exception:
+                logger.exception("Warm-up step %s failed", step.__name__)
+                db.rollback()
+    finally:
+        db.close()
+    app.openapi()
+
+
+async def _warm_up_then_ready(app: FastAPI) -> None:
+    if settings.warmup_enabled:
+        await asyncio.to_thread(warm_up, app)
+    app.state.ready = True
+    logger.info("Application ready")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ready = False
+    run_migrations()
+    event_shards.migrate()
+
+    sweeper = LicenseSweeper()
+    if settings.license_sweeper_enabled:
+        sweeper.start()
+    transport = make_transport(
+        settings.invalidation_transport,
+        engine,
+        bus.origin,
+        settings.invalidation_retention_seconds,
+        settings.invalidation_socket_dir,
+    )
+    if transport is not None:
+        bus.start(transport, settings.invalidation_poll_interval_seconds)
+
+    # Serve /health while warming up; /ready flips once the caches are hot
+    warmup_task = asyncio.create_task(_warm_up_then_ready(app))
+    try:
+        yield
+    finally:
+        warmup_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warmup_task
+        sweeper.stop()
+        bus.stop()
@@ -0,0 +1,109 @@
+"""Per-request allocations of the license lookup: ORM instances vs column views.
+
+    python -m benchmarks.allocations --lookups 500
+
+Each lookup opens a session, loads one license with its packages, applies the
+validity and base-count rules and builds the response model, once through ORM
+instances (joinedload, the previous code path) and once through
+LicenseView/PackageView. Peak traced memory is measured under tracemalloc and
+time without it; the cache is bypassed so every lookup reaches the database.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from benchmarks.run import add_dataset_arguments, prepare_dataset
+
+
+def _orm_lookup(key: str):
+    from sqlalchemy.orm import joinedload
+
+    from app.db.session import SessionLocal
+    from app.models.package import License
+    from app.models.epoch import to_aware_utc
+    from app.schemas.license import LicensePackagesResponse
+
+    with SessionLocal() as db:
+        lic = db.query(License).options(joinedload(License.packages)).filter(License.key == key).first()
+        now = datetime.now(tz=timezone.utc)
+        if to_aware_utc(lic.revoked_at) is not None or to_aware_utc(lic.expires_at) <= now:
+            return None
+        packages = [p for p in lic.packages if p.is_deprecated == False]
+        if sum(1 for p in packages if p.is_base) != 1:
+            packages = [p for p in packages if p.is_base]
+        return LicensePackagesResponse(key=lic.key, package_names=[p.name for p in packages])
+
+
+def _view_lookup(key: str):
+    from app.db.session import SessionLocal
+    from app.models.views import load_license_view
+    from app.schemas.license import LicensePackagesResponse
+    from app.services.entitlements import evaluate
+
+    with SessionLocal() as db:
+        entitlement = evaluate(load_license_view(db, key))
+        if not entitlement.valid:
+            return None
+        return LicensePackagesResponse(key=key, package_names=entitlement.package_names)
+
+
+def _peak_bytes(lookup: Callable, key: str) -> int:
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    lookup(key)
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - baseline
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_dataset_arguments(parser)
+    parser.add_argument("--lookups", type=int, default=500, help="license keys looked up per path")
+    args = parser.parse_args(argv)
+    context = prepare_dataset(args)
+    keys = context.dataset.valid_license_keys[: args.lookups]
+
+    paths = {"orm": _orm_lookup, "view": _view_lookup}
+    for key in keys[:20]:
+        # joinedload leaves package order to the query plan; views order by package id
+        orm, view = _orm_lookup(key), _view_lookup(key)
+        assert (orm.key, sorted(orm.package_names)) == (view.key, view.package_names), key
+
+    peaks = {name: [] for name in paths}
+    tracemalloc.start()
+    try:
+        for key in keys:
+            for name, lookup in paths.items():
+                peaks[name].append(_peak_bytes(lookup, key))
+    finally:
+        tracemalloc.stop()
+
+    timings = {name: [] for name in paths}
+    for key in keys:
+        for name, lookup in paths.items():
+            started = time.perf_counter()
+            lookup(key)
+            timings[name].append(time.perf_counter() - started)
+
+    report = {
+        name: {
+            "median_peak_bytes": int(statistics.median(peaks[name])),
+            "median_us": round(statistics.median(timings[name]) * 1e6, 1),
+        }
+        for name in paths
+    }
+    report["reduction"] = {
+        "peak_bytes": round(1 - report["view"]["median_peak_bytes"] / report["orm"]["median_peak_bytes"], 3),
+        "time": round(1 - report["view"]["median_us"] / report["orm"]["median_us"], 3),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
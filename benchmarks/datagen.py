@@ -0,0 +1,161 @@
+"""Deterministic benchmark dataset.
+
+The same (seed, sizes) always produce identical rows, so runs on different
+machines or commits exercise the same data. Rows are bulk-inserted with Core
+statements; every user shares one password hash to keep generation fast.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.db.migrations import run_migrations
+from app.models.epoch import to_epoch
+from app.models.event import DownloadEvent
+from app.models.package import (
+    License,
+    LicensePackage,
+    Package,
+    LICENSE_STATUS_ACTIVE,
+    LICENSE_STATUS_EXPIRED,
+    LICENSE_STATUS_REVOKED,
+)
+from app.models.user import User
+from app.security.passwords import hash_password
+
+
+BENCH_PASSWORD = "bench-password"
+_CHUNK = 5000
+
+
+class DatasetSpec(NamedTuple):
+    users: int = 1000
+    packages: int = 50
+    licenses: int = 5000
+    events: int = 20000
+    seed: int = 1234
+
+
+class Dataset(NamedTuple):
+    spec: DatasetSpec
+    user_emails: List[str]
+    user_ids: List[int]
+    base_package_ids: List[int]
+    addon_package_ids: List[int]
+    valid_license_keys: List[str]
+    all_license_keys: List[str]
+    licenses_by_user: Dict[int, int]
+
+
+def _insert_chunked(conn, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), _CHUNK):
+        conn.execute(insert(table), rows[start : start + _CHUNK])
+
+
+def generate(bind: Engine, spec: DatasetSpec = DatasetSpec()) -> Dataset:
+    """Create the schema on `bind` and fill it; the database is expected to be empty."""
+    rng = random.Random(spec.seed)
+    now = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    run_migrations(bind=bind)
+
+    password_hash = hash_password(BENCH_PASSWORD)
+    user_ids = list(range(1, spec.users + 1))
+    user_emails = [f"user{uid:06d}@bench.example.com" for uid in user_ids]
+    users = [
+        {
+            "id": uid,
+            "email": email,
+            "hashed_password": password_hash,
+            "role": "admin" if uid == 1 else "user",
+            "balance": 10**9,
+        }
+        for uid, email in zip(user_ids, user_emails)
+    ]
+
+    base_count = max(1, spec.packages // 5)
+    packages = [
+        {
+            "id": pid,
+            "name": f"pkg-{pid:04d}",
+            "is_base": pid <= base_count,
+            "price": rng.randint(1, 500),
+            "is_deprecated": pid % 17 == 0,
+        }
+        for pid in range(1, spec.packages + 1)
+    ]
+    base_ids = [p["id"] for p in packages if p["is_base"] and not p["is_deprecated"]]
+    addon_ids = [p["id"] for p in packages if not p["is_base"] and not p["is_deprecated"]]
+
+    licenses, links = [], []
+    valid_keys, all_keys = [], []
+    licenses_by_user: Dict[int, int] = {}
+    for lid in range(1, spec.licenses + 1):
+        user_id = rng.choice(user_ids)
+        key = f"bench-{spec.seed}-{lid:08d}-{rng.getrandbits(64):016x}"
+        roll = rng.random()
+        revoked_at = None
+        if roll < 0.05:
+            expires_at = now - timedelta(days=rng.randint(1, 90))
+            status = LICENSE_STATUS_EXPIRED
+        elif roll < 0.10:
+            expires_at = now + timedelta(days=rng.randint(1, 365))
+            revoked_at = now - timedelta(days=rng.randint(1, 30))
+            status = LICENSE_STATUS_REVOKED
+        else:
+            expires_at = now + timedelta(days=rng.randint(1, 365))
+            status = LICENSE_STATUS_ACTIVE
+            valid_keys.append(key)
+        all_keys.append(key)
+        licenses.append(
+            {
+                "id": lid,
+                "user_id": user_id,
+                "key": key,
+                "expires_at": expires_at,
+                "revoked_at": revoked_at,
+                # Core inserts skip the ORM hook that fills the epoch shadows
+                "expires_at_epoch": to_epoch(expires_at),
+                "revoked_at_epoch": to_epoch(revoked_at),
+                "revoked_reason": "bench" if revoked_at else None,
+                "status": status,
+            }
+        )
+        licenses_by_user[user_id] = licenses_by_user.get(user_id, 0) + 1
+        package_ids = [rng.choice(base_ids)] + rng.sample(addon_ids, k=min(len(addon_ids), rng.randint(0, 3)))
+        links.extend({"license_id": lid, "package_id": pid} for pid in package_ids)
+
+    events = []
+    for eid in range(1, spec.events + 1):
+        key = rng.choice(all_keys) if all_keys and rng.random() < 0.8 else None
+        events.append(
+            {
+                "id": eid,
+                "license_key": key,
+                "package_name": rng.choice(packages)["name"],
+                "package_version": f"{rng.randint(0, 5)}.{rng.randint(0, 20)}.0",
+                "ip_address": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                "valid_at_log_time": 1 if key is not None and rng.random() < 0.9 else 0,
+                "created_at": now - timedelta(seconds=spec.events - eid),
+                "created_at_epoch": to_epoch(now - timedelta(seconds=spec.events - eid)),
+            }
+        )
+
+    with bind.begin() as conn:
+        _insert_chunked(conn, User.__table__, users)
+        _insert_chunked(conn, Package.__table__, packages)
+        _insert_chunked(conn, License.__table__, licenses)
+        _insert_chunked(conn, LicensePackage.__table__, links)
+        _insert_chunked(conn, DownloadEvent.__table__, events)
+
+    return Dataset(
+        spec=spec,
+        user_emails=user_emails,
+        user_ids=user_ids,
+        base_package_ids=base_ids,
+        addon_package_ids=addon_ids,
+        valid_license_keys=valid_keys,
+        all_license_keys=all_keys,
+        licenses_by_user=licenses_by_user,
+    )
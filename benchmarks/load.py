@@ -0,0 +1,297 @@
+"""Load test: concurrent virtual clients running a weighted workload mix under a ramp profile.
+
+    python -m benchmarks.load                                    # production mix, ramp to 32 clients
+    python -m benchmarks.load --mix purchase_contention --profile steady --clients 16
+    python -m benchmarks.load --mix "validate=9,admin_revoke=1" --profile "0:1,10:64,20:64"
+    python -m benchmarks.load --driver uvicorn --output load.json
+
+Each virtual client loops: pick a scenario by weight, send it, optionally think.
+The report (JSON) has overall and per-scenario latency, a per-window timeline of
+clients, throughput, latency, 5xx and SQLite lock errors, and correlations
+between them. Lock errors are the 503 "database is busy" responses the app
+returns when SQLite's write lock stays held past the busy timeout.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from benchmarks.run import add_dataset_arguments, open_client, percentile, prepare_dataset
+
+
+# Weights follow observed traffic across the routers: license checks and download
+# events dominate, purchases and admin work are rare
+MIXES: Dict[str, Dict[str, float]] = {
+    "production": {
+        "validate": 40,
+        "license_packages": 15,
+        "event_ingest": 20,
+        "me_licenses": 8,
+        "package_catalog": 6,
+        "login": 5,
+        "purchase": 3,
+        "admin_revoke": 1,
+        "events_export": 1,
+        "users_list": 1,
+    },
+    "purchase_contention": {"hot_purchase": 1},
+    "revocation_storm": {"validate": 9, "admin_revoke": 1},
+    "ingest_during_export": {"event_ingest": 4, "events_export": 1},
+}
+
+Profile = List[Tuple[float, int]]
+
+# (seconds, clients) points, linearly interpolated; scaled by --duration and --clients
+PROFILES: Dict[str, Callable[[float, int], Profile]] = {
+    "steady": lambda d, c: [(0, c), (d, c)],
+    "ramp": lambda d, c: [(0, 1), (0.8 * d, c), (d, c)],
+    "step": lambda d, c: [p for i in range(4) for p in ((i * d / 4, c * (i + 1) // 4), ((i + 1) * d / 4, c * (i + 1) // 4))],
+    "spike": lambda d, c: [
+        (0, max(1, c // 4)),
+        (0.4 * d, max(1, c // 4)),
+        (0.45 * d, c),
+        (0.6 * d, c),
+        (0.65 * d, max(1, c // 4)),
+        (d, max(1, c // 4)),
+    ],
+}
+
+DATABASE_BUSY_MARKER = "Database is busy"
+
+
+class Sample(NamedTuple):
+    started: float
+    latency: float
+    scenario: str
+    outcome: str  # "ok", "locked", "5xx", "4xx" or an exception name
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    if text in MIXES:
+        return MIXES[text]
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_profile(text: str, duration: float, clients: int) -> Profile:
+    if text in PROFILES:
+        return PROFILES[text](duration, clients)
+    points = []
+    for part in text.split(","):
+        at, _, count = part.partition(":")
+        points.append((float(at), int(count)))
+    return sorted(points)
+
+
+def clients_at(profile: Profile, t: float) -> int:
+    """Target client count at `t` seconds, interpolating between profile points."""
+    if t <= profile[0][0]:
+        return profile[0][1]
+    for (t0, c0), (t1, c1) in zip(profile, profile[1:]):
+        if t <= t1:
+            fraction = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+            return round(c0 + (c1 - c0) * fraction)
+    return profile[-1][1]
+
+
+def classify(status_code: int, body: str, expected: int) -> str:
+    if status_code == expected:
+        return "ok"
+    if status_code == 503 and DATABASE_BUSY_MARKER in body:
+        return "locked"
+    if status_code >= 500:
+        return "5xx"
+    return f"{status_code // 100}xx"
+
+
+async def run_load(client, ctx, mix: Dict[str, float], profile: Profile, think_s: float, seed: int):
+    """Drive virtual clients along `profile`; returns (samples, [(t, active clients)])."""
+    from benchmarks.scenarios import SCENARIOS
+
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples: List[Sample] = []
+    clients: List[Tuple[asyncio.Task, asyncio.Event]] = []
+    concurrency: List[Tuple[float, int]] = []
+    origin = time.perf_counter()
+    duration = profile[-1][0]
+
+    async def virtual_client(client_id: int, stop: asyncio.Event) -> None:
+        rng = random.Random(f"{seed}-{client_id}")
+        while not stop.is_set():
+            scenario = SCENARIOS[rng.choices(names, weights)[0]]
+            started = time.perf_counter()
+            try:
+                response = await scenario.call(client, ctx, rng)
+                outcome = classify(response.status_code, response.text, scenario.expected_status)
+            except Exception as exc:
+                outcome = type(exc).__name__
+            finished = time.perf_counter()
+            samples.append(Sample(started - origin, finished - started, scenario.name, outcome))
+            if think_s:
+                await asyncio.sleep(rng.expovariate(1 / think_s))
+
+    while (elapsed := time.perf_counter() - origin) < duration:
+        target = clients_at(profile, elapsed)
+        while len(clients) < target:
+            stop = asyncio.Event()
+            clients.append((asyncio.create_task(virtual_client(len(clients), stop)), stop))
+        while len(clients) > target:
+            # Retired clients finish their in-flight request first
+            clients.pop()[1].set()
+        concurrency.append((elapsed, len(clients)))
+        await asyncio.sleep(0.05)
+
+    for _, stop in clients:
+        stop.set()
+    await asyncio.gather(*(task for task, _ in clients))
+    return samples, concurrency
+
+
+def _latency_summary(latencies_s: Sequence[float]) -> Dict[str, float]:
+    ms = sorted(v * 1000 for v in latencies_s)
+    return {
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+def _outcome_summary(samples: Sequence[Sample]) -> Dict[str, object]:
+    total = len(samples)
+    locked = sum(1 for s in samples if s.outcome == "locked")
+    server_errors = sum(1 for s in samples if s.outcome in ("locked", "5xx"))
+    return {
+        "requests": total,
+        "ok": sum(1 for s in samples if s.outcome == "ok"),
+        "locked": locked,
+        "5xx": server_errors,
+        "locked_rate": round(locked / total, 4) if total else 0.0,
+        "5xx_rate": round(server_errors / total, 4) if total else 0.0,
+        **_latency_summary([s.latency for s in samples]),
+    }
+
+
+def pearson(xs: Sequence[float], ys: Sequence[float]) -> Optional[float]:
+    """Correlation coefficient, or None when either series is constant."""
+    n = len(xs)
+    if n < 2:
+        return None
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    if sxx == 0 or syy == 0:
+        return None
+    return round(sxy / math.sqrt(sxx * syy), 3)
+
+
+def analyze(samples: Sequence[Sample], concurrency: Sequence[Tuple[float, int]], window_s: float = 1.0) -> dict:
+    """Aggregate raw samples into the load report."""
+    windows: Dict[int, List[Sample]] = {}
+    for s in samples:
+        windows.setdefault(int(s.started // window_s), []).append(s)
+    clients_by_window: Dict[int, int] = {}
+    for t, count in concurrency:
+        index = int(t // window_s)
+        clients_by_window[index] = max(count, clients_by_window.get(index, 0))
+
+    timeline = []
+    for index in sorted(windows):
+        summary = _outcome_summary(windows[index])
+        timeline.append(
+            {
+                "t": round(index * window_s, 3),
+                "clients": clients_by_window.get(index, 0),
+                "throughput_rps": round(summary["requests"] / window_s, 1),
+                **summary,
+            }
+        )
+
+    by_scenario = {}
+    for name in sorted({s.scenario for s in samples}):
+        by_scenario[name] = _outcome_summary([s for s in samples if s.scenario == name])
+
+    # Latency of ordinary requests in windows with and without lock errors shows how much
+    # waiting on SQLite's writer lock slows everything else down
+    locked_windows = {index for index, ws in windows.items() if any(s.outcome == "locked" for s in ws)}
+    ok = [s for s in samples if s.outcome == "ok"]
+    series = lambda key: [w[key] for w in timeline]
+    correlation = {
+        "p95_vs_locked_rate": pearson(series("p95_ms"), series("locked_rate")),
+        "p95_vs_5xx_rate": pearson(series("p95_ms"), series("5xx_rate")),
+        "p95_vs_clients": pearson(series("p95_ms"), series("clients")),
+        "locked_rate_vs_clients": pearson(series("locked_rate"), series("clients")),
+        "ok_latency_in_locked_windows": _latency_summary(
+            [s.latency for s in ok if int(s.started // window_s) in locked_windows]
+        ),
+        "ok_latency_in_clean_windows": _latency_summary(
+            [s.latency for s in ok if int(s.started // window_s) not in locked_windows]
+        ),
+        "locked_request_latency": _latency_summary([s.latency for s in samples if s.outcome == "locked"]),
+    }
+
+    duration = max((s.started + s.latency for s in samples), default=0.0)
+    overall = _outcome_summary(samples)
+    overall["throughput_rps"] = round(len(samples) / duration, 1) if duration else 0.0
+    return {"overall": overall, "by_scenario": by_scenario, "correlation": correlation, "timeline": timeline}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_dataset_arguments(parser)
+    parser.add_argument("--mix", default="production", help=f"{', '.join(MIXES)} or name=weight,...")
+    parser.add_argument("--profile", default="ramp", help=f"{', '.join(PROFILES)} or seconds:clients,...")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds, for named profiles")
+    parser.add_argument("--clients", type=int, default=32, help="peak virtual clients, for named profiles")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a client's requests")
+    parser.add_argument("--window", type=float, default=1.0, help="timeline window in seconds")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    profile = parse_profile(args.profile, args.duration, args.clients)
+    ctx = prepare_dataset(args)
+
+    async def drive():
+        async with open_client(args.driver) as client:
+            return await run_load(client, ctx, mix, profile, args.think_ms / 1000, args.seed)
+
+    samples, concurrency = asyncio.run(drive())
+    report = {
+        "meta": {
+            "driver": args.driver,
+            "mix": mix,
+            "profile": profile,
+            "think_ms": args.think_ms,
+            "dataset": ctx.dataset.spec._asdict(),
+        },
+        **analyze(samples, concurrency, args.window),
+    }
+
+    overall, corr = report["overall"], report["correlation"]
+    print(
+        f"{overall['requests']} requests, {overall['throughput_rps']} rps, p95 {overall['p95_ms']}ms, "
+        f"5xx {overall['5xx_rate']:.1%} (locked {overall['locked_rate']:.1%}); "
+        f"corr(p95, locked rate) = {corr['p95_vs_locked_rate']}",
+        file=sys.stderr,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Benchmark the hot endpoints against a generated dataset.
+
+    python -m benchmarks.run                              # in-process (ASGI transport)
+    python -m benchmarks.run --driver uvicorn --concurrency 16
+    python -m benchmarks.run --output results.json --baseline benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline
+
+Results are JSON with throughput and p50/p95/p99 latency per scenario. With
+--baseline, a scenario regresses when its p95 grows or its throughput drops by
+more than --threshold (a fraction), or its error rate rises by more than
+--threshold in absolute terms; the exit status is then 1.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+    from benchmarks.scenarios import Context
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies_s: List[float], errors: Dict[str, int], elapsed_s: float) -> Dict[str, float]:
+    ms = sorted(v * 1000 for v in latencies_s)
+    return {
+        "requests": len(ms),
+        "errors": sum(errors.values()),
+        "errors_by_status": dict(sorted(errors.items())),
+        "throughput_rps": round(len(ms) / elapsed_s, 1) if elapsed_s > 0 else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Human-readable regressions of `results` against `baseline` scenarios."""
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if base["p95_ms"] > 0 and current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if base["throughput_rps"] > 0 and current["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']} rps vs baseline {base['throughput_rps']} rps"
+            )
+        base_rate = base["errors"] / base["requests"] if base["requests"] else 0.0
+        rate = current["errors"] / current["requests"] if current["requests"] else 0.0
+        if rate > base_rate + threshold:
+            regressions.append(f"{name}: error rate {rate:.1%} vs baseline {base_rate:.1%}")
+    return regressions
+
+
+def failed_scenarios(results: Dict[str, dict]) -> List[str]:
+    """Scenarios with any errors; a baseline recorded with them would hide real regressions."""
+    return [name for name, result in results.items() if result["errors"]]
+
+
+async def run_scenario(client, scenario, ctx, requests: int, concurrency: int, seed: int) -> Dict[str, float]:
+    remaining = iter(range(requests))
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(f"{seed}-{scenario.name}-{worker_id}")
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await scenario.call(client, ctx, rng)
+                outcome = str(response.status_code)
+            except Exception as exc:
+                outcome = type(exc).__name__
+            latencies.append(time.perf_counter() - started)
+            if outcome != str(scenario.expected_status):
+                errors[outcome] = errors.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(client, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn did not become ready")
+
+
+@contextlib.asynccontextmanager
+async def open_client(driver: str) -> AsyncIterator["httpx.AsyncClient"]:
+    """An httpx client bound to the app in-process, or to a uvicorn subprocess serving it."""
+    import httpx
+
+    if driver != "uvicorn":
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0) as client:
+            yield client
+        return
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=os.environ.copy(),
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30.0) as client:
+            await _wait_ready(client)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+async def run_all(args, ctx, scenario_names: List[str]) -> Dict[str, dict]:
+    from benchmarks.scenarios import SCENARIOS
+
+    results: Dict[str, dict] = {}
+    async with open_client(args.driver) as client:
+        for name in scenario_names:
+            scenario = SCENARIOS[name]
+            # Untimed warm-up so one-off costs do not land in the percentiles
+            await run_scenario(client, scenario, ctx, min(args.warmup, args.requests), args.concurrency, args.seed + 1)
+            results[name] = await run_scenario(client, scenario, ctx, args.requests, args.concurrency, args.seed)
+            print(f"{name:18s} {json.dumps(results[name])}", file=sys.stderr)
+    return results
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--driver", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--packages", type=int, default=50)
+    parser.add_argument("--licenses", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1234)
+
+
+def prepare_dataset(args) -> "Context":
+    """Point the app at a fresh temporary database and fill it; call before importing app modules."""
+    workdir = tempfile.mkdtemp(prefix="datacebo-bench-")
+    # Settings are read at import time, so configure the app before importing it
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["LICENSE_SWEEPER_ENABLED"] = "false"
+    os.environ.setdefault("ACCESS_TOKEN_SECRET", "bench-access-secret-at-least-32-bytes!")
+    sys.path.insert(0, str(ROOT))
+
+    from benchmarks.datagen import DatasetSpec, generate
+    from benchmarks.scenarios import Context
+    from app.db.session import engine
+
+    spec = DatasetSpec(args.users, args.packages, args.licenses, args.events, args.seed)
+    started = time.perf_counter()
+    dataset = generate(engine, spec)
+    print(f"dataset generated in {time.perf_counter() - started:.1f}s: {spec}", file=sys.stderr)
+    return Context(dataset)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_dataset_arguments(parser)
+    parser.add_argument("--scenario", action="append", help="scenario(s) to run (default: all benchmarks)")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write the report to {DEFAULT_BASELINE.name}")
+    args = parser.parse_args(argv)
+
+    ctx = prepare_dataset(args)
+    from benchmarks.scenarios import BENCHMARK_SCENARIOS
+
+    scenario_names = args.scenario or list(BENCHMARK_SCENARIOS)
+    results = asyncio.run(run_all(args, ctx, scenario_names))
+
+    report = {
+        "meta": {
+            "driver": args.driver,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "dataset": ctx.dataset.spec._asdict(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if args.update_baseline:
+        failed = failed_scenarios(results)
+        if failed:
+            print(f"refusing to update the baseline, scenarios with errors: {', '.join(failed)}", file=sys.stderr)
+            return 1
+        DEFAULT_BASELINE.write_text(text + "\n")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline["meta"].get("driver") != args.driver:
+            print(f"warning: baseline was recorded with the {baseline['meta'].get('driver')} driver", file=sys.stderr)
+        regressions = compare(results, baseline["scenarios"], args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
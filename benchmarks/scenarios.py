@@ -0,0 +1,112 @@
+"""One request per call for each hot endpoint, driven by a seeded RNG."""
+import random
+from typing import Awaitable, Callable, Dict, NamedTuple
+
+import httpx
+
+from benchmarks.datagen import BENCH_PASSWORD, Dataset
+
+
+class Context:
+    """Dataset plus lazily minted access tokens, shared by all scenario calls."""
+
+    def __init__(self, dataset: Dataset) -> None:
+        self.dataset = dataset
+        self._tokens: Dict[int, str] = {}
+
+    def auth_headers(self, user_id: int) -> Dict[str, str]:
+        token = self._tokens.get(user_id)
+        if token is None:
+            from app.security.jwt_tokens import create_access_token
+
+            token = self._tokens[user_id] = create_access_token(
+                subject=str(user_id), role="admin" if user_id == 1 else "user"
+            )
+        return {"Authorization": f"Bearer {token}"}
+
+
+ScenarioFn = Callable[[httpx.AsyncClient, Context, random.Random], Awaitable[httpx.Response]]
+
+
+class Scenario(NamedTuple):
+    name: str
+    call: ScenarioFn
+    expected_status: int
+
+
+async def _validate(client, ctx, rng):
+    return await client.post("/licenses/validate", json={"key": rng.choice(ctx.dataset.all_license_keys)})
+
+
+async def _license_packages(client, ctx, rng):
+    return await client.get(f"/licenses/{rng.choice(ctx.dataset.valid_license_keys)}/packages")
+
+
+async def _purchase(client, ctx, rng):
+    data = ctx.dataset
+    addons = rng.sample(data.addon_package_ids, k=min(len(data.addon_package_ids), rng.randint(0, 2)))
+    payload = {"items": [{"base_package_id": rng.choice(data.base_package_ids), "addon_package_ids": addons}]}
+    return await client.post("/store/purchase", json=payload, headers=ctx.auth_headers(rng.choice(data.user_ids[1:] or data.user_ids)))
+
+
+async def _ingest_event(client, ctx, rng):
+    payload = {
+        "package_name": f"pkg-{rng.randint(1, ctx.dataset.spec.packages):04d}",
+        "package_version": "1.0.0",
+        "license_key": rng.choice(ctx.dataset.all_license_keys) if rng.random() < 0.8 else None,
+    }
+    return await client.post("/events", json=payload)
+
+
+async def _login(client, ctx, rng):
+    return await client.post("/auth/login", json={"email": rng.choice(ctx.dataset.user_emails), "password": BENCH_PASSWORD})
+
+
+async def _me_licenses(client, ctx, rng):
+    user_id = rng.choice(list(ctx.dataset.licenses_by_user))
+    return await client.get("/me/licenses", headers=ctx.auth_headers(user_id))
+
+
+async def _hot_purchase(client, ctx, rng):
+    # Every caller charges the same user row, the worst case for SQLite's single writer
+    payload = {"items": [{"base_package_id": ctx.dataset.base_package_ids[0], "addon_package_ids": []}]}
+    return await client.post("/store/purchase", json=payload, headers=ctx.auth_headers(ctx.dataset.user_ids[-1]))
+
+
+async def _admin_revoke(client, ctx, rng):
+    license_id = rng.randint(1, ctx.dataset.spec.licenses)
+    return await client.post(f"/licenses/{license_id}/revoke", json={"reason": "load test"}, headers=ctx.auth_headers(1))
+
+
+async def _events_export(client, ctx, rng):
+    offset = rng.randint(0, max(0, ctx.dataset.spec.events - 1000))
+    return await client.get("/events", params={"limit": 1000, "offset": offset}, headers=ctx.auth_headers(1))
+
+
+async def _package_catalog(client, ctx, rng):
+    return await client.get("/packages/")
+
+
+async def _users_list(client, ctx, rng):
+    return await client.get("/users", params={"limit": 50}, headers=ctx.auth_headers(1))
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s
+    for s in [
+        Scenario("validate", _validate, 200),
+        Scenario("license_packages", _license_packages, 200),
+        Scenario("purchase", _purchase, 201),
+        Scenario("event_ingest", _ingest_event, 201),
+        Scenario("login", _login, 200),
+        Scenario("me_licenses", _me_licenses, 200),
+        Scenario("hot_purchase", _hot_purchase, 201),
+        Scenario("admin_revoke", _admin_revoke, 200),
+        Scenario("events_export", _events_export, 200),
+        Scenario("package_catalog", _package_catalog, 200),
+        Scenario("users_list", _users_list, 200),
+    ]
+}
+
+# The per-endpoint micro-benchmarks; the rest only make sense inside load mixes
+BENCHMARK_SCENARIOS = ("validate", "license_packages", "purchase", "event_ingest", "login", "me_licenses")
@@ -0,0 +1,123 @@
+"""Compare JSON serialization paths for the list endpoints.
+
+    python -m benchmarks.serialization --rows 1000 --repeat 50
+
+For each list endpoint (events, licenses, users) the same preloaded page of rows
+is served by three throwaway routes, so only the serialization path differs:
+
+  default      response_model + FastAPI's validate/serialize + stdlib JSONResponse
+  orjson       the same, rendered by FastJSONResponse (FAST_JSON=true)
+  type_adapter json_list_response: pydantic-core straight to bytes (what the routers use)
+
+FastAPI releases that already dump response models with pydantic-core show
+default and type_adapter at parity; there, a custom response class (orjson)
+turns that path off and is slower.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+from benchmarks.run import add_dataset_arguments, prepare_dataset
+
+
+def _pages(rows: int):
+    from app.db.session import SessionLocal
+    from app.models.event import DownloadEvent
+    from app.models.package import License
+    from app.models.user import User
+    from app.routers.licenses import _license_to_record, _package_ids_by_license
+    from app.schemas.auth import UserOut
+    from app.schemas.event import DownloadEventOut
+    from app.schemas.license import LicenseRecord
+
+    with SessionLocal() as db:
+        events = db.query(DownloadEvent).order_by(DownloadEvent.id.desc()).limit(rows).all()
+        licenses = db.query(License).order_by(License.id).limit(rows).all()
+        package_ids = _package_ids_by_license(db, [lic.id for lic in licenses])
+        records = [_license_to_record(lic, package_ids[lic.id]) for lic in licenses]
+        users = db.query(User).order_by(User.id).limit(rows).all()
+        db.expunge_all()
+    return {
+        "list_download_events": (DownloadEventOut, events),
+        "list_licenses": (LicenseRecord, records),
+        "list_users": (UserOut, users),
+    }
+
+
+def _client(model, items):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.core.responses import FastJSONResponse, json_list_response
+
+    app = FastAPI()
+
+    @app.get("/default", response_model=List[model])
+    def default():
+        return items
+
+    @app.get("/orjson", response_model=List[model], response_class=FastJSONResponse)
+    def fast():
+        return items
+
+    @app.get("/type_adapter", response_model=List[model])
+    def type_adapter():
+        return json_list_response(model, items)
+
+    return TestClient(app)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_dataset_arguments(parser)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+    prepare_dataset(args)
+
+    import fastapi
+    import pydantic
+
+    from app.core import responses
+
+    report = {
+        "meta": {
+            "fastapi": fastapi.__version__,
+            "pydantic": pydantic.VERSION,
+            "orjson": responses.orjson.__version__ if responses.orjson else None,
+        },
+        "endpoints": {},
+    }
+    for endpoint, (model, items) in _pages(args.rows).items():
+        client = _client(model, items)
+        bodies = {}
+        timings = {}
+        paths = ("default", "orjson", "type_adapter")
+        samples = {path: [] for path in paths}
+        for path in paths:
+            bodies[path] = client.get(f"/{path}").json()
+        # Interleave the variants so drift (GC, CPU frequency) hits all of them alike
+        for _ in range(args.repeat):
+            for path in paths:
+                started = time.perf_counter()
+                client.get(f"/{path}")
+                samples[path].append(time.perf_counter() - started)
+        for path in paths:
+            timings[path] = round(statistics.median(samples[path]) * 1000, 3)
+        assert bodies["default"] == bodies["orjson"] == bodies["type_adapter"], endpoint
+        report["endpoints"][endpoint] = {
+            "rows": len(items),
+            "median_ms": timings,
+            "speedup": {k: round(timings["default"] / v, 2) for k, v in timings.items() if k != "default"},
+        }
+        print(f"{endpoint:22s} {json.dumps(report['endpoints'][endpoint])}", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Cold-start report for the application.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters for one or
+more router selections and prints the import time of `app.main`, the slowest
+modules, and the median wall-clock time to import the app.
+
+    python scripts/startup_profile.py
+    python scripts/startup_profile.py --routers "*" --routers licenses,events --lazy --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules whose presence shows which stacks a worker paid for
+_MARKER_MODULES = ["app.routers.auth", "app.routers.store", "app.routers.users", "passlib", "app.routers.licenses"]
+
+
+def _env(routers: str, lazy: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["ENABLED_ROUTERS"] = routers
+    env["LAZY_ROUTERS"] = "true" if lazy else "false"
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, object]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return rows
+
+
+def profile(routers: str, lazy: bool, runs: int, top: int) -> Dict[str, object]:
+    env = _env(routers, lazy)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    app_main = next((row for row in rows if row["module"] == "app.main"), None)
+
+    # importlib.import_module bypasses -X importtime, so read sys.modules for the markers
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('\\n'.join(sys.modules))"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    wall_ms = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import app.main"], cwd=ROOT, env=env, check=True)
+        wall_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "routers": routers,
+        "lazy": lazy,
+        "app_main_cumulative_ms": round(app_main["cumulative_us"] / 1000, 1) if app_main else None,
+        "cold_start_median_ms": round(statistics.median(wall_ms), 1),
+        "modules_imported": len(loaded),
+        "markers": {name: name in loaded for name in _MARKER_MODULES},
+        "slowest_self": sorted(rows, key=lambda row: row["self_us"], reverse=True)[:top],
+    }
+
+
+def _print_report(report: Dict[str, object]) -> None:
+    print(f"routers={report['routers']} lazy={report['lazy']}")
+    print(f"  app.main cumulative import: {report['app_main_cumulative_ms']} ms")
+    print(f"  cold start (median wall):   {report['cold_start_median_ms']} ms")
+    print(f"  modules imported:           {report['modules_imported']}")
+    print("  stacks: " + ", ".join(f"{name}={'yes' if hit else 'no'}" for name, hit in report["markers"].items()))
+    print("  slowest modules (self):")
+    for row in report["slowest_self"]:
+        print(f"    {row['self_us'] / 1000:8.1f} ms  {row['module']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routers", action="append", help='router selection(s) to profile (default: "*")')
+    parser.add_argument("--lazy", action="store_true", help="also profile each selection with LAZY_ROUTERS=true")
+    parser.add_argument("--runs", type=int, default=5, help="wall-clock samples per configuration")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules to list")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of text")
+    args = parser.parse_args(argv)
+
+    configs = [(routers, False) for routers in (args.routers or ["*"])]
+    if args.lazy:
+        configs += [(routers, True) for routers, _ in configs]
+    reports = [profile(routers, lazy, args.runs, args.top) for routers, lazy in configs]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+import contextlib
+
+import pytest
+
+from app.core.queries import QueryCapture
+from app.db.session import engine
+
+
+@pytest.fixture
+def query_budget():
+    """Assert the SQL statements issued inside a block stay within a budget.
+
+        with query_budget(2):
+            client.get("/licenses/abc/packages")
+    """
+
+    @contextlib.contextmanager
+    def budget(max_queries: int):
+        with QueryCapture(engine) as capture:
+            yield capture
+        assert capture.count <= max_queries, (
+            f"expected at most {max_queries} queries, got {capture.count}:\n{capture.summary()}"
+        )
+
+    return budget
@@ -0,0 +1,63 @@
+from sqlalchemy import create_engine, func, select
+
+from app.models.event import DownloadEvent
+from app.models.package import License, LicensePackage, Package
+from app.models.user import User
+from benchmarks.datagen import DatasetSpec, generate
+from benchmarks.load import Sample, analyze, classify, clients_at, parse_mix, parse_profile
+from benchmarks.run import compare, failed_scenarios, percentile, summarize
+
+
+def make_engine(path):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def test_datagen_is_deterministic_and_sized(tmp_path):
+    spec = DatasetSpec(users=20, packages=10, licenses=60, events=100, seed=7)
+    first = generate(make_engine(tmp_path / "a.db"), spec)
+    second = generate(make_engine(tmp_path / "b.db"), spec)
+    assert first == second
+
+    with make_engine(tmp_path / "a.db").connect() as conn:
+        count = lambda model: conn.execute(select(func.count()).select_from(model)).scalar_one()
+        assert (count(User), count(Package), count(License), count(DownloadEvent)) == (20, 10, 60, 100)
+        assert count(LicensePackage) >= 60
+    assert len(first.all_license_keys) == 60
+    assert set(first.valid_license_keys) < set(first.all_license_keys)
+
+
+def test_percentiles_and_regression_comparison():
+    values = [float(v) for v in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50.0, 95.0, 99.0)
+
+    baseline = {"validate": summarize([0.010] * 100, {}, 1.0)}
+    assert compare({"validate": summarize([0.011] * 100, {}, 1.1)}, baseline, 0.2) == []
+
+    slow = summarize([0.020] * 100, {"500": 30}, 2.0)
+    regressions = compare({"validate": slow}, baseline, 0.2)
+    assert [r.split(":")[1].split()[0] for r in regressions] == ["p95", "throughput", "error"]
+    assert failed_scenarios({"validate": baseline["validate"], "purchase": slow}) == ["purchase"]
+
+
+def test_load_profiles_mixes_and_outcomes():
+    assert [clients_at(parse_profile("ramp", 10, 9), t) for t in (0, 4, 8, 10)] == [1, 5, 9, 9]
+    assert [clients_at(parse_profile("0:2,10:2,11:20", 0, 0), t) for t in (5, 10.5, 30)] == [2, 11, 20]
+    assert parse_mix("validate=9,admin_revoke") == {"validate": 9.0, "admin_revoke": 1.0}
+    assert classify(503, '{"detail":"Database is busy, retry shortly"}', 201) == "locked"
+    assert (classify(201, "", 201), classify(500, "", 200), classify(404, "", 200)) == ("ok", "5xx", "4xx")
+
+
+def test_load_report_correlates_latency_with_lock_errors():
+    samples = [Sample(0.1 * i, 0.01, "validate", "ok") for i in range(10)]
+    samples += [Sample(1 + 0.1 * i, 0.05, "validate", "ok") for i in range(8)]
+    samples += [Sample(1.5, 0.2, "hot_purchase", "locked"), Sample(1.6, 0.3, "hot_purchase", "5xx")]
+    report = analyze(samples, [(0.0, 1), (1.0, 4)])
+
+    assert report["overall"]["requests"] == 20
+    assert (report["overall"]["locked"], report["overall"]["5xx"]) == (1, 2)
+    assert [(w["t"], w["clients"], w["locked"]) for w in report["timeline"]] == [(0.0, 1, 0), (1.0, 4, 1)]
+    assert report["by_scenario"]["hot_purchase"]["5xx_rate"] == 1.0
+    correlation = report["correlation"]
+    assert correlation["p95_vs_locked_rate"] == 1.0
+    assert correlation["ok_latency_in_locked_windows"]["p50_ms"] == 50.0
+    assert correlation["ok_latency_in_clean_windows"]["p50_ms"] == 10.0
@@ -0,0 +1,322 @@
+import fnmatch
+import socketserver
+import sqlite3
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.cache.base import CacheStats
+from app.cache.factory import cache, default_sqlite_cache_path, make_cache
+from app.cache.memory import MemoryCache
+from app.cache.redis import RedisCache
+from app.cache.sqlite import SqliteCache
+import app.routers.licenses as licenses_router
+from app.db.session import Base, SessionLocal, engine
+from app.main import app
+from app.schemas.license import LicenseValidateRequest
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+class FakeRespHandler(socketserver.StreamRequestHandler):
+    """Just enough of the Redis command set for RedisCache, with PX expiry."""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                size = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(size + 2)[:-2])
+            self.wfile.write(self.server.execute(args))
+
+
+class FakeRespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRespHandler)
+        self.data = {}
+        self.expiry = {}
+        self.expired = 0
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        if key in self.expiry and self.expiry[key] <= time.monotonic():
+            self.data.pop(key, None)
+            del self.expiry[key]
+            self.expired += 1
+        return self.data.get(key)
+
+    def execute(self, args):
+        command = args[0].upper()
+        with self.lock:
+            if command == b"SET":
+                self.data[args[1]] = args[2]
+                self.expiry.pop(args[1], None)
+                if len(args) > 3 and args[3].upper() == b"PX":
+                    self.expiry[args[1]] = time.monotonic() + int(args[4]) / 1000
+                return b"+OK\r\n"
+            if command == b"MGET":
+                values = [self._live(key) for key in args[1:]]
+                return b"*%d\r\n" % len(values) + b"".join(
+                    b"$-1\r\n" if v is None else b"$%d\r\n%s\r\n" % (len(v), v) for v in values
+                )
+            if command == b"DEL":
+                removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+                return b":%d\r\n" % removed
+            if command == b"SADD":
+                self.data.setdefault(args[1], set()).update(args[2:])
+                return b":1\r\n"
+            if command == b"SMEMBERS":
+                members = self.data.get(args[1], set())
+                return b"*%d\r\n" % len(members) + b"".join(b"$%d\r\n%s\r\n" % (len(m), m) for m in members)
+            if command == b"SCAN":
+                keys = [k for k in self.data if fnmatch.fnmatchcase(k.decode(), args[3].decode())]
+                return b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(b"$%d\r\n%s\r\n" % (len(k), k) for k in keys)
+            if command == b"INFO":
+                body = b"# Stats\r\nevicted_keys:0\r\nexpired_keys:%d\r\n" % self.expired
+                return b"$%d\r\n%s\r\n" % (len(body), body)
+            return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRespServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCache(max_entries=100)
+    elif request.param == "sqlite":
+        instance = SqliteCache(str(tmp_path / "cache.db"), max_entries=100)
+        yield instance
+        instance.close()
+    else:
+        instance = RedisCache(request.getfixturevalue("fake_redis"))
+        yield instance
+        instance.close()
+
+
+def test_backends_share_get_set_ttl_and_tag_semantics(backend):
+    backend.set("a", {"n": 1}, tags=("group",))
+    backend.set("b", [1, 2], tags=("group", "other"))
+    backend.set("c", None)
+    backend.set("short", "x", ttl=0.05)
+
+    assert backend.get("a") == {"n": 1}
+    assert backend.get_many(["a", "c", "missing"]) == {"a": {"n": 1}, "c": None}
+    assert backend.get_or_set("c", lambda: pytest.fail("cached None must be a hit")) is None
+    assert backend.get_or_set("d", lambda: 4, tags=("other",)) == 4
+    time.sleep(0.1)
+    assert backend.get("short") is None
+
+    backend.invalidate_tag("group")
+    assert backend.get_many(["a", "b", "c", "d"]) == {"c": None, "d": 4}
+    backend.invalidate_tag("other")
+    backend.delete("c")
+    assert backend.get_many(["c", "d"]) == {}
+    backend.set("e", 5)
+    backend.clear()
+    assert backend.get("e") is None
+
+    stats = backend.stats()
+    assert stats.hits == 6 and stats.misses == 8
+    assert stats.expirations == 1 and stats.hit_ratio == 6 / 14
+
+
+def test_memory_cache_evicts_least_recently_used():
+    lru = MemoryCache(max_entries=2)
+    lru.set("a", 1, tags=("t",))
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    assert lru.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert lru.stats() == CacheStats(hits=3, misses=1, evictions=1, expirations=0)
+    assert len(lru) == 2
+
+
+def test_sqlite_cache_is_shared_between_instances_and_bounded(tmp_path):
+    path = str(tmp_path / "shared.db")
+    writer = SqliteCache(path, max_entries=10, check_every=5)
+    reader = SqliteCache(path, max_entries=10)
+    for i in range(20):
+        writer.set(f"k{i}", i, tags=("all",))
+    assert reader.get("k19") == 19
+    # Oldest writes go first once the periodic check runs
+    assert reader.get_many([f"k{i}" for i in range(10)]) == {}
+    assert writer.stats().evictions == 10
+    reader.invalidate_tag("all")
+    assert writer.get("k19") is None
+
+
+def test_sqlite_cache_defaults_to_a_file_per_database(tmp_path):
+    assert default_sqlite_cache_path(f"sqlite:///{tmp_path}/a.db") == f"{tmp_path}/a.db.cache"
+    assert default_sqlite_cache_path(f"sqlite:///{tmp_path}/b.db") != default_sqlite_cache_path(f"sqlite:///{tmp_path}/a.db")
+    first = make_cache("sqlite", database_url=f"sqlite:///{tmp_path}/a.db")
+    second = make_cache("sqlite", database_url=f"sqlite:///{tmp_path}/b.db")
+    first.set("license:k", "a")
+    assert second.get("license:k") is None
+    with pytest.raises(ValueError):
+        make_cache("sqlite", database_url="sqlite://")
+    with pytest.raises(ValueError):
+        make_cache("sqlite", database_url="postgresql://db/app")
+    assert make_cache("sqlite", sqlite_path=str(tmp_path / "c.cache"), database_url="sqlite://").get("k") is None
+
+
+def test_sqlite_cache_degrades_to_misses_when_the_file_fails(tmp_path):
+    local = SqliteCache(str(tmp_path / "cache.db"), check_every=1)
+    local.set("a", 1, tags=("t",))
+    broken = sqlite3.connect(str(tmp_path / "cache.db"))
+    broken.executescript("DROP TABLE cache_entries; DROP TABLE cache_tags;")
+    broken.close()
+
+    local.set("a", 2, tags=("t",))
+    assert local.get("a") is None
+    local.delete("a")
+    local.invalidate_tag("t")
+    local.clear()
+    assert local.get_or_set("a", lambda: 3) == 3
+    local.close()
+
+
+def test_redis_cache_degrades_to_misses_when_the_server_is_down(fake_redis):
+    remote = RedisCache("redis://127.0.0.1:1/0")
+    remote.set("a", 1)
+    assert remote.get("a") is None
+    assert remote.stats().misses == 1
+
+
+def test_unknown_license_keys_are_not_cached():
+    reset_db()
+    cache.clear()
+    client = TestClient(app)
+
+    for n in range(20):
+        assert client.post("/licenses/validate", json={"key": f"guess-{n}"}).json()["valid"] is False
+    assert client.get("/licenses/guess-0/packages").status_code == 404
+    assert cache.get_many([licenses_router._snapshot_key(f"guess-{n}") for n in range(20)]) == {}
+
+
+def test_license_lookups_are_cached_and_invalidated_on_writes():
+    reset_db()
+    cache.clear()
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    token = client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+    base = client.post("/packages/", headers=admin, json={"name": "base", "is_base": True, "price": 10}).json()
+    addon = client.post("/packages/", headers=admin, json={"name": "addon", "is_base": False, "price": 5}).json()
+    lic = client.post("/licenses/", headers=admin, json={"user_id": 1, "package_ids": [base["id"], addon["id"]]}).json()
+
+    queries = []
+
+    def count(*args):
+        queries.append(1)
+
+    assert client.post("/licenses/validate", json={"key": lic["key"]}).json()["valid"] is True
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        assert client.post("/licenses/validate", json={"key": lic["key"]}).json()["valid"] is True
+        assert client.get(f"/licenses/{lic['key']}/packages").json()["package_names"] == ["base", "addon"]
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert queries == []
+
+    # Deprecating a package drops the cached package names
+    client.post(f"/packages/{addon['id']}/deprecate", headers=admin)
+    assert client.get(f"/licenses/{lic['key']}/packages").json()["package_names"] == ["base"]
+    # Revoking drops the snapshot for that key
+    client.post(f"/licenses/{lic['id']}/revoke", headers=admin, json={"reason": "refund"})
+    body = client.post("/licenses/validate", json={"key": lic["key"]}).json()
+    assert body["valid"] is False and body["reason"] == "refund"
+
+
+@pytest.mark.parametrize("invalidate", ["delete", "tag", "clear"])
+def test_load_racing_an_invalidation_is_not_stored(invalidate):
+    store = MemoryCache()
+
+    def loader():
+        # The entry is invalidated after the loader read its (now stale) value
+        {"delete": lambda: store.delete("k"), "tag": lambda: store.invalidate_tag("t"), "clear": store.clear}[invalidate]()
+        return "stale"
+
+    assert store.get_or_set("k", loader, tags=("t",)) == "stale"
+    assert store.get("k") is None
+    assert store.get_or_set("k", lambda: "fresh", tags=("t",)) == "fresh"
+    assert store.get("k") == "fresh"
+
+
+@pytest.mark.parametrize("invalidate", ["delete", "tag", "clear"])
+def test_invalidation_during_the_store_drops_the_entry(invalidate):
+    class RacingCache(MemoryCache):
+        def set(self, key, value, ttl=None, tags=()):
+            # Backend writes run without the generation lock held
+            assert not self._generation_lock.locked()
+            {"delete": lambda: self.delete("k"), "tag": lambda: self.invalidate_tag("t"), "clear": self.clear}[invalidate]()
+            super().set(key, value, ttl=ttl, tags=tags)
+
+    store = RacingCache()
+    assert store.get_or_set("k", lambda: "stale", tags=("t",)) == "stale"
+    assert store.get("k") is None
+
+
+def test_revoke_during_a_snapshot_load_is_not_overwritten(monkeypatch):
+    reset_db()
+    cache.clear()
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    token = client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+    base = client.post("/packages/", headers=admin, json={"name": "base", "is_base": True, "price": 10}).json()
+    lic = client.post("/licenses/", headers=admin, json={"user_id": 1, "package_ids": [base["id"]]}).json()
+
+    loaded, release = threading.Event(), threading.Event()
+    load_license_view = licenses_router.load_license_view
+
+    def blocking_load(db, key):
+        view = load_license_view(db, key)
+        loaded.set()
+        release.wait(5)
+        return view
+
+    monkeypatch.setattr(licenses_router, "load_license_view", blocking_load)
+    results = []
+
+    def validate():
+        db = SessionLocal()
+        try:
+            results.append(licenses_router.validate_license(LicenseValidateRequest(key=lic["key"]), db).valid)
+        finally:
+            db.close()
+
+    worker = threading.Thread(target=validate)
+    worker.start()
+    assert loaded.wait(5)
+    # The loader holds the pre-revocation snapshot while the revocation commits and invalidates
+    client.post(f"/licenses/{lic['id']}/revoke", headers=admin, json={"reason": "refund"})
+    release.set()
+    worker.join(5)
+    assert results == [True]
+
+    monkeypatch.setattr(licenses_router, "load_license_view", load_license_view)
+    assert client.post("/licenses/validate", json={"key": lic["key"]}).json()["valid"] is False
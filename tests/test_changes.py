@@ -0,0 +1,135 @@
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.db.session import Base, SessionLocal, engine
+from app.main import app
+from app.models.change import ChangeLogEntry
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def setup(client: TestClient):
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    user_token = client.post("/auth/register", json={"email": "user@example.com", "password": "secretpass"}).json()["access_token"]
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+        conn.exec_driver_sql("UPDATE users SET balance=100 WHERE id=2")
+    token = client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+    base = client.post("/packages/", headers=admin, json={"name": "base", "is_base": True, "price": 60}).json()
+    return admin, {"Authorization": f"Bearer {user_token}"}, base
+
+
+def parse_sse(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((int(fields["id"]), fields["event"]))
+    return events
+
+
+def test_mutations_append_to_the_change_log_in_their_transaction():
+    reset_db()
+    client = TestClient(app)
+    admin, user, base = setup(client)
+
+    lic = client.post("/licenses/", headers=admin, json={"user_id": 2, "package_ids": [base["id"]]}).json()
+    client.post(f"/licenses/{lic['id']}/extend", headers=admin, json={"extra_days": 5})
+    client.post(f"/licenses/{lic['id']}/revoke", headers=admin, json={"reason": "chargeback"})
+    bought = client.post("/store/purchase", headers=user, json={"items": [{"base_package_id": base["id"]}]})
+    assert bought.status_code == 201
+    # A purchase that fails on balance logs nothing
+    assert client.post("/store/purchase", headers=user, json={"items": [{"base_package_id": base["id"]}]}).status_code == 402
+    client.post(f"/packages/{base['id']}/deprecate", headers=admin)
+    client.post(f"/packages/{base['id']}/undeprecate", headers=admin)
+    client.post("/licenses/bulk/revoke", headers=admin, json={"user_id": 2, "reason": "offboarded"})
+
+    feed = client.get("/changes/?after=0", headers=admin).json()
+    ops = [(c["entity"], c["op"]) for c in feed["changes"]]
+    assert ops == [
+        ("package", "created"),
+        ("license", "created"),
+        ("license", "extended"),
+        ("license", "revoked"),
+        ("license", "created"),
+        ("package", "deprecated"),
+        ("package", "undeprecated"),
+        ("license", "revoked"),
+    ]
+    seqs = [c["seq"] for c in feed["changes"]]
+    assert seqs == sorted(seqs) and feed["next_seq"] == seqs[-1]
+    created = feed["changes"][1]
+    assert created["key"] == lic["key"] and created["data"]["package_ids"] == [base["id"]]
+    assert feed["changes"][3]["data"]["status"] == "revoked"
+    assert feed["changes"][-1]["key"] == bought.json()[0]["key"]
+
+    licenses_only = client.get(f"/changes/?after={seqs[2]}&entity=license", headers=admin).json()
+    assert [c["seq"] for c in licenses_only["changes"]] == [seqs[3], seqs[4], seqs[7]]
+    assert client.get(f"/changes/?after={feed['next_seq']}", headers=admin).json() == {"changes": [], "next_seq": seqs[-1]}
+    assert client.get("/changes/").status_code == 401
+    assert client.get("/changes/", headers=user).status_code == 403
+
+
+def test_license_timestamps_have_one_format_across_write_paths():
+    reset_db()
+    client = TestClient(app)
+    admin, _, base = setup(client)
+
+    lic = client.post("/licenses/", headers=admin, json={"user_id": 2, "package_ids": [base["id"]]}).json()
+    client.post(f"/licenses/{lic['id']}/extend", headers=admin, json={"extra_days": 5})
+    client.post("/licenses/bulk/extend", headers=admin, json={"license_ids": [lic["id"]], "extra_days": 5})
+    client.post(f"/licenses/{lic['id']}/revoke", headers=admin, json={"reason": "chargeback"})
+
+    changes = [c for c in client.get("/changes/?after=0", headers=admin).json()["changes"] if c["entity"] == "license"]
+    assert [c["op"] for c in changes] == ["created", "extended", "extended", "revoked"]
+    aware_utc = re.compile(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}\+00:00$")
+    for change in changes:
+        assert aware_utc.match(change["data"]["expires_at"]), change
+    assert aware_utc.match(changes[-1]["data"]["revoked_at"])
+    expiries = [datetime.fromisoformat(c["data"]["expires_at"]) for c in changes]
+    assert expiries[1] - expiries[0] == timedelta(days=5)
+    assert abs(expiries[2] - expiries[1] - timedelta(days=5)) < timedelta(seconds=1)
+
+
+def test_long_poll_returns_as_soon_as_a_change_lands():
+    reset_db()
+    client = TestClient(app)
+    admin, _, base = setup(client)
+    with SessionLocal() as db:
+        after = db.query(ChangeLogEntry).count()
+
+    def deprecate_later():
+        time.sleep(0.3)
+        TestClient(app).post(f"/packages/{base['id']}/deprecate", headers=admin)
+
+    writer = threading.Thread(target=deprecate_later)
+    started = time.monotonic()
+    writer.start()
+    feed = client.get(f"/changes/?after={after}&wait=10", headers=admin).json()
+    writer.join()
+    assert [c["op"] for c in feed["changes"]] == ["deprecated"]
+    assert time.monotonic() - started < 5
+
+
+def test_sse_stream_resumes_from_last_event_id():
+    reset_db()
+    client = TestClient(app)
+    admin, _, base = setup(client)
+    client.post(f"/packages/{base['id']}/deprecate", headers=admin)
+    client.post(f"/packages/{base['id']}/undeprecate", headers=admin)
+
+    with client.stream("GET", "/changes/stream?max_seconds=0.3", headers=admin) as r:
+        assert r.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(r.read().decode())
+    assert [name for _, name in events] == ["package.created", "package.deprecated", "package.undeprecated"]
+
+    resumed = client.get("/changes/stream?max_seconds=0.3", headers={**admin, "Last-Event-ID": str(events[0][0])})
+    assert parse_sse(resumed.text) == events[1:]
@@ -0,0 +1,130 @@
+import threading
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import app.core.compression as compression
+import app.middleware.compression as compression_middleware
+import app.routers.packages as packages_router
+from app.core.compression import negotiate_encoding
+from app.db.session import Base, engine
+from app.main import app
+from app.middleware.compression import CompressionMiddleware
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def admin_headers(client: TestClient) -> dict:
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    r = client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("*;q=0.5") == "gzip"
+    assert negotiate_encoding(None) is None
+
+    monkeypatch.setattr(compression, "brotli", SimpleNamespace(compress=lambda body, quality: b"br:" + body))
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def test_middleware_thresholds_streaming_and_offload(monkeypatch):
+    demo = FastAPI()
+    loop_threads = []
+
+    @demo.get("/big")
+    async def big():
+        loop_threads.append(threading.get_ident())
+        return PlainTextResponse("x" * 5000)
+
+    @demo.get("/small")
+    async def small():
+        return PlainTextResponse("tiny")
+
+    @demo.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"a" * 4000, b"b" * 4000]), media_type="text/plain")
+
+    compress_threads = []
+    real_compress = compression_middleware.compress
+
+    def tracking_compress(*args):
+        compress_threads.append(threading.get_ident())
+        return real_compress(*args)
+
+    monkeypatch.setattr(compression_middleware, "compress", tracking_compress)
+    inline = TestClient(CompressionMiddleware(demo, minimum_size=100, offload_size=10**6))
+    r = inline.get("/big")
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert int(r.headers["content-length"]) < 5000
+    assert r.text == "x" * 5000
+    assert compress_threads[-1] == loop_threads[-1]
+
+    assert "content-encoding" not in inline.get("/small").headers
+    assert "content-encoding" not in inline.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    streamed = inline.get("/stream")
+    assert "content-encoding" not in streamed.headers and len(streamed.content) == 8000
+
+    offloaded = TestClient(CompressionMiddleware(demo, minimum_size=100, offload_size=1000))
+    assert offloaded.get("/big").text == "x" * 5000
+    assert compress_threads[-1] != loop_threads[-1]
+
+
+def test_compressed_responses_weaken_strong_etags():
+    demo = FastAPI()
+
+    @demo.get("/tagged")
+    async def tagged():
+        return PlainTextResponse("x" * 5000, headers={"ETag": '"v1"'})
+
+    @demo.get("/weak")
+    async def weak():
+        return PlainTextResponse("x" * 5000, headers={"ETag": 'W/"v1"'})
+
+    client = TestClient(CompressionMiddleware(demo, minimum_size=100))
+    assert client.get("/tagged").headers["etag"] == 'W/"v1"'
+    assert client.get("/weak").headers["etag"] == 'W/"v1"'
+    assert client.get("/tagged", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"v1"'
+
+
+def test_package_catalog_is_served_from_precompressed_snapshot(monkeypatch):
+    reset_db()
+    client = TestClient(app)
+    admin = admin_headers(client)
+    for i in range(30):
+        client.post("/packages/", headers=admin, json={"name": f"package-{i:02d}", "is_base": i == 0, "price": i})
+
+    r1 = client.get("/packages/", headers={"Accept-Encoding": "gzip"})
+    assert r1.headers["content-encoding"] == "gzip"
+    assert len(r1.json()) == 30
+    etag = r1.headers["etag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("catalog recompressed")
+
+    monkeypatch.setattr(packages_router, "compress", fail)
+    monkeypatch.setattr(compression_middleware, "compress", fail)
+    r2 = client.get("/packages/", headers={"Accept-Encoding": "gzip"})
+    assert r2.content == r1.content and r2.headers["etag"] == etag
+    raw = client.get("/packages/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers and raw.headers["etag"] != etag
+    assert client.get("/packages/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+
+    monkeypatch.undo()
+    client.post("/packages/", headers=admin, json={"name": "package-new", "is_base": False, "price": 1})
+    r3 = client.get("/packages/", headers={"Accept-Encoding": "gzip"})
+    assert r3.headers["etag"] != etag
+    assert "package-new" in [p["name"] for p in r3.json()]
@@ -0,0 +1,92 @@
+import random
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.db.session import Base, engine
+from app.main import app
+from app.models.epoch import to_epoch
+from app.models.views import LicenseView, PackageView
+from app.services.entitlements import (
+    NOT_REVOKED,
+    STATUS_NAMES,
+    evaluate,
+    evaluate_batch,
+    license_status,
+)
+
+
+NOW = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+BASE = PackageView(1, "base", True, False)
+ADDON = PackageView(2, "addon", False, False)
+OLD_BASE = PackageView(3, "old-base", True, True)
+
+
+def view(expires_at, revoked_at=None, packages=(BASE, ADDON)) -> LicenseView:
+    return LicenseView(1, "k", 1, expires_at, revoked_at, None, to_epoch(expires_at), to_epoch(revoked_at), packages)
+
+
+def test_single_license_rules():
+    now = to_epoch(NOW)
+    active = evaluate(view(NOW + timedelta(days=1)), now)
+    assert active.valid and active.package_names == ["base", "addon"]
+    # Expiry is inclusive: a license expiring right now is already expired
+    assert evaluate(view(NOW), now).status == "expired"
+    assert evaluate(view(NOW + timedelta(days=1), revoked_at=NOW), now).status == "revoked"
+    assert evaluate(view(NOW - timedelta(days=1)), now).packages == ()
+    # Naive datetimes from SQLite are UTC
+    assert to_epoch(NOW.replace(tzinfo=None)) == now
+
+    # Add-ons need exactly one non-deprecated base
+    assert evaluate(view(NOW + timedelta(days=1), packages=(OLD_BASE, ADDON)), now).package_names == []
+    two_bases = (BASE, PackageView(4, "base-2", True, False), ADDON)
+    assert evaluate(view(NOW + timedelta(days=1), packages=two_bases), now).package_names == ["base", "base-2"]
+
+
+def test_batch_matches_single_evaluation():
+    rng = random.Random(7)
+    now = to_epoch(NOW)
+    expires = array("q", (now + rng.randint(-5, 5) for _ in range(5000)))
+    revoked = array("q", (rng.choice([NOT_REVOKED, NOT_REVOKED, now - 60]) for _ in range(5000)))
+
+    codes = evaluate_batch(expires, revoked, now)
+    assert len(codes) == 5000
+    assert [STATUS_NAMES[c] for c in codes] == [license_status(e, r, now) for e, r in zip(expires, revoked)]
+
+
+def test_batch_validate_endpoint_and_event_validity_use_the_engine():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    token = client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+    base = client.post("/packages/", headers=admin, json={"name": "base", "is_base": True, "price": 1}).json()
+    keys = [
+        client.post("/licenses/", headers=admin, json={"user_id": 1, "package_ids": [base["id"]]}).json()
+        for _ in range(3)
+    ]
+    client.post(f"/licenses/{keys[1]['id']}/revoke", headers=admin, json={})
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE licenses SET expires_at = :past, expires_at_epoch = :past_epoch WHERE id = :id",
+            {"past": datetime.now(tz=timezone.utc) - timedelta(days=1), "past_epoch": int(time.time()) - 86400, "id": keys[2]["id"]},
+        )
+
+    r = client.post("/licenses/validate/batch", json={"keys": [k["key"] for k in keys] + ["nope", keys[0]["key"]]})
+    assert r.status_code == 200
+    assert [(item["valid"], item["status"]) for item in r.json()["results"]] == [
+        (True, "active"),
+        (False, "revoked"),
+        (False, "expired"),
+        (False, None),
+    ]
+    assert client.post("/licenses/validate/batch", json={"keys": []}).status_code == 422
+
+    # Event ingest compares stored (naive) expiry against an aware clock without failing
+    r = client.post("/events", json={"package_name": "base", "license_key": keys[0]["key"]})
+    assert r.status_code == 201 and r.json()["valid_at_log_time"] is True
@@ -0,0 +1,119 @@
+import socket
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+
+from app.core.invalidation import (
+    INVALIDATION_LAG,
+    TOPIC_LICENSE,
+    TOPIC_PACKAGE,
+    InvalidationBus,
+    SqliteTableTransport,
+    UnixDatagramTransport,
+    bus,
+)
+from app.db.migrations import run_migrations
+from app.db.session import Base, engine
+from app.main import app
+from app.models.invalidation import Invalidation
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def lag_samples(transport: str) -> int:
+    counts, _ = INVALIDATION_LAG.values().get((transport,), ([0], 0.0))
+    return sum(counts)
+
+
+def test_sqlite_transport_delivers_to_other_workers_and_prunes(tmp_path):
+    bind = create_engine(f"sqlite:///{tmp_path / 'bus.db'}", connect_args={"check_same_thread": False})
+    run_migrations(bind=bind, lock_path=str(tmp_path / "lock"))
+    worker_a, worker_b = InvalidationBus(), InvalidationBus()
+    seen_a, seen_b = [], []
+    worker_a.subscribe(TOPIC_LICENSE, seen_a.append)
+    worker_b.subscribe(TOPIC_LICENSE, seen_b.append)
+    transport_b = SqliteTableTransport(bind, retention_seconds=3600)
+    worker_a.start(SqliteTableTransport(bind), interval_seconds=0.02)
+    worker_b.start(transport_b, interval_seconds=0.02)
+    try:
+        assert wait_for(lambda: transport_b._last_id is not None)
+        lag_before = lag_samples("sqlite")
+
+        worker_a.publish(TOPIC_LICENSE, "key-1")
+        assert seen_a == ["key-1"]  # applied locally right away
+        assert wait_for(lambda: seen_b == ["key-1"])
+        worker_a.publish(TOPIC_LICENSE)
+        assert wait_for(lambda: seen_b == ["key-1", None])
+        assert lag_samples("sqlite") == lag_before + 2
+        time.sleep(0.1)
+        assert seen_a == ["key-1", None]  # own messages are not applied twice
+    finally:
+        worker_a.stop()
+        worker_b.stop()
+
+    pruning = SqliteTableTransport(bind, retention_seconds=0)
+    pruning.receive(0)
+    pruning.receive(0)
+    with bind.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Invalidation)).scalar_one() == 0
+
+
+def test_unix_transport_fans_out_and_drops_stale_sockets(tmp_path):
+    directory = str(tmp_path / "sockets")
+    worker_a, worker_b = InvalidationBus(), InvalidationBus()
+    seen_b = []
+    worker_b.subscribe(TOPIC_PACKAGE, seen_b.append)
+    worker_a.start(UnixDatagramTransport(directory, worker_a.origin), interval_seconds=0.05)
+    worker_b.start(UnixDatagramTransport(directory, worker_b.origin), interval_seconds=0.05)
+    # A socket file whose worker has gone away
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(str(tmp_path / "sockets" / "dead-worker.sock"))
+    stale.close()
+    try:
+        worker_a.publish(TOPIC_PACKAGE, 7)
+        assert wait_for(lambda: seen_b == ["7"])
+        assert not (tmp_path / "sockets" / "dead-worker.sock").exists()
+    finally:
+        worker_a.stop()
+        worker_b.stop()
+    assert list((tmp_path / "sockets").iterdir()) == []
+
+
+def test_admin_mutations_publish_invalidations():
+    reset_db()
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    token = client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+
+    licenses, packages = [], []
+    bus.subscribe(TOPIC_LICENSE, licenses.append)
+    bus.subscribe(TOPIC_PACKAGE, packages.append)
+    try:
+        pkg = client.post("/packages/", headers=admin, json={"name": "base", "is_base": True, "price": 1}).json()
+        client.post(f"/packages/{pkg['id']}/deprecate", headers=admin)
+        client.post(f"/packages/{pkg['id']}/undeprecate", headers=admin)
+        lic = client.post("/licenses/", headers=admin, json={"user_id": 1, "package_ids": [pkg["id"]]}).json()
+        client.post(f"/licenses/{lic['id']}/revoke", headers=admin, json={"reason": "test"})
+        client.post("/licenses/bulk/extend", headers=admin, json={"user_id": 1, "extra_days": 1})
+    finally:
+        bus.unsubscribe(TOPIC_LICENSE, licenses.append)
+        bus.unsubscribe(TOPIC_PACKAGE, packages.append)
+
+    assert packages == [str(pkg["id"])] * 3
+    assert licenses == [lic["key"], lic["key"], None]
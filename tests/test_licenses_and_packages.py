@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timezone, timedelta
 
 from fastapi.testclient import TestClient
@@ -136,8 +137,8 @@ def test_license_lifecycle_validate_revoke_and_expire_and_packages_guard():
     # Set expires_at in the past directly via SQL
     with engine.begin() as conn:
         conn.exec_driver_sql(
-            "UPDATE licenses SET expires_at = :past WHERE id = :id",
-            {"past": datetime.now(tz=timezone.utc) - timedelta(days=1), "id": lic2["id"]},
+            "UPDATE licenses SET expires_at = :past, expires_at_epoch = :past_epoch WHERE id = :id",
+            {"past": datetime.now(tz=timezone.utc) - timedelta(days=1), "past_epoch": int(time.time()) - 86400, "id": lic2["id"]},
         )
 
     # Validate invalid due to expiration
@@ -339,3 +340,241 @@ def test_cannot_create_license_with_deprecated_package():
     assert r_create.status_code == 400
 
 
+def test_list_licenses_keyset_pagination_and_filters():
+    reset_db()
+    client = TestClient(app)
+
+    register(client, "admin@example.com")  # id=1
+    register(client, "user2@example.com")  # id=2
+    register(client, "user3@example.com")  # id=3
+    promote_user1_to_admin()
+    admin_headers = bearer(login(client, "admin@example.com"))
+
+    base, addon = create_base_and_addon(client, admin_headers)
+
+    created = []
+    for user_id, package_ids in [(2, [base["id"], addon["id"]]), (2, [base["id"]]), (3, [base["id"]])]:
+        r = client.post("/licenses/", headers=admin_headers, json={"user_id": user_id, "package_ids": package_ids})
+        assert r.status_code == 201
+        created.append(r.json())
+
+    # Page through two at a time following the cursor header
+    r_page1 = client.get("/licenses/?limit=2", headers=admin_headers)
+    assert r_page1.status_code == 200
+    page1 = r_page1.json()
+    assert [lic["id"] for lic in page1] == [created[0]["id"], created[1]["id"]]
+    assert sorted(page1[0]["package_ids"]) == sorted([base["id"], addon["id"]])
+    cursor = r_page1.headers["X-Next-Cursor"]
+    r_page2 = client.get(f"/licenses/?limit=2&after_id={cursor}", headers=admin_headers)
+    assert [lic["id"] for lic in r_page2.json()] == [created[2]["id"]]
+    assert "X-Next-Cursor" not in r_page2.headers
+
+    # Filters
+    r_user = client.get("/licenses/?user_id=3", headers=admin_headers)
+    assert [lic["id"] for lic in r_user.json()] == [created[2]["id"]]
+
+    r_pkg = client.get(f"/licenses/?package_id={addon['id']}", headers=admin_headers)
+    assert [lic["id"] for lic in r_pkg.json()] == [created[0]["id"]]
+
+    client.post(f"/licenses/{created[1]['id']}/revoke", headers=admin_headers, json={"reason": "test"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE licenses SET expires_at = :past, expires_at_epoch = :past_epoch WHERE id = :id",
+            {"past": datetime.now(tz=timezone.utc) - timedelta(days=1), "past_epoch": int(time.time()) - 86400, "id": created[2]["id"]},
+        )
+
+    r_revoked = client.get("/licenses/?status=revoked", headers=admin_headers)
+    assert [lic["id"] for lic in r_revoked.json()] == [created[1]["id"]]
+    r_expired = client.get("/licenses/?status=expired", headers=admin_headers)
+    assert [lic["id"] for lic in r_expired.json()] == [created[2]["id"]]
+    r_active = client.get("/licenses/?status=active", headers=admin_headers)
+    assert [lic["id"] for lic in r_active.json()] == [created[0]["id"]]
+
+    soon = (datetime.now(tz=timezone.utc) + timedelta(days=1)).isoformat()
+    r_soon = client.get("/licenses/", headers=admin_headers, params={"expiring_before": soon})
+    assert [lic["id"] for lic in r_soon.json()] == [created[2]["id"]]
+
+
+def test_me_licenses_etag_revalidation():
+    reset_db()
+    client = TestClient(app)
+
+    register(client, "admin@example.com")  # id=1
+    user2_token = register(client, "user2@example.com")  # id=2
+    promote_user1_to_admin()
+    admin_headers = bearer(login(client, "admin@example.com"))
+    user_headers = bearer(user2_token)
+
+    base, addon = create_base_and_addon(client, admin_headers)
+    r_create = client.post("/licenses/", headers=admin_headers, json={"user_id": 2, "package_ids": [base["id"], addon["id"]]})
+    lic = r_create.json()
+
+    r1 = client.get("/me/licenses", headers=user_headers)
+    assert r1.status_code == 200
+    etag = r1.headers["ETag"]
+
+    # Unchanged -> 304 without a body
+    r2 = client.get("/me/licenses", headers={**user_headers, "If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.headers["ETag"] == etag
+    # A tag list, a weak tag (as sent back for a compressed body) and `*` all match
+    for header in (f'"other", {etag}', f"W/{etag}", f'"other",W/{etag}', "*"):
+        assert client.get("/me/licenses", headers={**user_headers, "If-None-Match": header}).status_code == 304
+    assert client.get("/me/licenses", headers={**user_headers, "If-None-Match": '"other", W/"x"'}).status_code == 200
+
+    # Licenses of other users do not affect this user's ETag
+    client.post("/licenses/", headers=admin_headers, json={"user_id": 1, "package_ids": [base["id"]]})
+    assert client.get("/me/licenses", headers={**user_headers, "If-None-Match": etag}).status_code == 304
+
+    # Revoking the user's license changes the representation
+    client.post(f"/licenses/{lic['id']}/revoke", headers=admin_headers, json={"reason": "test"})
+    r3 = client.get("/me/licenses", headers={**user_headers, "If-None-Match": etag})
+    assert r3.status_code == 200
+    assert r3.json()[0]["revoked_reason"] == "test"
+    etag2 = r3.headers["ETag"]
+    assert etag2 != etag
+
+    # Deprecating a package changes what the user sees, so it invalidates as well
+    client.post(f"/packages/{addon['id']}/deprecate", headers=admin_headers)
+    r4 = client.get("/me/licenses", headers={**user_headers, "If-None-Match": etag2})
+    assert r4.status_code == 200
+    assert r4.json()[0]["package_names"] == ["baseA"]
+
+
+def test_bulk_extend_and_revoke_licenses():
+    reset_db()
+    client = TestClient(app)
+
+    register(client, "admin@example.com")  # id=1
+    register(client, "user2@example.com")  # id=2
+    register(client, "user3@example.com")  # id=3
+    promote_user1_to_admin()
+    admin_headers = bearer(login(client, "admin@example.com"))
+
+    base, addon = create_base_and_addon(client, admin_headers)
+    created = []
+    for user_id, package_ids in [(2, [base["id"], addon["id"]]), (2, [base["id"]]), (3, [base["id"], addon["id"]])]:
+        r = client.post(
+            "/licenses/",
+            headers=admin_headers,
+            json={"user_id": user_id, "package_ids": package_ids, "license_days": 5},
+        )
+        created.append(r.json())
+
+    # A selector is mandatory so an empty body cannot touch every license
+    assert client.post("/licenses/bulk/extend", headers=admin_headers, json={"extra_days": 1}).status_code == 400
+    assert client.post("/licenses/bulk/extend", json={"user_id": 2, "extra_days": 1}).status_code == 401
+
+    r_ext = client.post("/licenses/bulk/extend", headers=admin_headers, json={"user_id": 2, "extra_days": 10})
+    assert r_ext.status_code == 200
+    assert r_ext.json() == {"affected": 2}
+    listed = {lic["id"]: lic for lic in client.get("/licenses/", headers=admin_headers).json()}
+    for original in created:
+        delta = datetime.fromisoformat(listed[original["id"]]["expires_at"]) - datetime.fromisoformat(
+            original["expires_at"]
+        ).replace(tzinfo=None)
+        expected_days = 10 if original["user_id"] == 2 else 0
+        assert abs(delta - timedelta(days=expected_days)) < timedelta(seconds=1)
+
+    # Filter by package and expiry, streaming the affected records back as NDJSON
+    soon = (datetime.now(tz=timezone.utc) + timedelta(days=6)).isoformat()
+    r_rev = client.post(
+        "/licenses/bulk/revoke",
+        headers=admin_headers,
+        json={"package_id": addon["id"], "expiring_before": soon, "reason": "audit", "stream": True},
+    )
+    assert r_rev.status_code == 200
+    assert r_rev.headers["X-Affected-Count"] == "1"
+    streamed = [line for line in r_rev.text.splitlines() if line]
+    assert len(streamed) == 1 and f'"id":{created[2]["id"]}' in streamed[0] and '"revoked_reason":"audit"' in streamed[0]
+
+    # Explicit ids; already revoked licenses are not counted again
+    r_rev2 = client.post(
+        "/licenses/bulk/revoke",
+        headers=admin_headers,
+        json={"license_ids": [created[1]["id"], created[2]["id"], 9999]},
+    )
+    assert r_rev2.json() == {"affected": 1}
+    assert client.post("/licenses/validate", json={"key": created[1]["key"]}).json()["valid"] is False
+    assert client.post("/licenses/validate", json={"key": created[0]["key"]}).json()["valid"] is True
+
+
+def test_license_status_column_and_counts():
+    reset_db()
+    client = TestClient(app)
+
+    register(client, "admin@example.com")  # id=1
+    register(client, "user2@example.com")  # id=2
+    promote_user1_to_admin()
+    admin_headers = bearer(login(client, "admin@example.com"))
+    base, _ = create_base_and_addon(client, admin_headers)
+
+    ids = []
+    for _ in range(3):
+        r = client.post("/licenses/", headers=admin_headers, json={"user_id": 2, "package_ids": [base["id"]]})
+        ids.append(r.json()["id"])
+    client.post(f"/licenses/{ids[0]}/revoke", headers=admin_headers, json={})
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE licenses SET expires_at = :past, expires_at_epoch = :past_epoch WHERE id = :id",
+            {"past": datetime.now(tz=timezone.utc) - timedelta(days=1), "past_epoch": int(time.time()) - 86400, "id": ids[1]},
+        )
+
+    # Not yet swept: the expired row still reads "active" in the column but counts as expired
+    r = client.get("/licenses/stats", headers=admin_headers)
+    assert r.status_code == 200
+    assert r.json() == {"active": 1, "expired": 1, "revoked": 1}
+
+    # Extending the expired license past now makes it active again
+    client.post(f"/licenses/{ids[1]}/extend", headers=admin_headers, json={"extra_days": 5})
+    assert client.get("/licenses/stats", headers=admin_headers).json() == {"active": 2, "expired": 0, "revoked": 1}
+    with engine.connect() as conn:
+        rows = dict(conn.exec_driver_sql("SELECT id, status FROM licenses").all())
+    assert rows == {ids[0]: "revoked", ids[1]: "active", ids[2]: "active"}
+
+
+def test_package_entitlements_reverse_lookup_and_count():
+    reset_db()
+    client = TestClient(app)
+
+    register(client, "admin@example.com")  # id=1
+    user2 = bearer(register(client, "user2@example.com"))  # id=2
+    register(client, "user3@example.com")  # id=3
+    promote_user1_to_admin()
+    admin_headers = bearer(login(client, "admin@example.com"))
+    base, addon = create_base_and_addon(client, admin_headers)
+
+    ids = []
+    for user_id, package_ids in [(2, [base["id"], addon["id"]]), (2, [base["id"], addon["id"]]), (3, [base["id"], addon["id"]]), (3, [base["id"]])]:
+        r = client.post("/licenses/", headers=admin_headers, json={"user_id": user_id, "package_ids": package_ids})
+        ids.append(r.json()["id"])
+    # One revoked and one expired holder of the add-on drop out
+    client.post(f"/licenses/{ids[1]}/revoke", headers=admin_headers, json={})
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "UPDATE licenses SET expires_at = :past, expires_at_epoch = :past_epoch WHERE id = :id",
+            {"past": datetime.now(tz=timezone.utc) - timedelta(days=1), "past_epoch": int(time.time()) - 86400, "id": ids[2]},
+        )
+
+    r = client.get(f"/packages/{addon['id']}/entitlements", headers=admin_headers)
+    assert r.status_code == 200
+    assert [(e["license_id"], e["user_id"], e["user_email"]) for e in r.json()] == [(ids[0], 2, "user2@example.com")]
+    assert "X-Next-Cursor" not in r.headers
+    r_count = client.get(f"/packages/{addon['id']}/entitlements/count", headers=admin_headers)
+    assert r_count.json() == {"package_id": addon["id"], "licenses": 1, "users": 1}
+    assert client.get(f"/packages/{base['id']}/entitlements/count", headers=admin_headers).json() == {
+        "package_id": base["id"],
+        "licenses": 2,
+        "users": 2,
+    }
+
+    # Keyset pages over the base package's active holders
+    r_page1 = client.get(f"/packages/{base['id']}/entitlements?limit=1", headers=admin_headers)
+    assert [e["license_id"] for e in r_page1.json()] == [ids[0]]
+    cursor = r_page1.headers["X-Next-Cursor"]
+    r_page2 = client.get(f"/packages/{base['id']}/entitlements?limit=1&after_id={cursor}", headers=admin_headers)
+    assert [e["license_id"] for e in r_page2.json()] == [ids[3]]
+
+    assert client.get("/packages/9999/entitlements", headers=admin_headers).status_code == 404
+    assert client.get("/packages/9999/entitlements/count", headers=admin_headers).status_code == 404
+    assert client.get(f"/packages/{base['id']}/entitlements/count", headers=user2).status_code == 403
@@ -0,0 +1,107 @@
+import sqlite3
+import uuid
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+
+from app.core.metrics import MetricsRegistry
+from app.main import DATABASE_BUSY_DETAIL, app, database_busy
+from app.db.session import Base, engine
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not found")
+
+
+def test_registry_renders_prometheus_text_and_merges_thread_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs run.", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job latency.", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+        histogram.observe(0.05)
+        histogram.observe(2.0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc('we"ird')
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert sample(text, 'jobs_total{kind="a"}') == 4000
+    assert sample(text, 'jobs_total{kind="we\\"ird"}') == 1
+    assert "# TYPE job_seconds histogram" in text
+    assert sample(text, 'job_seconds_bucket{le="0.1"}') == 4
+    assert sample(text, 'job_seconds_bucket{le="1"}') == 4
+    assert sample(text, 'job_seconds_bucket{le="+Inf"}') == 8
+    assert sample(text, "job_seconds_count") == 8
+    assert abs(sample(text, "job_seconds_sum") - 8.2) < 1e-9
+
+
+def test_metrics_endpoint_reports_route_templates_and_db_work():
+    reset_db()
+    client = TestClient(app)
+
+    before = client.get("/metrics").text
+    route = 'method="GET",route="/licenses/{license_key}/packages"'
+    def sample_or_zero(text, series):
+        try:
+            return sample(text, series)
+        except AssertionError:
+            return 0
+
+    start = sample_or_zero(before, f'http_requests_total{{{route},status="404"}}')
+    # Cached lookups from earlier tests legitimately run no queries
+    start_uncounted = sample_or_zero(before, f'http_request_db_queries_bucket{{{route},le="0"}}')
+
+    # Fresh keys, so the unknown-key lookups are not answered from the license cache
+    for key in (uuid.uuid4().hex for _ in range(3)):
+        assert client.get(f"/licenses/{key}/packages").status_code == 404
+    client.get("/no/such/path")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert sample(text, f'http_requests_total{{{route},status="404"}}') == start + 3
+    assert 'route="<unmatched>"' in text
+    # One lookup query per request is attributed through the engine hooks
+    assert sample(text, f'http_request_db_queries_bucket{{{route},le="0"}}') == start_uncounted
+    assert sample(text, f"http_request_db_queries_count{{{route}}}") >= 3
+    assert sample(text, f"http_request_db_seconds_sum{{{route}}}") > 0
+    assert sample(text, f"http_request_duration_seconds_count{{{route}}}") >= 3
+
+
+def test_sqlite_lock_timeouts_become_503_with_retry_after():
+    request = Request({"type": "http", "method": "POST", "path": "/store/purchase", "headers": []})
+    client = TestClient(app)
+    series = 'db_locked_errors_total{route="<unmatched>"}'
+    text = client.get("/metrics").text
+    before = sample(text, series) if series in text else 0.0
+
+    locked = OperationalError("UPDATE users", {}, sqlite3.OperationalError("database is locked"))
+    response = database_busy(request, locked)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert DATABASE_BUSY_DETAIL.encode() in response.body
+    assert sample(client.get("/metrics").text, series) == before + 1
+
+    other = OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: users"))
+    with pytest.raises(OperationalError):
+        database_busy(request, other)
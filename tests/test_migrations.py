@@ -0,0 +1,75 @@
+from sqlalchemy import create_engine, inspect, text
+
+import app.db.migrations as migrations
+from app.db.migrations import LATEST_VERSION, current_version, run_migrations
+
+
+def make_engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'migrate.db'}", connect_args={"check_same_thread": False})
+
+
+def test_upgrades_legacy_schema_and_records_version(tmp_path):
+    bind = make_engine(tmp_path)
+    # Tables as created by the first release, before any of the added columns
+    with bind.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(255) NOT NULL UNIQUE, hashed_password VARCHAR(255) NOT NULL, role VARCHAR(20) NOT NULL DEFAULT 'user', balance INTEGER NOT NULL DEFAULT 0, created_at TIMESTAMP)"))
+        conn.execute(text("CREATE TABLE packages (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL UNIQUE, is_base BOOLEAN NOT NULL, price INTEGER NOT NULL)"))
+        conn.execute(text("CREATE TABLE licenses (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, key VARCHAR(64) NOT NULL UNIQUE, expires_at TIMESTAMP NOT NULL, created_at TIMESTAMP)"))
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'a@example.com', 'x')"))
+        conn.execute(text("INSERT INTO licenses (user_id, key, expires_at) VALUES (1, 'k1', '2099-01-01 00:00:00')"))
+        conn.execute(text("INSERT INTO licenses (user_id, key, expires_at) VALUES (1, 'k2', '2024-03-01 12:30:00.250000')"))
+
+    assert run_migrations(bind=bind, lock_path=str(tmp_path / "lock")) == LATEST_VERSION
+
+    inspector = inspect(bind)
+    assert "is_deprecated" in {c["name"] for c in inspector.get_columns("packages")}
+    assert {"revoked_at", "revoked_reason", "status"} <= {c["name"] for c in inspector.get_columns("licenses")}
+    assert "download_events" in inspector.get_table_names()
+    with bind.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
+        assert set(conn.execute(text("SELECT status FROM licenses")).scalars()) == {"active"}
+        # Epoch shadows are backfilled from the stored (naive UTC) datetimes
+        assert conn.execute(text("SELECT key, expires_at_epoch, revoked_at_epoch FROM licenses ORDER BY id")).all() == [
+            ("k1", 4070908800, None),
+            ("k2", 1709296200, None),
+        ]
+    indexes = {ix["name"] for ix in inspector.get_indexes("licenses")}
+    assert {"ix_licenses_expires_at_epoch", "ix_licenses_status_expires_at_epoch"} <= indexes
+    assert "ix_licenses_status_expires_at" not in indexes
+    assert {
+        "ix_licenses_key_state",
+        "ix_licenses_user_id_expires_at_epoch",
+        "ix_licenses_unrevoked_expires_at_epoch",
+    } <= indexes
+    assert "ix_licenses_user_id" not in indexes
+    assert "ix_license_packages_package_license" in {ix["name"] for ix in inspector.get_indexes("license_packages")}
+
+
+def test_fresh_database_and_fast_path_when_current(tmp_path, monkeypatch):
+    bind = make_engine(tmp_path)
+    lock_path = str(tmp_path / "lock")
+    assert run_migrations(bind=bind, lock_path=lock_path) == LATEST_VERSION
+
+    # Once current, startup reads the version row and never takes the lock or inspects the schema
+    def fail(*args, **kwargs):
+        raise AssertionError("slow path taken")
+
+    monkeypatch.setattr(migrations, "_file_lock", fail)
+    monkeypatch.setattr(migrations, "inspect", fail)
+    assert run_migrations(bind=bind, lock_path=lock_path) == LATEST_VERSION
+
+
+def test_only_pending_steps_run(tmp_path, monkeypatch):
+    bind = make_engine(tmp_path)
+    lock_path = str(tmp_path / "lock")
+    run_migrations(bind=bind, lock_path=lock_path)
+
+    applied = []
+    extra = migrations.Migration(LATEST_VERSION + 1, "test step", lambda conn: applied.append(conn))
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [extra])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", extra.version)
+
+    assert run_migrations(bind=bind, lock_path=lock_path) == extra.version
+    assert len(applied) == 1
+    run_migrations(bind=bind, lock_path=lock_path)
+    assert len(applied) == 1
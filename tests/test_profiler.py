@@ -0,0 +1,75 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import app.routers.profiles as profiles_router
+from app.core.profiler import SamplingProfiler
+from app.main import app
+from app.db.session import Base, engine
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_slow_requests_keep_collapsed_samples_and_fast_ones_are_dropped():
+    profiler = SamplingProfiler(interval_ms=1, threshold_ms=20, ring_size=2)
+
+    fast = profiler.begin("GET", "/fast")
+    assert profiler.end(fast, 1.0) is None
+
+    slow = profiler.begin("GET", "/slow")
+    _spin(0.1)
+    profile = profiler.end(slow, 100.0)
+    assert profile is not None and profile.sample_count > 0
+
+    folded = profile.collapsed().splitlines()
+    assert any("test_profiler:_spin" in line for line in folded)
+    for line in folded:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+    # Ring buffer keeps only the newest profiles
+    for path in ("/a", "/b"):
+        profiler.end(profiler.begin("GET", path), 50.0)
+    assert [p.path for p in profiler.profiles] == ["/a", "/b"]
+    assert profiler.get(profile.id) is None
+
+
+def test_admin_can_list_and_download_profiles(monkeypatch):
+    reset_db()
+    profiler = SamplingProfiler(interval_ms=1, threshold_ms=0, ring_size=5)
+    monkeypatch.setattr(profiles_router, "profiler", profiler)
+    request = profiler.begin("POST", "/licenses/validate")
+    request.samples["app.main:handler;app.db:query"] = 3
+    profile = profiler.end(request, 750.0)
+
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    user = client.post("/auth/register", json={"email": "user@example.com", "password": "secretpass"}).json()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    admin = bearer(client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"])
+
+    assert client.get("/admin/profiles/", headers=bearer(user["access_token"])).status_code == 403
+
+    listed = client.get("/admin/profiles/", headers=admin).json()
+    assert listed[0]["id"] == profile.id
+    assert listed[0]["path"] == "/licenses/validate" and listed[0]["sample_count"] == 3
+
+    r = client.get(f"/admin/profiles/{profile.id}", headers=admin)
+    assert r.status_code == 200
+    assert r.text == "app.main:handler;app.db:query 3\n"
+    assert "attachment" in r.headers["content-disposition"]
+    assert client.get("/admin/profiles/999", headers=admin).status_code == 404
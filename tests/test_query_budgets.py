@@ -0,0 +1,82 @@
+import json
+import logging
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.db.session import Base, engine, get_db
+from app.middleware.query_debug import QueryDebugMiddleware
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def setup_license(client: TestClient):
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    user = client.post("/auth/register", json={"email": "user@example.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    admin = bearer(client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"])
+    base = client.post("/packages/", headers=admin, json={"name": "baseA", "is_base": True, "price": 10}).json()
+    addon = client.post("/packages/", headers=admin, json={"name": "addonX", "is_base": False, "price": 5}).json()
+    lic = client.post("/licenses/", headers=admin, json={"user_id": 2, "package_ids": [base["id"], addon["id"]]}).json()
+    return admin, bearer(user.json()["access_token"]), lic
+
+
+def test_hot_endpoint_query_budgets(query_budget):
+    reset_db()
+    client = TestClient(app)
+    admin, user, lic = setup_license(client)
+
+    with query_budget(1):
+        assert client.post("/licenses/validate", json={"key": lic["key"]}).json()["valid"] is True
+    with query_budget(1):
+        assert client.get(f"/licenses/{lic['key']}/packages").status_code == 200
+    # catalog version counter + one snapshot build, then the counter alone
+    with query_budget(2):
+        client.get("/packages/")
+    with query_budget(1):
+        client.get("/packages/")
+    # user lookup + ETag counters + one projected license query
+    with query_budget(3):
+        assert client.get("/me/licenses", headers=user).status_code == 200
+    # admin lookup + one page of licenses + one batched association query
+    with query_budget(3):
+        assert len(client.get("/licenses/", headers=admin).json()) == 1
+
+
+def test_query_debug_middleware_sets_header_and_flags_repeats(caplog):
+    reset_db()
+    debug_app = FastAPI()
+
+    @debug_app.get("/loop/{n}")
+    def loop(n: int, db: Session = Depends(get_db)):
+        for i in range(n):
+            db.execute(text("SELECT :i"), {"i": i})
+        return {"n": n}
+
+    debug_app.add_middleware(QueryDebugMiddleware)
+    client = TestClient(debug_app)
+
+    with caplog.at_level(logging.INFO, logger="app.queries"):
+        r_single = client.get("/loop/1")
+        r_many = client.get("/loop/5")
+
+    assert r_single.headers["X-Query-Count"] == "1"
+    assert r_many.headers["X-Query-Count"] == "5"
+
+    records = [json.loads(rec.getMessage()) for rec in caplog.records if rec.name == "app.queries"]
+    assert [rec["query_count"] for rec in records] == [1, 5]
+    assert records[0]["repeated"] == [] and caplog.records[0].levelno == logging.INFO
+    assert records[1]["route"] == "/loop/{n}"
+    assert records[1]["repeated"] == [{"statement": "SELECT ?", "count": 5}]
+    assert caplog.records[-1].levelno == logging.WARNING
@@ -0,0 +1,140 @@
+import contextlib
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from app.db.session import Base, SessionLocal, engine
+from app.main import app
+from app.models.views import _key_states_query
+from app.services.sweeper import sweep_expired_licenses
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextlib.contextmanager
+def captured_selects():
+    """Collect (statement, parameters) of every SELECT run on the engine inside the block."""
+    selects: List[Tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append((statement, parameters))
+
+    event.listen(engine, "after_cursor_execute", record)
+    try:
+        yield selects
+    finally:
+        event.remove(engine, "after_cursor_execute", record)
+
+
+def query_plans(selects: List[Tuple[str, tuple]]) -> List[str]:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        plans = []
+        for statement, parameters in selects:
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            plans.append("\n".join(row[3] for row in cursor.fetchall()))
+        return plans
+    finally:
+        raw.close()
+
+
+def assert_no_scans(selects: List[Tuple[str, tuple]], *tables: str) -> List[str]:
+    plans = query_plans(selects)
+    for (statement, _), plan in zip(selects, plans):
+        for line in plan.splitlines():
+            # "SCAN t" is a full table walk; "SCAN t USING ... INDEX" still reads every index entry
+            assert not any(line.startswith(f"SCAN {table}") for table in tables), f"{statement}\n-> {plan}"
+    return plans
+
+
+def setup_licenses(client: TestClient):
+    client.post("/auth/register", json={"email": "admin@example.com", "password": "secretpass"})
+    user = client.post("/auth/register", json={"email": "user@example.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    admin = bearer(client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"}).json()["access_token"])
+    base = client.post("/packages/", headers=admin, json={"name": "baseA", "is_base": True, "price": 10}).json()
+    keys = [
+        client.post("/licenses/", headers=admin, json={"user_id": 2, "package_ids": [base["id"]]}).json()["key"]
+        for _ in range(3)
+    ]
+    return admin, bearer(user.json()["access_token"]), base, keys
+
+
+def test_key_lookups_are_answered_from_the_covering_index():
+    reset_db()
+    client = TestClient(app)
+    _, _, _, keys = setup_licenses(client)
+
+    with captured_selects() as selects:
+        assert client.post("/licenses/validate/batch", json={"keys": keys + ["missing"]}).status_code == 200
+        assert client.post("/events", json={"license_key": keys[0], "package_name": "baseA"}).status_code == 201
+    plans = assert_no_scans(selects, "licenses")
+    key_plans = [plan for plan in plans if "licenses" in plan]
+    assert key_plans
+    assert all("USING COVERING INDEX ix_licenses_key_state" in plan for plan in key_plans)
+
+
+def test_hot_license_queries_use_indexes():
+    reset_db()
+    client = TestClient(app)
+    admin, user, base, keys = setup_licenses(client)
+    soon = (datetime.now(tz=timezone.utc) + timedelta(days=3650)).isoformat()
+
+    with captured_selects() as selects:
+        assert client.post("/licenses/validate", json={"key": keys[1]}).json()["valid"] is True
+        assert client.get("/me/licenses", headers=user).status_code == 200
+        assert client.get("/licenses/", headers=admin, params={"user_id": 2, "status": "active"}).status_code == 200
+        assert client.get("/licenses/stats", headers=admin).status_code == 200
+        revoke = {"expiring_before": soon, "reason": "audit"}
+        assert client.post("/licenses/bulk/revoke", headers=admin, json=revoke).json()["affected"] == 3
+        db = SessionLocal()
+        try:
+            sweep_expired_licenses(db, full=True)
+        finally:
+            db.close()
+    plans = assert_no_scans(selects, "licenses", "license_packages")
+
+    joined = "\n".join(plans)
+    assert "ix_licenses_user_id_expires_at_epoch" in joined
+    assert "ix_licenses_unrevoked_expires_at_epoch" in joined
+    assert "ix_licenses_status_expires_at_epoch" in joined
+
+
+def test_package_to_licenses_uses_the_reverse_index():
+    reset_db()
+    client = TestClient(app)
+    admin, _, base, _ = setup_licenses(client)
+
+    with captured_selects() as selects:
+        assert client.get("/licenses/", headers=admin, params={"package_id": base["id"]}).status_code == 200
+        assert client.get(f"/packages/{base['id']}/entitlements", headers=admin).status_code == 200
+        assert client.get(f"/packages/{base['id']}/entitlements/count", headers=admin).status_code == 200
+    plans = assert_no_scans(selects, "license_packages")
+    reverse = [plan for plan in plans if "ix_license_packages_package_license" in plan]
+    assert len(reverse) == 3, "\n\n".join(plans)
+    # Pages come off the index in license id order, with no sort step
+    assert "USE TEMP B-TREE" not in reverse[1]
+
+
+def test_key_state_hint_is_sqlite_only():
+    class OtherDatabase:
+        def get_bind(self):
+            return SimpleNamespace(dialect=postgresql.dialect())
+
+    sql = str(_key_states_query(OtherDatabase(), ["k1"]).compile(dialect=postgresql.dialect()))
+    assert "INDEXED BY" not in sql
+    assert "FROM licenses" in sql
@@ -0,0 +1,58 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import app.core.responses as responses
+from app.core.responses import FastJSONResponse, json_list_response
+from app.schemas.event import DownloadEventOut
+
+
+def event_rows(n):
+    created = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=i,
+            user_id=None,
+            license_key=f"kéy-{i}",
+            package_name="pkg",
+            package_version="1.0",
+            ip_address="10.0.0.1",
+            valid_at_log_time=i % 2 == 0,
+            created_at=created,
+        )
+        for i in range(n)
+    ]
+
+
+def test_list_response_matches_default_serialization_byte_for_byte():
+    rows = event_rows(3)
+    adapter = TypeAdapter(List[DownloadEventOut])
+    default = JSONResponse(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json"))
+
+    fast = json_list_response(DownloadEventOut, rows, headers={"X-Next-Cursor": "2"})
+    assert fast.body == default.body
+    assert fast.headers["x-next-cursor"] == "2"
+    assert fast.headers["content-type"] == "application/json"
+    # Already-built models are dumped without revalidation
+    models = adapter.validate_python(rows, from_attributes=True)
+    assert json_list_response(DownloadEventOut, models).body == default.body
+
+
+def test_fast_json_response_with_and_without_orjson(monkeypatch):
+    content = {"name": "ünïcode", "items": [1, 2.5, None, True], "nested": {"a": []}}
+    assert json.loads(FastJSONResponse(content).body) == content
+
+    monkeypatch.setattr(responses, "orjson", None)
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_user_out_documents_email_format_without_revalidating():
+    from app.schemas.auth import UserOut
+
+    assert UserOut.model_json_schema()["properties"]["email"]["format"] == "email"
+    row = SimpleNamespace(id=1, email="legacy@localhost", role="user", balance=0)
+    assert json.loads(json_list_response(UserOut, [row]).body)[0]["email"] == "legacy@localhost"
@@ -0,0 +1,66 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.settings import settings
+from app.db.session import Base, engine
+from app.routers.registry import enabled_router_names, mount_routers
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def route_paths(app: FastAPI) -> set:
+    app.openapi_schema = None
+    return set(app.openapi()["paths"])
+
+
+def test_enabled_routers_selection(monkeypatch):
+    monkeypatch.setattr(settings, "enabled_routers", "*")
+    assert enabled_router_names() == ["auth", "balance", "packages", "store", "licenses", "me", "users", "events", "changes", "profiles"]
+
+    monkeypatch.setattr(settings, "enabled_routers", " licenses, events ")
+    assert enabled_router_names() == ["licenses", "events"]
+
+    monkeypatch.setattr(settings, "enabled_routers", "licenses,nope")
+    with pytest.raises(ValueError):
+        enabled_router_names()
+
+
+def test_only_selected_routers_are_mounted(monkeypatch):
+    reset_db()
+    monkeypatch.setattr(settings, "enabled_routers", "licenses,events")
+    monkeypatch.setattr(settings, "lazy_routers", False)
+    app = FastAPI()
+    mount_routers(app)
+
+    paths = route_paths(app)
+    assert "/licenses/validate" in paths and "/events" in paths
+    assert not any(p.startswith(("/auth", "/store", "/users")) for p in paths)
+
+    client = TestClient(app)
+    assert client.post("/licenses/validate", json={"key": "nope"}).json()["valid"] is False
+    assert client.post("/auth/login", json={"email": "a@example.com", "password": "x"}).status_code == 404
+
+
+def test_lazy_routers_mount_on_first_request_to_prefix(monkeypatch):
+    reset_db()
+    monkeypatch.setattr(settings, "enabled_routers", "licenses,events")
+    monkeypatch.setattr(settings, "lazy_routers", True)
+    app = FastAPI()
+    mount_routers(app)
+    client = TestClient(app)
+
+    assert "/licenses/validate" not in route_paths(app)
+    assert client.post("/licenses/validate", json={"key": "nope"}).json()["valid"] is False
+    assert "/licenses/validate" in route_paths(app)
+    assert "/events" not in route_paths(app)
+
+    # Prefixes of routers that are not enabled are never mounted
+    assert client.post("/auth/login", json={"email": "a@example.com", "password": "x"}).status_code == 404
+
+    # The API document mounts everything pending so it is complete
+    schema = client.get("/openapi.json").json()
+    assert "/events" in schema["paths"] and "/licenses/validate" in schema["paths"]
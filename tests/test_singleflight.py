@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import app.routers.changes as changes_router
+from app.cache.memory import MemoryCache
+from app.core.singleflight import SINGLEFLIGHT_CALLS, AsyncSingleFlight, SingleFlight
+from app.main import app
+from app.security.deps import require_admin_id
+
+
+def calls(group: str, role: str) -> float:
+    return SINGLEFLIGHT_CALLS.values().get((group, role), 0)
+
+
+def run_together(n, target):
+    barrier = threading.Barrier(n)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(target())
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_sync_calls_share_one_execution_and_its_errors():
+    flight = SingleFlight("test_sync")
+    executions = []
+
+    def slow(value):
+        executions.append(value)
+        time.sleep(0.1)
+        if value == "boom":
+            raise ValueError("boom")
+        return {"value": value}
+
+    results, errors = run_together(8, lambda: flight.do("k", lambda: slow("ok")))
+    assert executions == ["ok"] and not errors
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert calls("test_sync", "leader") == 1 and calls("test_sync", "coalesced") == 7
+
+    _, errors = run_together(4, lambda: flight.do("k", lambda: slow("boom")))
+    assert len(errors) == 4 and all(isinstance(e, ValueError) for e in errors)
+    # Nothing is remembered once the call finished
+    assert flight.do("k", lambda: 3) == 3
+
+
+def test_cache_misses_for_one_key_load_once():
+    cache = MemoryCache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.1)
+        return "snapshot"
+
+    results, _ = run_together(10, lambda: cache.get_or_set("license:hot", loader))
+    assert results == ["snapshot"] * 10 and loads == [1]
+    assert cache.get("license:hot") == "snapshot"
+
+
+def test_async_calls_share_one_task_and_survive_a_cancelled_caller():
+    flight = AsyncSingleFlight("test_async")
+    executions = []
+
+    async def slow():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0)
+        rest = [asyncio.ensure_future(flight.do("k", slow)) for _ in range(4)]
+        first.cancel()
+        results = await asyncio.gather(*rest)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return results
+
+    assert asyncio.run(scenario()) == ["done"] * 4
+    assert executions == [1]
+    assert calls("test_async", "leader") == 1 and calls("test_async", "coalesced") == 4
+
+
+def test_concurrent_change_feed_polls_share_one_read(monkeypatch):
+    reads = []
+
+    def fake_read(after, limit, entity):
+        reads.append((after, limit, entity))
+        time.sleep(0.1)
+        return []
+
+    monkeypatch.setattr(changes_router, "_read_changes", fake_read)
+    app.dependency_overrides[require_admin_id] = lambda: 1
+    before = calls("change_feed", "coalesced")
+
+    async def poll_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[client.get("/changes/?after=7") for _ in range(6)])
+
+    try:
+        responses = asyncio.run(poll_all())
+    finally:
+        app.dependency_overrides.pop(require_admin_id, None)
+    assert all(r.status_code == 200 and r.json() == {"changes": [], "next_seq": 7} for r in responses)
+    assert reads == [(7, 100, None)]
+    assert calls("change_feed", "coalesced") == before + 5
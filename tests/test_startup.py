@@ -0,0 +1,59 @@
+import logging
+import time
+
+from fastapi.testclient import TestClient
+
+import app.startup as startup
+from app.main import app
+from app.db.migrations import run_migrations
+from app.db.session import Base, engine
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def wait_until_ready(client: TestClient, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        r = client.get("/ready")
+        if r.status_code == 200:
+            return r
+        assert r.json() == {"status": "warming_up"}
+        time.sleep(0.05)
+    raise AssertionError("application never became ready")
+
+
+def test_ready_reports_after_warmup_while_health_is_immediate(monkeypatch):
+    reset_db()
+    ran = []
+    monkeypatch.setattr(startup, "WARMUP_STEPS", startup.WARMUP_STEPS + [lambda db: ran.append(True)])
+
+    with TestClient(app) as client:
+        assert client.get("/health").json() == {"status": "ok"}
+        assert wait_until_ready(client).json() == {"status": "ready"}
+    assert ran == [True]
+
+
+def test_failing_warmup_step_does_not_block_readiness(monkeypatch):
+    reset_db()
+
+    def broken(db):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(startup, "WARMUP_STEPS", [broken] + startup.WARMUP_STEPS)
+    with TestClient(app) as client:
+        wait_until_ready(client)
+
+
+def test_warm_up_runs_hot_paths_on_empty_database(tmp_path, caplog):
+    # The schema production boots on: built by the migrations, not by create_all
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS schema_version")
+    run_migrations(bind=engine, lock_path=str(tmp_path / "lock"))
+
+    with caplog.at_level(logging.ERROR, logger="app.startup"):
+        startup.warm_up(app)
+    assert [r.getMessage() for r in caplog.records if r.name == "app.startup"] == []
@@ -1,3 +1,5 @@
+import threading
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -75,3 +77,40 @@ def test_store_purchase_end_to_end():
     r_pkgs = client.get(f"/licenses/{lic_key}/packages")
     assert r_pkgs.status_code == 200
     assert set(r_pkgs.json()["package_names"]) == {"baseA", "addonX"}
+
+
+def test_concurrent_purchases_never_overdraw_the_balance():
+    reset_db()
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "admin@x.com", "password": "secretpass"})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    admin_headers = bearer(client.post("/auth/login", json={"email": "admin@x.com", "password": "secretpass"}).json()["access_token"])
+    user_headers = bearer(client.post("/auth/register", json={"email": "user@x.com", "password": "secretpass"}).json()["access_token"])
+    base = client.post("/packages/", headers=admin_headers, json={"name": "baseA", "is_base": True, "price": 100}).json()
+    # Enough for 5 of the 12 purchases racing below
+    client.post("/balance/increase", headers=user_headers, json={"amount": 500})
+
+    start = threading.Barrier(12)
+    codes = []
+
+    def purchase():
+        worker = TestClient(app)
+        start.wait(5)
+        r = worker.post(
+            "/store/purchase",
+            headers=user_headers,
+            json={"items": [{"base_package_id": base["id"], "addon_package_ids": []}], "license_days": 5},
+        )
+        codes.append(r.status_code)
+
+    threads = [threading.Thread(target=purchase) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+
+    assert sorted(codes) == [201] * 5 + [402] * 7
+    with engine.begin() as conn:
+        assert conn.exec_driver_sql("SELECT balance FROM users WHERE id=2").scalar() == 0
+        assert conn.exec_driver_sql("SELECT count(*) FROM licenses WHERE user_id=2").scalar() == 5
@@ -1,18 +1,52 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from app.routers.licenses import _to_aware_utc
+from app.db.session import Base, engine, SessionLocal
+from app.models.package import License, Package
+from app.models.user import User
+from app.models.epoch import to_aware_utc
+from app.models.views import LicenseView, load_license_view, load_user_license_views
 
 
 def test_to_aware_utc_handles_none_and_naive_and_aware():
-    assert _to_aware_utc(None) is None
+    assert to_aware_utc(None) is None
 
     naive = datetime(2024, 1, 1, 0, 0, 0)
-    aware = _to_aware_utc(naive)
+    aware = to_aware_utc(naive)
     assert aware.tzinfo is not None
     assert aware.tzinfo == timezone.utc
 
     aware_in = datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
-    aware_out = _to_aware_utc(aware_in)
+    aware_out = to_aware_utc(aware_in)
     assert aware_out == aware_in
 
 
+def test_license_views_load_columns_without_orm_instances():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(tz=timezone.utc)
+    with SessionLocal() as db:
+        user = User(email="u@example.com", hashed_password="x")
+        base = Package(name="base", is_base=True, price=1)
+        addon = Package(name="addon", is_base=False, price=1)
+        old = Package(name="old", is_base=False, price=1, is_deprecated=True)
+        db.add_all([user, base, addon, old])
+        db.flush()
+        db.add_all(
+            [
+                License(user_id=user.id, key="full", expires_at=now + timedelta(days=1), packages=[base, addon, old]),
+                License(user_id=user.id, key="bare", expires_at=now - timedelta(days=1)),
+            ]
+        )
+        db.commit()
+
+    with SessionLocal() as db:
+        view = load_license_view(db, "full")
+        assert len(db.identity_map) == 0
+    assert isinstance(view, LicenseView) and view.expires_at.tzinfo == timezone.utc
+    assert [p.name for p in view.packages] == ["base", "addon", "old"]
+
+    with SessionLocal() as db:
+        bare = load_license_view(db, "bare")
+        assert load_license_view(db, "missing") is None
+        assert [v.key for v in load_user_license_views(db, view.user_id)] == ["full", "bare"]
+    assert bare.packages == () and bare.expires_at < now
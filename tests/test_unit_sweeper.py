@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.db.session import Base, engine, SessionLocal
+from app.models.counter import read_counter
+from app.models.package import License
+from app.models.user import User
+from app.services import sweeper
+from app.services.sweeper import LAST_SWEEP_COUNTER, sweep_expired_licenses
+
+
+@pytest.fixture(autouse=True)
+def _reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def seed_licenses(db, expiries):
+    user = User(email="u@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    licenses = [License(user_id=user.id, key=f"k{i}", expires_at=exp) for i, exp in enumerate(expiries)]
+    db.add_all(licenses)
+    db.commit()
+    return licenses
+
+
+def statuses(db):
+    return {lic.key: lic.status for lic in db.query(License).order_by(License.id)}
+
+
+def test_sweep_marks_expired_in_batches_and_records_watermark():
+    now = datetime.now(tz=timezone.utc)
+    db = SessionLocal()
+    try:
+        seed_licenses(db, [now - timedelta(days=d) for d in (1, 2, 3)] + [now + timedelta(days=1)])
+        assert sweep_expired_licenses(db, now=now, batch_size=2) == 3
+        db.expire_all()
+        assert statuses(db) == {"k0": "expired", "k1": "expired", "k2": "expired", "k3": "active"}
+        assert read_counter(db, LAST_SWEEP_COUNTER) == int(now.timestamp())
+        # Nothing new expired since the watermark
+        assert sweep_expired_licenses(db, now=now + timedelta(seconds=1)) == 0
+    finally:
+        db.close()
+
+
+def test_sweep_range_scan_only_covers_window_since_last_sweep():
+    now = datetime.now(tz=timezone.utc)
+    db = SessionLocal()
+    try:
+        seed_licenses(db, [now + timedelta(hours=1)])
+        assert sweep_expired_licenses(db, now=now) == 0
+
+        # A row that expired before the watermark is outside the incremental window...
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO licenses (user_id, key, expires_at, expires_at_epoch, status)"
+                    " VALUES (1, 'old', :exp, :exp_epoch, 'active')"
+                ),
+                {"exp": now - timedelta(days=1), "exp_epoch": int((now - timedelta(days=1)).timestamp())},
+            )
+        later = now + timedelta(hours=2)
+        assert sweep_expired_licenses(db, now=later) == 1
+        db.expire_all()
+        assert statuses(db) == {"k0": "expired", "old": "active"}
+
+        # ...and is reconciled by a full pass
+        assert sweep_expired_licenses(db, now=later, full=True) == 1
+        db.expire_all()
+        assert statuses(db)["old"] == "expired"
+    finally:
+        db.close()
+
+
+def test_sweep_leaves_a_license_extended_after_selection_active(monkeypatch):
+    now = datetime.now(tz=timezone.utc)
+    db = SessionLocal()
+    try:
+        seed_licenses(db, [now - timedelta(days=1), now - timedelta(days=2)])
+        select_candidates = sweeper._expired_candidates
+
+        def extend_after_select(query, batch_size):
+            ids = select_candidates(query, batch_size)
+            # An extend commits between the sweeper's SELECT and its UPDATE
+            other = SessionLocal()
+            try:
+                lic = other.query(License).filter(License.key == "k0").one()
+                lic.expires_at = now + timedelta(days=30)
+                other.commit()
+            finally:
+                other.close()
+            return ids
+
+        monkeypatch.setattr(sweeper, "_expired_candidates", extend_after_select)
+        assert sweep_expired_licenses(db, now=now) == 1
+        db.expire_all()
+        assert statuses(db) == {"k0": "active", "k1": "expired"}
+    finally:
+        db.close()
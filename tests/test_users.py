@@ -0,0 +1,89 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.session import Base, engine, SessionLocal
+from app.models.counter import read_counter
+from app.models.user import USERS_TOTAL_COUNTER
+from app.routers.users import _prefix_upper_bound
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def register(client: TestClient, email: str, password: str = "secretpass") -> str:
+    r = client.post("/auth/register", json={"email": email, "password": password})
+    assert r.status_code == 201
+    return r.json()["access_token"]
+
+
+def admin_headers(client: TestClient) -> dict:
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE users SET role='admin' WHERE id=1")
+    r = client.post("/auth/login", json={"email": "admin@example.com", "password": "secretpass"})
+    assert r.status_code == 200
+    return bearer(r.json()["access_token"])
+
+
+def test_list_users_pagination_role_filter_and_total_count():
+    reset_db()
+    client = TestClient(app)
+
+    register(client, "admin@example.com")  # id=1
+    for i in range(4):
+        register(client, f"user{i}@example.com")
+    headers = admin_headers(client)
+
+    # Total is maintained by the insert hook, not counted per request
+    db = SessionLocal()
+    try:
+        assert read_counter(db, USERS_TOTAL_COUNTER) == 5
+    finally:
+        db.close()
+
+    r1 = client.get("/users?limit=3", headers=headers)
+    assert r1.status_code == 200
+    assert [u["id"] for u in r1.json()] == [1, 2, 3]
+    assert r1.headers["X-Total-Count"] == "5"
+    r2 = client.get(f"/users?limit=3&after_id={r1.headers['X-Next-Cursor']}", headers=headers)
+    assert [u["id"] for u in r2.json()] == [4, 5]
+    assert "X-Next-Cursor" not in r2.headers
+
+    r_admins = client.get("/users?role=admin", headers=headers)
+    assert [u["email"] for u in r_admins.json()] == ["admin@example.com"]
+    # The total counts the filtered list, not every user
+    assert r_admins.headers["X-Total-Count"] == "1"
+    r_users = client.get("/users?role=user&limit=2", headers=headers)
+    assert r_users.headers["X-Total-Count"] == "4"
+
+
+def test_list_users_email_prefix_search():
+    reset_db()
+    client = TestClient(app)
+
+    register(client, "admin@example.com")  # id=1
+    register(client, "Alice@example.com")
+    register(client, "alan@example.com")
+    register(client, "bob@example.com")
+    headers = admin_headers(client)
+
+    r_exact = client.get("/users?email_prefix=al", headers=headers)
+    assert [u["email"] for u in r_exact.json()] == ["alan@example.com"]
+
+    r_ci = client.get("/users?email_prefix=AL&case_insensitive=true", headers=headers)
+    assert sorted(u["email"] for u in r_ci.json()) == ["Alice@example.com", "alan@example.com"]
+
+    assert client.get("/users?email_prefix=zz", headers=headers).json() == []
+    assert r_ci.headers["X-Total-Count"] == "2"
+
+    # A last character with no successor must not fail the request
+    r_max = client.get("/users", params={"email_prefix": "al\U0010ffff"}, headers=headers)
+    assert r_max.status_code == 200 and r_max.json() == []
+    assert _prefix_upper_bound("a\U0010ffff") == "b"
+    assert _prefix_upper_bound("\U0010ffff") is None
+    assert _prefix_upper_bound("\ud7ff") == "\ue000"